@@ -0,0 +1,339 @@
+import argparse
+import hashlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Ensure src is in pythonpath
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'src'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+import analysis
+import backends
+import backtest
+import breakdown
+import charts
+import data_loader
+from synthetic import write_market_trades, write_trades
+
+TRADE_PATH = os.path.join(ROOT, 'data', 'historical_data.csv')
+FEAR_GREED_PATH = os.path.join(ROOT, 'data', 'fear_greed_index.csv')
+
+
+def legacy_load(path):
+    # The loader before the typed schema: every column inferred, dates as objects.
+    df = pd.read_csv(path)
+    df['datetime'] = pd.to_datetime(df['Timestamp'], unit='ms')
+    df['date'] = df['datetime'].dt.date
+    return df
+
+
+def stream_total(path):
+    # Streaming aggregate: only one chunk is ever held in memory.
+    rows = 0
+    for chunk in data_loader.iter_trade_data(path, ['Closed PnL'], chunksize=50_000, cache=False):
+        rows += int(chunk['Closed PnL'].notna().sum())
+    return rows
+
+
+def merge_case(how):
+    """
+    Times only the date derivation and join, on frames loaded beforehand.
+    'legacy' is the old path: .dt.date objects on both sides and a pd.merge on them.
+    """
+    def run(path):
+        trades = data_loader.load_trade_data(path, cache=False)
+        fg = data_loader.load_fear_greed(FEAR_GREED_PATH, cache=False)
+        t0 = time.perf_counter()
+        if how == 'legacy':
+            trades = trades.drop(columns=['date', 'day'])
+            fg = fg.drop(columns='day')
+            trades['date'] = trades['datetime'].dt.date
+            fg['date'] = fg['date'].dt.date
+            merged = pd.merge(trades, fg, on='date', how='left')
+        else:
+            merged = data_loader.merge_datasets(trades, fg, how=how)
+        return {'seconds': time.perf_counter() - t0, 'rows': len(merged)}
+    return run
+
+
+def legacy_metrics(merged_df):
+    # The statistics part of generate_report before the single-pass engine.
+    merged_df['Closed PnL'] = pd.to_numeric(merged_df['Closed PnL'], errors='coerce').fillna(0)
+    merged_df['Size USD'] = pd.to_numeric(merged_df['Size USD'], errors='coerce').fillna(0)
+    df = merged_df.dropna(subset=['classification'])
+    df.groupby('classification')['Closed PnL'].agg(['mean', 'sum', 'count', 'std'])
+    df['Win'] = df['Closed PnL'] > 0
+    df.groupby('classification')['Win'].mean()
+    df.groupby('classification')['Size USD'].agg(['mean', 'sum'])
+    df['value'].corr(df['Closed PnL'])
+    df['value'].corr(df['Size USD'])
+    top_traders = df.groupby('Account')['Size USD'].sum().nlargest(5).index
+    whales_df = df[df['Account'].isin(top_traders)]
+    whales_df.groupby('classification')['Win'].mean()
+    fear_df = df[df['classification'] == 'Extreme Fear']
+    fear_df['Win'].mean()
+    whales_df[whales_df['classification'] == 'Extreme Fear']['Win'].mean()
+
+
+def metrics_case(legacy):
+    """
+    Times only the report statistics, on trades loaded and merged beforehand.
+    """
+    def run(path):
+        trades = data_loader.load_trade_data(path, cache=False)
+        fg = data_loader.load_fear_greed(FEAR_GREED_PATH, cache=False)
+        merged = data_loader.merge_datasets(trades, fg)
+        t0 = time.perf_counter()
+        if legacy:
+            legacy_metrics(merged)
+        else:
+            analysis.compute_metrics(merged)
+        return {'seconds': time.perf_counter() - t0, 'rows': len(merged)}
+    return run
+
+
+def charts_case(workers, cache):
+    """
+    Times charts.render_charts on precomputed metrics. Output goes to a scratch
+    directory that persists between runs, so the cached case finds its PNGs.
+    """
+    def run(path):
+        trades = data_loader.load_trade_data(path, cache=False)
+        fg = data_loader.load_fear_greed(FEAR_GREED_PATH, cache=False)
+        merged = data_loader.merge_datasets(trades, fg)
+        metrics = analysis.compute_metrics(merged)
+        digest = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=6).hexdigest()
+        output_dir = os.path.join(tempfile.gettempdir(), f"trader_charts_{digest}")
+        os.makedirs(output_dir, exist_ok=True)
+        t0 = time.perf_counter()
+        drawn = charts.render_charts(metrics, merged, output_dir, workers, cache)
+        return {'seconds': time.perf_counter() - t0, 'rows': len(drawn)}
+    return run
+
+
+def backend_case(name, **options):
+    """
+    The report aggregation (partials and chart density) through one backend, end to end.
+    """
+    def run(path):
+        backend = backends.get_backend(name, **options)
+        partials, _ = backend.aggregate(path, FEAR_GREED_PATH)
+        return int(partials['count'].sum())
+    return run
+
+
+def breakdown_case(workers):
+    """
+    Times breakdown.compute_breakdown by Account on trades merged beforehand;
+    workers=None is the pandas groupby it replaces. Compare the worker counts
+    for scaling by core count.
+    """
+    def run(path):
+        trades = data_loader.load_trade_data(path, data_loader.ANALYSIS_COLUMNS, cache=False)
+        fg = data_loader.load_fear_greed(FEAR_GREED_PATH, cache=False)
+        merged = data_loader.merge_datasets(trades, fg)
+        t0 = time.perf_counter()
+        if workers is None:
+            df = merged[merged['classification'].notna()]
+            pnl = df['Closed PnL'].fillna(0)
+            groups = pnl.groupby([df['Account'], df['classification']], observed=True)
+            table = groups.agg(['count', 'sum', 'mean', 'std', 'median'])
+            groups.quantile([0.1, 0.9])
+            (pnl > 0).groupby([df['Account'], df['classification']], observed=True).mean()
+            df['Size USD'].groupby([df['Account'], df['classification']], observed=True).sum()
+        else:
+            table = breakdown.compute_breakdown(merged, 'Account', workers)
+        return {'seconds': time.perf_counter() - t0, 'rows': len(table)}
+    return run
+
+
+# Grid sweep of the backtest cases: level counts x ranges x sentiment gates.
+SWEEP = dict(levels=(10, 20, 30, 40, 50, 60, 70, 80, 90, 100),
+             ranges=(0.02, 0.05, 0.08, 0.1, 0.12, 0.15, 0.2, 0.25, 0.3, 0.4),
+             gates=((0, 100), (0, 45), (55, 100)))
+
+
+def loop_grid(prices, sentiment, levels, qty, gate, fee=backtest.GRID_FEE):
+    # Row-by-row replay of grid_engine's book, the loop simulate_grid replaces.
+    n = len(levels)
+    gap = min(range(n), key=lambda i: abs(levels[i] - prices[0]))
+    sides = [0 if i == gap else 1 if levels[i] < prices[0] else 2 for i in range(n)]
+    cash = position = 0.0
+    for price, value in zip(prices, sentiment):
+        if not gate[0] <= value <= gate[1]:
+            continue
+        for i in range(n - 1, -1, -1):
+            if sides[i] == 1 and price <= levels[i]:
+                sides[i], cash, position = 0, cash - qty * levels[i] * (1 + fee), position + qty
+                if i + 1 < n and sides[i + 1] == 0:
+                    sides[i + 1] = 2
+        for i in range(n):
+            if sides[i] == 2 and price >= levels[i]:
+                sides[i], cash, position = 0, cash + qty * levels[i] * (1 - fee), position - qty
+                if i > 0 and sides[i - 1] == 0:
+                    sides[i - 1] = 1
+    return cash + position * prices[-1]
+
+
+def backtest_case(workers):
+    """
+    Times a grid parameter sweep over the BTC trades (loaded beforehand);
+    rows is the number of combinations. workers=None runs the first few
+    combinations through loop_grid instead.
+    """
+    def run(path):
+        market = backtest.load_market(path, FEAR_GREED_PATH, 'BTC')
+        t0 = time.perf_counter()
+        if workers is None:
+            grid_prices, _ = backtest.bot_strategies()
+            prices, sentiment = market['price'].tolist(), market['sentiment'].tolist()
+            combos = [(count, width) for count in SWEEP['levels'][:2] for width in SWEEP['ranges'][:2]]
+            for count, width in combos:
+                levels = grid_prices(prices[0] * (1 - width), prices[0] * (1 + width), count)
+                loop_grid(prices, sentiment, levels, 1.0, (0, 100))
+            return {'seconds': time.perf_counter() - t0, 'rows': len(combos)}
+        results = backtest.sweep_grid(market, workers=workers, **SWEEP)
+        return {'seconds': time.perf_counter() - t0, 'rows': len(results)}
+    return run
+
+
+CASES = {
+    'legacy': legacy_load,
+    'typed': lambda path: data_loader.load_trade_data(path, cache=False),
+    'typed_all': lambda path: data_loader.load_trade_data(path, list(data_loader.TRADE_SCHEMA), cache=False),
+    'chunked': lambda path: data_loader.load_trade_data(path, chunksize=50_000, cache=False),
+    'stream': stream_total,
+    'cached': data_loader.load_trade_data,
+    'merge_legacy': merge_case('legacy'),
+    'merge_day': merge_case('day'),
+    'merge_asof': merge_case('asof'),
+    'metrics_legacy': metrics_case(legacy=True),
+    'metrics': metrics_case(legacy=False),
+    'charts_serial': charts_case(workers=1, cache=False),
+    'charts': charts_case(workers=None, cache=False),
+    'charts_cached': charts_case(workers=None, cache=True),
+    'backend_pandas': backend_case('pandas'),
+    'backend_chunked': backend_case('chunked'),
+    'backend_duckdb': backend_case('duckdb', threads=1),
+    'breakdown_pandas': breakdown_case(None),
+    'breakdown_w1': breakdown_case(1),
+    'breakdown_w2': breakdown_case(2),
+    'breakdown_w4': breakdown_case(4),
+    'breakdown_w8': breakdown_case(8),
+    'backtest_loop': backtest_case(None),
+    'backtest_w1': backtest_case(1),
+    'backtest_w2': backtest_case(2),
+    'backtest_w4': backtest_case(4),
+}
+# Cases timed on a warm cache: one untimed run first builds it.
+WARM_UP = ('cached', 'charts_cached')
+# Cases that replay price paths; on synthetic data they get write_market_trades' file.
+MARKET_CASES = ('backtest_loop', 'backtest_w1', 'backtest_w2', 'backtest_w4')
+MARKET_FILENAME = 'market_trades.csv'
+
+
+def peak_rss_mb():
+    # Linux carries ru_maxrss over from the parent across exec, so prefer the
+    # child's own high-water mark.
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(name, path):
+    """
+    Runs one case in this process and returns its timing and memory. Peak RSS
+    is reported above the post-import baseline so cases are comparable.
+    """
+    baseline = peak_rss_mb()
+    t0 = time.perf_counter()
+    result = CASES[name](path)
+    elapsed = time.perf_counter() - t0
+    out = {'seconds': elapsed, 'peak_rss_mb': peak_rss_mb() - baseline}
+    if isinstance(result, dict):
+        # Cases that time a single stage report their own seconds.
+        out.update(result)
+    elif isinstance(result, pd.DataFrame):
+        out['rows'] = len(result)
+        out['frame_mb'] = result.memory_usage(deep=True).sum() / 1e6
+    else:
+        out['rows'] = result
+    return out
+
+
+def measure(name, path, repeat):
+    """
+    Runs `name` `repeat` times, each in a fresh interpreter so peak RSS is per case.
+    """
+    runs = []
+    for _ in range(repeat + (name in WARM_UP)):
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--case', name, '--data', path],
+                              capture_output=True, text=True, check=True)
+        runs.append(json.loads(proc.stdout))
+    if name in WARM_UP:
+        runs = runs[1:]
+    result = dict(runs[-1])
+    result['seconds'] = statistics.median(r['seconds'] for r in runs)
+    result['peak_rss_mb'] = max(r['peak_rss_mb'] for r in runs)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trade data loading benchmarks: time and peak memory per loader")
+    parser.add_argument("--data", help="Trade CSV (default data/historical_data.csv, else a synthetic file)")
+    parser.add_argument("--rows", default="200000",
+                        help="Rows of synthetic data when --data is missing; a comma-separated list runs every size")
+    parser.add_argument("--only", default=','.join(CASES), help=f"Comma-separated subset of {','.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.data)))
+        return 0
+
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(selected) - set(CASES)
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.data or TRADE_PATH
+        market_paths = {}
+        if os.path.exists(path):
+            paths = [path]
+        else:
+            paths = []
+            for rows in (int(n) for n in args.rows.split(',')):
+                print(f"{path} not found, generating {rows} synthetic rows...", flush=True)
+                # One directory per size, so each gets its own Parquet cache.
+                os.makedirs(os.path.join(tmp, str(rows)))
+                paths.append(write_trades(os.path.join(tmp, str(rows), 'historical_data.csv'), rows))
+                if any(name in MARKET_CASES for name in selected):
+                    market_paths[paths[-1]] = write_market_trades(os.path.join(tmp, str(rows), MARKET_FILENAME), rows)
+        for path in paths:
+            print(f"\nData: {path} ({os.path.getsize(path) / 1e6:.1f} MB)\n")
+            print(f"{'case':<16} {'seconds':>8} {'peak MB':>8} {'frame MB':>9} {'rows':>9}")
+            for name in selected:
+                data = market_paths.get(path, path) if name in MARKET_CASES else path
+                r = measure(name, data, args.repeat)
+                frame = f"{r['frame_mb']:9.1f}" if 'frame_mb' in r else f"{'-':>9}"
+                print(f"{name:<16} {r['seconds']:8.3f} {r['peak_rss_mb']:8.1f} {frame} {r['rows']:9d}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
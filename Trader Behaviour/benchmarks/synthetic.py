@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# Shape of the real historical_data.csv: a few dozen accounts, a few hundred
+# coins, trades from 2023-05 to 2025-05 (inside the fear/greed index range).
+ACCOUNTS = 32
+COINS = 250
+START_MS = 1_683_000_000_000
+END_MS = 1_746_000_000_000
+DIRECTIONS = ['Buy', 'Sell', 'Open Long', 'Close Long', 'Open Short', 'Close Short']
+
+
+def make_trades(rows, seed=0):
+    """
+    Synthetic trades with the historical_data.csv columns and realistic
+    cardinalities, sorted by Timestamp like the exchange export.
+    """
+    rng = np.random.default_rng(seed)
+    accounts = np.array([f"0x{rng.bytes(20).hex()}" for _ in range(ACCOUNTS)])
+    coins = np.array(['BTC', 'ETH', 'SOL', 'HYPE'] + [f"@{i}" for i in range(COINS - 4)])
+    # Heavy-tailed activity: a few accounts and coins carry most trades.
+    account = accounts[np.minimum(rng.zipf(1.6, rows) - 1, ACCOUNTS - 1)]
+    coin = coins[np.minimum(rng.zipf(1.4, rows) - 1, COINS - 1)]
+    timestamp = np.sort(rng.integers(START_MS, END_MS, rows)).astype('float64')
+    price = np.round(rng.lognormal(3, 2.5, rows), 5)
+    size_tokens = np.round(rng.lognormal(2, 2, rows), 2)
+    size_usd = np.round(price * size_tokens, 2)
+    side = np.where(rng.random(rows) < 0.5, 'BUY', 'SELL')
+    closing = rng.random(rows) < 0.45
+    pnl = np.where(closing, np.round(rng.normal(40, 900, rows), 6), 0.0)
+    ist = pd.to_datetime(timestamp, unit='ms') + pd.Timedelta(hours=5, minutes=30)
+    return pd.DataFrame({
+        'Account': account,
+        'Coin': coin,
+        'Execution Price': price,
+        'Size Tokens': size_tokens,
+        'Size USD': size_usd,
+        'Side': side,
+        'Timestamp IST': ist.strftime('%d-%m-%Y %H:%M'),
+        'Start Position': np.round(rng.normal(0, 5000, rows), 4),
+        'Direction': np.array(DIRECTIONS)[rng.integers(0, len(DIRECTIONS), rows)],
+        'Closed PnL': pnl,
+        'Transaction Hash': [f"0x{h:064x}" for h in rng.integers(0, 2**63, rows)],
+        'Order ID': rng.integers(10**10, 10**11, rows),
+        'Crossed': rng.random(rows) < 0.6,
+        'Fee': np.round(size_usd * 0.00035, 6),
+        'Trade ID': rng.integers(10**14, 10**15, rows).astype('float64'),
+        'Timestamp': timestamp,
+    })
+
+
+def write_trades(path, rows, seed=0):
+    make_trades(rows, seed).to_csv(path, index=False)
+    return path
+
+
+def make_market_trades(rows, seed=0):
+    """
+    make_trades with each coin's price a random walk in trade order (from a
+    lognormal starting level), for the backtest cases: iid prices have no
+    path for a grid or TWAP to trade. Size USD and Fee follow the new
+    prices; the other columns are make_trades'.
+    """
+    df = make_trades(rows, seed)
+    rng = np.random.default_rng(seed + 1)
+    coin_index = pd.factorize(df['Coin'])[0]
+    log_path = pd.Series(rng.normal(0, 0.002, rows)).groupby(coin_index).cumsum().to_numpy()
+    price = np.round(rng.lognormal(3, 2.5, coin_index.max() + 1)[coin_index] * np.exp(log_path), 5)
+    df['Execution Price'] = price
+    df['Size USD'] = np.round(price * df['Size Tokens'], 2)
+    df['Fee'] = np.round(df['Size USD'] * 0.00035, 6)
+    return df
+
+
+def write_market_trades(path, rows, seed=0):
+    make_market_trades(rows, seed).to_csv(path, index=False)
+    return path
@@ -1,152 +1,302 @@
+import argparse
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import os
+import charts
 import data_loader
 
-def generate_report(merged_df, output_dir):
+# Per-(classification, account) sums every report metric is derived from.
+# All are plain sums, so partials from different slices of data add up.
+PARTIAL_COLUMNS = ['count', 'wins', 'pnl_sum', 'pnl_sumsq', 'volume', 'volume_sumsq',
+                   'value_sum', 'value_sumsq', 'value_pnl', 'value_volume']
+
+WHALE_COUNT = 5
+TARGET_SENTIMENT = 'Extreme Fear'
+
+
+class ReportMetrics:
     """
-    Generates analysis report and visualizations.
+    Numbers behind the analysis report, as pandas objects indexed by classification.
     """
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
 
-    # Convert numeric columns just in case
-    merged_df['Closed PnL'] = pd.to_numeric(merged_df['Closed PnL'], errors='coerce').fillna(0)
-    merged_df['Size USD'] = pd.to_numeric(merged_df['Size USD'], errors='coerce').fillna(0)
-    
-    # Filter out rows with Missing Classification (if any)
-    df = merged_df.dropna(subset=['classification'])
-    
+    def __init__(self, total_trades, pnl_stats, win_rate, volume_stats, corr_pnl, corr_vol,
+                 top_traders, whale_win_rate, target_sentiment, target_win_rate, whale_target_win_rate):
+        self.total_trades = total_trades
+        self.pnl_stats = pnl_stats              # mean, sum, count, std of Closed PnL
+        self.win_rate = win_rate
+        self.volume_stats = volume_stats        # mean, sum of Size USD
+        self.corr_pnl = corr_pnl                # Fear/Greed value vs Closed PnL
+        self.corr_vol = corr_vol                # Fear/Greed value vs Size USD
+        self.top_traders = top_traders          # accounts, by total Size USD
+        self.whale_win_rate = whale_win_rate
+        self.target_sentiment = target_sentiment
+        # None when no trades fall in target_sentiment.
+        self.target_win_rate = target_win_rate
+        self.whale_target_win_rate = whale_target_win_rate
+
+    def to_dict(self):
+        return {
+            'total_trades': self.total_trades,
+            'pnl_stats': self.pnl_stats.to_dict(orient='index'),
+            'win_rate': self.win_rate.to_dict(),
+            'volume_stats': self.volume_stats.to_dict(orient='index'),
+            'corr_pnl': self.corr_pnl,
+            'corr_vol': self.corr_vol,
+            'top_traders': list(self.top_traders),
+            'whale_win_rate': self.whale_win_rate.to_dict(),
+            'target_sentiment': self.target_sentiment,
+            'target_win_rate': self.target_win_rate,
+            'whale_target_win_rate': self.whale_target_win_rate,
+        }
+
+
+def _codes(series):
+    # Sorted group codes with missing values in an extra, last group.
+    codes, uniques = pd.factorize(series, sort=True)
+    codes = np.where(codes < 0, len(uniques), codes)
+    return codes, pd.Index(uniques)
+
+
+def compute_partials(merged_df):
+    """
+    One vectorized pass over the merged trades: every row is binned by its
+    (classification, account) code and each PARTIAL_COLUMNS sum is a bincount
+    over those shared codes. Rows without a classification are left out.
+    Returns a DataFrame indexed by (classification, Account).
+    """
+    pnl = pd.to_numeric(merged_df['Closed PnL'], errors='coerce').fillna(0).to_numpy(dtype='float64')
+    volume = pd.to_numeric(merged_df['Size USD'], errors='coerce').fillna(0).to_numpy(dtype='float64')
+    value = merged_df['value'].to_numpy(dtype='float64', na_value=np.nan)
+
+    cls_codes, classifications = _codes(merged_df['classification'])
+    acc_codes, accounts = _codes(merged_df['Account'])
+    # Account slot len(accounts) holds trades with no account: counted in totals, never ranked.
+    n_acc = len(accounts) + 1
+    group = cls_codes * n_acc + acc_codes
+    size = (len(classifications) + 1) * n_acc
+    # Unclassified rows have no index value; zero it so the weights stay finite.
+    value = np.where(cls_codes < len(classifications), value, 0.0)
+
+    def total(weights=None):
+        return np.bincount(group, weights=weights, minlength=size)
+
+    sums = {
+        'count': total(),
+        'wins': total(pnl > 0),
+        'pnl_sum': total(pnl),
+        'pnl_sumsq': total(pnl * pnl),
+        'volume': total(volume),
+        'volume_sumsq': total(volume * volume),
+        'value_sum': total(value),
+        'value_sumsq': total(value * value),
+        'value_pnl': total(value * pnl),
+        'value_volume': total(value * volume),
+    }
+    keep = (sums['count'] > 0) & (np.arange(size) < len(classifications) * n_acc)
+    cls_index = classifications.take(np.arange(size)[keep] // n_acc)
+    acc_index = np.arange(size)[keep] % n_acc
+    account_labels = pd.Index(list(accounts) + [None], dtype=object).take(acc_index)
+    partials = pd.DataFrame({name: sums[name][keep] for name in PARTIAL_COLUMNS},
+                            index=pd.MultiIndex.from_arrays([cls_index, account_labels],
+                                                            names=['classification', 'Account']))
+    for name in ('count', 'wins'):
+        partials[name] = partials[name].astype('int64')
+    return partials
+
+
+def empty_partials():
+    index = pd.MultiIndex.from_arrays([[], []], names=['classification', 'Account'])
+    return pd.DataFrame({name: np.zeros(0, dtype='int64' if name in ('count', 'wins') else 'float64')
+                         for name in PARTIAL_COLUMNS}, index=index)
+
+
+def merge_partials(a, b):
+    """
+    Adds two compute_partials() frames group by group.
+    """
+    merged = pd.concat([a, b]).groupby(level=['classification', 'Account'], sort=True, dropna=False).sum()
+    for name in ('count', 'wins'):
+        merged[name] = merged[name].astype('int64')
+    return merged
+
+
+def _corr(n, sx, sy, sxx, syy, sxy):
+    denom = np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    return float((n * sxy - sx * sy) / denom) if denom > 0 else float('nan')
+
+
+def metrics_from_partials(partials, whales=WHALE_COUNT, target_sentiment=TARGET_SENTIMENT):
+    """
+    Builds ReportMetrics from compute_partials() output (or a sum of partials).
+    """
+    by_cls = partials.groupby(level='classification', sort=True).sum()
+    count = by_cls['count']
+
+    pnl_mean = by_cls['pnl_sum'] / count
+    # Sample std (ddof=1), as pandas computes it; undefined for a single trade.
+    pnl_var = (by_cls['pnl_sumsq'] - by_cls['pnl_sum'] * pnl_mean) / (count - 1)
+    pnl_std = np.sqrt(pnl_var.clip(lower=0)).where(count > 1)
+    pnl_stats = pd.DataFrame({'mean': pnl_mean, 'sum': by_cls['pnl_sum'], 'count': count, 'std': pnl_std})
+    win_rate = by_cls['wins'] / count
+    volume_stats = pd.DataFrame({'mean': by_cls['volume'] / count, 'sum': by_cls['volume']})
+
+    t = by_cls.sum()
+    corr_pnl = _corr(t['count'], t['value_sum'], t['pnl_sum'], t['value_sumsq'], t['pnl_sumsq'], t['value_pnl'])
+    corr_vol = _corr(t['count'], t['value_sum'], t['volume'], t['value_sumsq'], t['volume_sumsq'], t['value_volume'])
+
+    ranked = partials[partials.index.get_level_values('Account').notna()]
+    account_volume = ranked['volume'].groupby(level='Account', sort=True).sum()
+    top_traders = account_volume.nlargest(whales).index
+    whale_rows = ranked[ranked.index.get_level_values('Account').isin(top_traders)]
+    whale_cls = whale_rows.groupby(level='classification', sort=True)[['count', 'wins']].sum()
+    whale_cls = whale_cls[whale_cls['count'] > 0]
+    whale_win_rate = whale_cls['wins'] / whale_cls['count']
+
+    target_win_rate = whale_target_win_rate = None
+    if target_sentiment in count.index and count[target_sentiment] > 0:
+        target_win_rate = float(win_rate[target_sentiment])
+        whale_target_win_rate = float(whale_win_rate.get(target_sentiment, 0))
+
+    for series in (win_rate, whale_win_rate):
+        series.name = None
+    return ReportMetrics(int(t['count']), pnl_stats, win_rate, volume_stats, corr_pnl, corr_vol,
+                         top_traders, whale_win_rate, target_sentiment, target_win_rate, whale_target_win_rate)
+
+
+def compute_metrics(merged_df, whales=WHALE_COUNT, target_sentiment=TARGET_SENTIMENT):
+    """
+    Computes every report metric from merged trades in one aggregation pass.
+    """
+    return metrics_from_partials(compute_partials(merged_df), whales, target_sentiment)
+
+
+def render_report(metrics):
+    """
+    The markdown report for `metrics`.
+    """
     report_lines = []
     report_lines.append("# Trader Behavior Analysis Report")
-    report_lines.append(f"Total Trades Analyzed: {len(df)}")
-    
+    report_lines.append(f"Total Trades Analyzed: {metrics.total_trades}")
+
     # 1. PnL by Sentiment
-    pnl_stats = df.groupby('classification')['Closed PnL'].agg(['mean', 'sum', 'count', 'std'])
     report_lines.append("\n## PnL by Market Sentiment")
-    report_lines.append(pnl_stats.to_string())
-    
+    report_lines.append(metrics.pnl_stats.to_string())
+
     # 2. Win Rate by Sentiment
-    df['Win'] = df['Closed PnL'] > 0
-    win_rate = df.groupby('classification')['Win'].mean()
     report_lines.append("\n## Win Rate by Market Sentiment")
-    report_lines.append(win_rate.to_string())
-    
+    report_lines.append(metrics.win_rate.to_string())
+
     # 3. Volume by Sentiment
-    volume_stats = df.groupby('classification')['Size USD'].agg(['mean', 'sum'])
     report_lines.append("\n## Volume (Size USD) by Market Sentiment")
-    report_lines.append(volume_stats.to_string())
-    
+    report_lines.append(metrics.volume_stats.to_string())
+
     # 4. Correlation Analysis
-    # Map classification to ordinal if needed, or just use 'value' (0-100)
-    corr_pnl = df['value'].corr(df['Closed PnL'])
-    corr_vol = df['value'].corr(df['Size USD'])
-    
     report_lines.append("\n## Correlation Analysis")
-    report_lines.append(f"- **Fear/Greed Index vs PnL**: {corr_pnl:.4f}")
-    report_lines.append(f"- **Fear/Greed Index vs Volume**: {corr_vol:.4f}")
+    report_lines.append(f"- **Fear/Greed Index vs PnL**: {metrics.corr_pnl:.4f}")
+    report_lines.append(f"- **Fear/Greed Index vs Volume**: {metrics.corr_vol:.4f}")
 
     # 5. Top Trader (Whale) Analysis
     report_lines.append("\n## Top Trader 'Whale' Analysis")
-    # Identify Top 5 Traders by Volume
-    top_traders = df.groupby('Account')['Size USD'].sum().nlargest(5).index
-    whales_df = df[df['Account'].isin(top_traders)]
-    
-    report_lines.append(f"Analyzing Top {len(top_traders)} Accounts by Volume.")
-    
-    # Whale Win Rate by Sentiment
-    whale_win_rate = whales_df.groupby('classification')['Win'].mean()
+    report_lines.append(f"Analyzing Top {len(metrics.top_traders)} Accounts by Volume.")
+
     report_lines.append("\n### Whale Win Rate by Market Sentiment")
-    report_lines.append(whale_win_rate.to_string())
-    
-    # Compare Whale vs All in Extreme Fear
-    target_sentiment = 'Extreme Fear'
-    if target_sentiment in df['classification'].values:
-        fear_df = df[df['classification'] == target_sentiment]
-        all_fear_win_rate = fear_df['Win'].mean()
-        
-        whale_fear_df = whales_df[whales_df['classification'] == target_sentiment]
-        whale_fear_win_rate = whale_fear_df['Win'].mean() if len(whale_fear_df) > 0 else 0
-        
-        report_lines.append(f"\n### Performance in '{target_sentiment}'")
-        report_lines.append(f"- **General Population Win Rate**: {all_fear_win_rate:.2%}")
-        report_lines.append(f"- **Top Traders (Whales) Win Rate**: {whale_fear_win_rate:.2%}")
+    report_lines.append(metrics.whale_win_rate.to_string())
+
+    target_sentiment = metrics.target_sentiment
+    report_lines.append(f"\n### Performance in '{target_sentiment}'")
+    if metrics.target_win_rate is not None:
+        report_lines.append(f"- **General Population Win Rate**: {metrics.target_win_rate:.2%}")
+        report_lines.append(f"- **Top Traders (Whales) Win Rate**: {metrics.whale_target_win_rate:.2%}")
     else:
-        report_lines.append(f"\n### Performance in '{target_sentiment}'")
         report_lines.append(f"- No trades occurred during '{target_sentiment}' periods in this dataset.")
-    
-    # Visualizations
-    
-    # Visualizations
-    
-    # Bar Chart: Avg PnL by Sentiment
-    plt.figure(figsize=(10, 6))
-    pnl_stats['mean'].plot(kind='bar', color='skyblue')
-    plt.title('Average PnL by Market Sentiment')
-    plt.ylabel('Average PnL (USD)')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'pnl_by_sentiment.png'))
-    plt.close()
-
-    # Bar Chart: Whale Win Rate
-    plt.figure(figsize=(10, 6))
-    whale_win_rate.plot(kind='bar', color='gold')
-    plt.title('Whale Win Rate by Market Sentiment')
-    plt.ylabel('Win Rate')
-    plt.ylim(0, 1)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'whale_win_rate.png'))
-    plt.close()
-    
-    # Bar Chart: Win Rate by Sentiment
-    plt.figure(figsize=(10, 6))
-    win_rate.plot(kind='bar', color='lightgreen')
-    plt.title('Win Rate by Market Sentiment')
-    plt.ylabel('Win Rate')
-    plt.ylim(0, 1)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'win_rate_by_sentiment.png'))
-    plt.close()
-    
-    # Scatter: Sentiment Value vs PnL (Sampled if too large)
-    plt.figure(figsize=(10, 6))
-    sample_df = df.sample(min(10000, len(df)))
-    
-    # Color by classification
-    groups = sample_df.groupby('classification')
-    for name, group in groups:
-        plt.plot(group['value'], group['Closed PnL'], marker='o', linestyle='', label=name, alpha=0.6)
-
-    plt.title('Fear/Greed Index vs PnL (Sampled 10k)')
-    plt.xlabel('Fear/Greed Index (0=Fear, 100=Greed)')
-    plt.ylabel('Closed PnL')
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, 'sentiment_vs_pnl.png'))
-    plt.close()
+    return '\n'.join(report_lines)
+
+
+def write_report(metrics, output_dir, merged_df=None, density=None, draw_charts=True, workers=None,
+                 chart_cache=True):
+    """
+    Writes report.md and the charts for `metrics` into `output_dir`. Charts
+    need the merged trades or a precomputed charts.sentiment_density.
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    if draw_charts:
+        drawn = charts.render_charts(metrics, merged_df, output_dir, workers, chart_cache, density)
+        print(f"Charts drawn: {', '.join(drawn) if drawn else 'none (unchanged)'}")
 
     # Save Report
     with open(os.path.join(output_dir, 'report.md'), 'w') as f:
-        f.write('\n'.join(report_lines))
-        
+        f.write(render_report(metrics))
+
     print(f"Report generated at {os.path.join(output_dir, 'report.md')}")
 
+
+def generate_report(merged_df, output_dir, draw_charts=True, workers=None, chart_cache=True):
+    """
+    Generates analysis report and visualizations.
+
+    Charts are drawn in parallel by charts.render_charts; unchanged ones are
+    skipped when `chart_cache` is set, and none are drawn without `draw_charts`.
+    """
+    metrics = compute_metrics(merged_df)
+    write_report(metrics, output_dir, merged_df, None, draw_charts, workers, chart_cache)
+    return metrics
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trader behaviour vs market sentiment report")
+    parser.add_argument("--no-charts", action="store_true", help="Only write report.md")
+    parser.add_argument("--redraw", action="store_true", help="Redraw charts even if their data is unchanged")
+    parser.add_argument("--workers", type=int, help="Processes for chart rendering and --breakdown (default: CPU count)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only process trades appended since the last --incremental run "
+                             "(a rewritten file is rebuilt from scratch)")
+    parser.add_argument("--rebuild", action="store_true", help="With --incremental, start the saved state over")
+    parser.add_argument("--backend", choices=['pandas', 'chunked', 'duckdb'],
+                        help="Aggregate through a pluggable backend (chunked/duckdb for files larger than RAM)")
+    parser.add_argument("--breakdown", choices=['Account', 'Coin'],
+                        help="Write per-account or per-coin sentiment tables instead of the report")
+    parser.add_argument("--top", type=int, default=20, help="With --breakdown, keys in the ranked tables")
+    parser.add_argument("--rank-by", default='pnl_sum', choices=['pnl_sum', 'volume', 'win_rate', 'count'],
+                        help="With --breakdown, ranking column")
+    args = parser.parse_args()
+
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     fg_path = os.path.join(base_dir, 'data', 'fear_greed_index.csv')
     trade_path = os.path.join(base_dir, 'data', 'historical_data.csv')
-    
-    print("Loading data...")
+
     try:
-        fg = data_loader.load_fear_greed(fg_path)
-        trades = data_loader.load_trade_data(trade_path)
-        merged = data_loader.merge_datasets(trades, fg)
-        
-        print("Generating report...")
-        generate_report(merged, base_dir)
-        
+        if args.breakdown:
+            import breakdown
+
+            print("Loading data...")
+            fg = data_loader.load_fear_greed(fg_path)
+            trades = data_loader.load_trade_data(trade_path, data_loader.ANALYSIS_COLUMNS)
+            merged = data_loader.merge_datasets(trades, fg)
+
+            print(f"Computing the per-{args.breakdown} breakdown...")
+            table = breakdown.compute_breakdown(merged, args.breakdown, args.workers)
+            breakdown.write_breakdown(table, base_dir, args.top, args.rank_by)
+        elif args.incremental:
+            import incremental
+
+            print("Updating incremental state...")
+            incremental.run(trade_path, fg_path, base_dir, args.rebuild, not args.no_charts, args.workers,
+                            not args.redraw)
+        elif args.backend:
+            import backends
+
+            print(f"Aggregating with the {args.backend} backend...")
+            backends.run(args.backend, trade_path, fg_path, base_dir, not args.no_charts, args.workers,
+                         not args.redraw)
+        else:
+            print("Loading data...")
+            fg = data_loader.load_fear_greed(fg_path)
+            trades = data_loader.load_trade_data(trade_path)
+            merged = data_loader.merge_datasets(trades, fg)
+
+            print("Generating report...")
+            generate_report(merged, base_dir, not args.no_charts, args.workers, not args.redraw)
+
     except Exception as e:
         print(f"Error: {e}")
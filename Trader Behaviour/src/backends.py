@@ -0,0 +1,211 @@
+import numpy as np
+import pandas as pd
+import analysis
+import charts
+import data_loader
+import parquet_cache
+
+# Trade columns the report aggregates read; nothing else is parsed.
+TRADE_COLUMNS = ['Account', 'Size USD', 'Closed PnL', 'Timestamp']
+
+
+class PandasBackend:
+    """
+    Whole file in memory: load, merge, compute_partials. Fastest while the
+    trades fit in RAM.
+    """
+
+    name = 'pandas'
+
+    def aggregate(self, trade_path, fg_path, with_density=True):
+        """
+        Returns (partials, density) for the report; density is None without `with_density`.
+        """
+        trades = data_loader.load_trade_data(trade_path, TRADE_COLUMNS)
+        merged = data_loader.merge_datasets(trades, data_loader.load_fear_greed(fg_path))
+        density = charts.sentiment_density(merged) if with_density else None
+        return analysis.compute_partials(merged), density
+
+
+class ChunkedBackend:
+    """
+    Streams the trades in chunks of `chunksize` rows (from the Parquet cache
+    when fresh, else the CSV), merging and aggregating each chunk and adding
+    the partials. Memory is bounded by one chunk whatever the file size.
+
+    The chart density needs its PnL range before binning, so it takes a
+    second pass; the range comes from a uniform sample of up to
+    `sample_size` PnL values (exact when the file has fewer rows).
+    """
+
+    name = 'chunked'
+
+    def __init__(self, chunksize=data_loader.CHUNK_ROWS, sample_size=1_000_000, seed=0):
+        self.chunksize = chunksize
+        self.sample_size = sample_size
+        self.seed = seed
+
+    def _merged_chunks(self, trade_path, fg):
+        for chunk in data_loader.iter_trade_data(trade_path, TRADE_COLUMNS, self.chunksize):
+            yield data_loader.merge_datasets(chunk, fg)
+
+    def aggregate(self, trade_path, fg_path, with_density=True):
+        fg = data_loader.load_fear_greed(fg_path)
+        rng = np.random.default_rng(self.seed)
+        partials = analysis.empty_partials()
+        sample_keys = np.empty(0)
+        sample = np.empty(0)
+        for merged in self._merged_chunks(trade_path, fg):
+            chunk_partials = analysis.compute_partials(merged)
+            partials = analysis.merge_partials(partials, chunk_partials)
+            if with_density:
+                # Bottom-k of random keys is a uniform sample of everything seen so far.
+                classified = merged['classification'].notna().to_numpy()
+                pnl = pd.to_numeric(merged['Closed PnL'], errors='coerce').fillna(0).to_numpy(dtype='float64')
+                sample = np.concatenate([sample, pnl[classified]])
+                sample_keys = np.concatenate([sample_keys, rng.random(int(classified.sum()))])
+                if len(sample) > self.sample_size:
+                    keep = np.argpartition(sample_keys, self.sample_size)[:self.sample_size]
+                    sample, sample_keys = sample[keep], sample_keys[keep]
+
+        if not with_density:
+            return partials, None
+        if len(sample):
+            pnl_range = tuple(np.quantile(sample, charts.PNL_QUANTILES))
+        else:
+            pnl_range = (-1.0, 1.0)
+        if pnl_range[0] == pnl_range[1]:
+            pnl_range = (pnl_range[0] - 1, pnl_range[1] + 1)
+        density = None
+        for merged in self._merged_chunks(trade_path, fg):
+            chunk_density = charts.sentiment_density(merged, pnl_range=pnl_range)
+            density = chunk_density if density is None else charts.merge_density(density, chunk_density)
+        return partials, density
+
+
+class DuckDBBackend:
+    """
+    Runs the scan, day-key join, classification filter and the
+    (classification, account) aggregation as one DuckDB query. DuckDB reads
+    only the referenced columns, streams the file and spills to disk past
+    `memory_limit`. Reads the Parquet cache when fresh, else the CSV.
+    Requires the optional 'duckdb' package.
+    """
+
+    name = 'duckdb'
+
+    def __init__(self, memory_limit=None, threads=None):
+        self.memory_limit = memory_limit
+        self.threads = threads
+
+    def _connect(self):
+        try:
+            import duckdb
+        except ImportError:
+            raise RuntimeError("The duckdb backend requires the 'duckdb' package (pip install duckdb).")
+        config = {}
+        if self.memory_limit:
+            config['memory_limit'] = self.memory_limit
+        if self.threads:
+            config['threads'] = self.threads
+        return duckdb.connect(config=config)
+
+    def _trades_sql(self, trade_path):
+        path = trade_path.replace("'", "''")
+        if parquet_cache.is_fresh(trade_path, data_loader.TRADE_SCHEMA):
+            cached, _ = parquet_cache.cache_paths(trade_path)
+            source = f"read_parquet('{cached.replace(chr(39), chr(39) * 2)}')"
+        else:
+            types = ', '.join(f"'{c}': 'DOUBLE'" for c in ('Size USD', 'Closed PnL', 'Timestamp'))
+            source = f"read_csv('{path}', header=true, types={{{types}}})"
+        # Same day key as data_loader.day_number: whole UTC days since the epoch.
+        return f"""
+            SELECT "Account" AS account,
+                   coalesce("Closed PnL", 0) AS pnl,
+                   coalesce("Size USD", 0) AS volume,
+                   CAST(floor("Timestamp" / 86400000) AS BIGINT) AS day
+            FROM {source}
+        """
+
+    def aggregate(self, trade_path, fg_path, with_density=True):
+        fg = data_loader.load_fear_greed(fg_path).drop_duplicates('day', keep='last')
+        fg = fg.loc[fg['classification'].notna(), ['day', 'value', 'classification']]
+        fg = fg.astype({'value': 'float64', 'classification': object})
+        con = self._connect()
+        try:
+            con.register('fear_greed', fg)
+            joined = f"""
+                SELECT t.account, t.pnl, t.volume, f.value, f.classification
+                FROM ({self._trades_sql(trade_path)}) t
+                JOIN fear_greed f ON t.day = f.day
+            """
+            partials = con.execute(f"""
+                SELECT classification, account AS "Account",
+                       count(*) AS count,
+                       count(*) FILTER (WHERE pnl > 0) AS wins,
+                       sum(pnl) AS pnl_sum, sum(pnl * pnl) AS pnl_sumsq,
+                       sum(volume) AS volume, sum(volume * volume) AS volume_sumsq,
+                       sum(value) AS value_sum, sum(value * value) AS value_sumsq,
+                       sum(value * pnl) AS value_pnl, sum(value * volume) AS value_volume
+                FROM ({joined})
+                GROUP BY ALL
+            """).df()
+            density = self._density(con, joined) if with_density else None
+        finally:
+            con.close()
+
+        partials['Account'] = partials['Account'].astype(object).where(partials['Account'].notna(), None)
+        partials = partials.set_index(['classification', 'Account']).sort_index()[analysis.PARTIAL_COLUMNS]
+        for name in ('count', 'wins'):
+            partials[name] = partials[name].astype('int64')
+        return partials, density
+
+    def _density(self, con, joined):
+        x_bins, y_bins = charts.DENSITY_BINS
+        low_q, high_q = charts.PNL_QUANTILES
+        total, low, high = con.execute(
+            f"SELECT count(*), quantile_cont(pnl, {low_q}), quantile_cont(pnl, {high_q}) FROM ({joined})"
+        ).fetchone()
+        if not total:
+            low, high = -1.0, 1.0
+        if low == high:
+            low, high = low - 1, high + 1
+        # Bin indices as np.histogram2d computes them: uniform bins, last edge inclusive,
+        # PnL clipped into range, index values outside [0, 100] dropped.
+        rows = con.execute(f"""
+            SELECT least(CAST(floor(value / (100.0 / {x_bins})) AS INTEGER), {x_bins - 1}) AS x,
+                   least(CAST(floor((least(greatest(pnl, {low}), {high}) - {low}) / (({high} - {low}) / {y_bins}))
+                         AS INTEGER), {y_bins - 1}) AS y,
+                   count(*) AS n
+            FROM ({joined})
+            WHERE value BETWEEN 0 AND 100
+            GROUP BY ALL
+        """).fetchall()
+        counts = np.zeros((x_bins, y_bins), dtype='int64')
+        for x, y, n in rows:
+            counts[x, y] = n
+        return {'counts': counts, 'x_edges': np.linspace(0, 100, x_bins + 1),
+                'y_edges': np.linspace(low, high, y_bins + 1), 'total': int(total)}
+
+
+BACKENDS = {backend.name: backend for backend in (PandasBackend, ChunkedBackend, DuckDBBackend)}
+
+
+def get_backend(name, **options):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[name](**options)
+
+
+def run(backend, trade_path, fg_path, output_dir, draw_charts=True, workers=None, chart_cache=True):
+    """
+    analysis.generate_report through `backend` (a name or instance): the
+    backend produces the partial aggregates, the rest is shared. Returns the metrics.
+    """
+    if isinstance(backend, str):
+        backend = get_backend(backend)
+    partials, density = backend.aggregate(trade_path, fg_path, with_density=draw_charts)
+    metrics = analysis.metrics_from_partials(partials)
+    analysis.write_report(metrics, output_dir, density=density, draw_charts=draw_charts,
+                          workers=workers, chart_cache=chart_cache)
+    return metrics
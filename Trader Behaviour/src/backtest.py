@@ -0,0 +1,281 @@
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import charts
+import data_loader
+
+# binance_bot sits next to this project; its strategy helpers are imported from there.
+BOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'binance_bot')
+MARKET_COLUMNS = ['Coin', 'Execution Price', 'Timestamp']
+# Resting grid orders pay the maker fee; TWAP slices are market orders and pay taker.
+GRID_FEE = 0.0002
+TWAP_FEE = 0.0005
+TWAP_SLIPPAGE_BPS = 1.0
+# Quote notional spread over a grid's levels, so grids of different sizes compare.
+GRID_NOTIONAL = 10_000
+# Jobs per worker: several small batches even out combinations of different cost.
+JOBS_PER_WORKER = 4
+
+# Market arrays in each sweep worker, set once by _init_worker.
+_market = {}
+
+
+def bot_strategies():
+    """
+    (grid_prices, twap_slices) from binance_bot, imported on first use.
+    """
+    if BOT_DIR not in sys.path:
+        sys.path.append(BOT_DIR)
+    try:
+        from src.advanced.grid_strategy import grid_prices
+        from src.advanced.twap import twap_slices
+    except ImportError as e:
+        raise RuntimeError(f"The backtester reuses binance_bot's strategies; install its requirements ({e}).")
+    return grid_prices, twap_slices
+
+
+def load_market(trade_path, fg_path, coin):
+    """
+    The trade-by-trade price path of `coin` in historical_data.csv, in time
+    order, with the fear/greed index value of each trade's day (NaN where the
+    index has no entry). Returns a DataFrame: Timestamp, price, sentiment.
+    """
+    trades = data_loader.load_trade_data(trade_path, MARKET_COLUMNS)
+    trades = trades[trades['Coin'] == coin]
+    if trades.empty:
+        raise ValueError(f"No trades for {coin} in {trade_path}")
+    merged = data_loader.merge_datasets(trades, data_loader.load_fear_greed(fg_path))
+    merged = merged.sort_values('Timestamp', kind='stable')
+    return pd.DataFrame({
+        'Timestamp': merged['Timestamp'].to_numpy(dtype='float64'),
+        'price': merged['Execution Price'].to_numpy(dtype='float64'),
+        'sentiment': merged['value'].to_numpy(dtype='float64', na_value=np.nan),
+    })
+
+
+def _gated(sentiment, gate):
+    low, high = gate
+    return (sentiment >= low) & (sentiment <= high)
+
+
+def running_clamp(start, low, high):
+    """
+    g[t] = clip(g[t-1], low[t], high[t]) with g[-1] = `start`, for every t at once.
+
+    Two clamps applied in turn are again a clamp, so the running clamp is a
+    prefix scan: log2(len) vectorized passes instead of a loop over rows.
+    """
+    low, high = low.copy(), high.copy()
+    shift = 1
+    while shift < len(low):
+        # Apply the clamp ending `shift` rows earlier first, then the one ending here.
+        low[shift:], high[shift:] = (np.clip(low[:-shift], low[shift:], high[shift:]),
+                                     np.clip(high[:-shift], low[shift:], high[shift:]))
+        shift *= 2
+    return np.clip(start, low, high)
+
+
+def simulate_grid(prices, sentiment, levels, qty, gate=(0, 100), through=0.0, fee=GRID_FEE):
+    """
+    Replays grid_engine's dynamic grid over `prices`.
+
+    The engine leaves the level nearest the start price empty, with BUYs below
+    and SELLs above; a filled BUY re-places a SELL one level up and a filled
+    SELL a BUY one level down, which moves the empty level to the fill. The
+    book is therefore just the index of the empty level. After each trade
+    it is clamped between the highest SELL the price reached and the lowest
+    BUY it reached, computed for all trades by running_clamp.
+
+    Fill model: a BUY at L fills once a trade prints at or below
+    L * (1 - through), a SELL at or above L * (1 + through), at the limit
+    price, paying `fee` on the notional. While the index value is outside
+    `gate` (or unknown) the grid is paused and nothing fills.
+    """
+    levels = np.asarray(levels, dtype='float64')
+    n = len(levels)
+    low = np.clip(np.searchsorted(levels * (1 + through), prices, 'right') - 1, 0, n - 1)
+    high = np.clip(np.searchsorted(levels * (1 - through), prices, 'left'), 0, n - 1)
+    paused = ~_gated(sentiment, gate)
+    low[paused], high[paused] = 0, n - 1
+
+    start = int(np.argmin(np.abs(levels - prices[0])))
+    # Repeating a clamp changes nothing, so the scan only needs the trades where the bounds move.
+    moved = np.ones(len(low), dtype=bool)
+    moved[1:] = (low[1:] != low[:-1]) | (high[1:] != high[:-1])
+    gap = running_clamp(start, low[moved], high[moved])[np.cumsum(moved) - 1]
+    previous = np.concatenate([[start], gap[:-1]])
+    # Filling every level between two gap positions costs a prefix-sum difference.
+    prefix = np.concatenate([[0.0], np.cumsum(levels)])
+    sold = np.where(gap > previous, prefix[gap + 1] - prefix[previous + 1], 0.0)
+    bought = np.where(gap < previous, prefix[previous] - prefix[gap], 0.0)
+    cash = np.cumsum(qty * (sold - bought) - fee * qty * (sold + bought))
+    position = (start - gap) * qty
+    equity = cash + position * prices
+    return {
+        'pnl': float(equity[-1]),
+        'fills': int(np.abs(gap - previous).sum()),
+        'fees': float(fee * qty * (sold + bought).sum()),
+        'max_position': float(np.abs(position).max()),
+        'max_drawdown': float((np.maximum.accumulate(equity) - equity).max()),
+        'active': float(1 - paused.mean()),
+    }
+
+
+def simulate_twap(times, prices, sentiment, slices, duration_s, side='BUY', starts=None, gate=(0, 100),
+                  slippage_bps=TWAP_SLIPPAGE_BPS, fee=TWAP_FEE):
+    """
+    Replays execute_twap for a parent order started at each of `starts`
+    (ms timestamps; default one per day of data).
+
+    Slice i goes out at start + i * duration_s / len(slices), sized by
+    `slices` (from twap_slices), and fills as a market order at the first
+    trade at or after that time, `slippage_bps` against the order. Parents
+    whose start is outside the sentiment `gate`, or that would outlast the
+    data, are not run. Cost is the average fill against the arrival price
+    (first trade at the start), plus fees, in basis points.
+    """
+    slices = np.asarray(slices, dtype='float64')
+    duration_ms = duration_s * 1000
+    if starts is None:
+        starts = np.arange(times[0], times[-1] - duration_ms, 86_400_000)
+    schedule = np.asarray(starts, dtype='float64')[:, None] + np.arange(len(slices)) * duration_ms / len(slices)
+    at = np.searchsorted(times, schedule, 'left')
+    at = at[at[:, -1] < len(times)]
+    at = at[_gated(sentiment[at[:, 0]], gate)]
+
+    sign = 1 if side.upper() == 'BUY' else -1
+    fills = prices[at] * (1 + sign * slippage_bps / 10_000)
+    average = fills @ slices / slices.sum()
+    arrival = prices[at[:, 0]]
+    cost_bps = sign * (average - arrival) / arrival * 10_000 + fee * 10_000
+    return {
+        'parents': int(len(at)),
+        'cost_bps': float(cost_bps.mean()) if len(at) else float('nan'),
+        'cost_std_bps': float(cost_bps.std()) if len(at) else float('nan'),
+        'worst_bps': float(cost_bps.max()) if len(at) else float('nan'),
+    }
+
+
+def _init_worker(market):
+    _market.update(market)
+
+
+def _run_jobs(jobs):
+    results = []
+    for kind, params, args in jobs:
+        if kind == 'grid':
+            result = simulate_grid(_market['price'], _market['sentiment'], *args)
+        else:
+            result = simulate_twap(_market['Timestamp'], _market['price'], _market['sentiment'], *args)
+        results.append(dict(params, **result))
+    return results
+
+
+def _sweep(market, jobs, workers):
+    arrays = {name: market[name].to_numpy(dtype='float64') for name in ('Timestamp', 'price', 'sentiment')}
+    workers = min(workers or charts.cpu_count(), len(jobs)) or 1
+    if workers > 1:
+        size = -(-len(jobs) // (workers * JOBS_PER_WORKER))
+        batches = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+        # The market arrays go to each worker once, not with every batch.
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(arrays,)) as pool:
+            results = [row for batch in pool.map(_run_jobs, batches) for row in batch]
+    else:
+        _init_worker(arrays)
+        results = _run_jobs(jobs)
+    return pd.DataFrame(results)
+
+
+def sweep_grid(market, levels=(10, 20, 50), ranges=(0.05, 0.1, 0.2), gates=((0, 100),), through=0.0,
+               notional=GRID_NOTIONAL, workers=None):
+    """
+    simulate_grid for every combination of level count, range (fraction
+    above and below the first price) and sentiment gate, on up to `workers`
+    processes. Level prices come from binance_bot's grid_prices; combinations
+    whose rounded levels collide are skipped. Returns a DataFrame, best PnL first.
+    """
+    grid_prices, _ = bot_strategies()
+    start = float(market['price'].iloc[0])
+    jobs = []
+    for count, width, gate in itertools.product(levels, ranges, gates):
+        prices = grid_prices(start * (1 - width), start * (1 + width), count)
+        if len(set(prices)) != len(prices):
+            continue
+        params = {'levels': count, 'range': width, 'gate': f"{gate[0]:g}-{gate[1]:g}"}
+        jobs.append(('grid', params, (prices, notional / count / start, gate, through)))
+    if not jobs:
+        raise ValueError("Every grid's levels collide after rounding; use fewer levels or wider ranges.")
+    results = _sweep(market, jobs, workers)
+    return results.sort_values('pnl', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def sweep_twap(market, total_qty, side='BUY', durations=(600, 3600), orders=(6, 12), gates=((0, 100),),
+               slippage_bps=TWAP_SLIPPAGE_BPS, workers=None):
+    """
+    simulate_twap for every combination of duration (seconds), slice count
+    and sentiment gate. Slice sizes come from binance_bot's twap_slices; a
+    parent quantity below one step is rejected, as every slice would be empty.
+    Returns a DataFrame, cheapest first.
+    """
+    _, twap_slices = bot_strategies()
+    if not sum(twap_slices(total_qty, 1)):
+        raise ValueError(f"Parent quantity {total_qty} is below one step; every slice would be empty.")
+    jobs = []
+    for duration, count, gate in itertools.product(durations, orders, gates):
+        slices = [float(qty) for qty in twap_slices(total_qty, count)]
+        params = {'duration_s': duration, 'orders': count, 'gate': f"{gate[0]:g}-{gate[1]:g}"}
+        jobs.append(('twap', params, (slices, duration, side, None, gate, slippage_bps)))
+    results = _sweep(market, jobs, workers)
+    return results.sort_values('cost_bps', kind='stable').reset_index(drop=True)
+
+
+def _numbers(text, kind=float):
+    return [kind(value) for value in text.split(',')]
+
+
+def _gates(text):
+    return [tuple(float(bound) for bound in gate.split('-')) for gate in text.split(',')]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest the binance_bot strategies on historical trades")
+    parser.add_argument("strategy", choices=['grid', 'twap'])
+    parser.add_argument("--coin", default='BTC')
+    parser.add_argument("--gates", default='0-100', help="Fear/greed ranges to trade in, e.g. 0-100,0-45,55-100")
+    parser.add_argument("--levels", default='10,20,50', help="grid: level counts")
+    parser.add_argument("--ranges", default='0.05,0.1,0.2', help="grid: fractions above/below the first price")
+    parser.add_argument("--through", type=float, default=0.0,
+                        help="grid: fraction the price must trade through a level to fill it")
+    parser.add_argument("--side", default='BUY', choices=['BUY', 'SELL'], help="twap: order side")
+    parser.add_argument("--qty", type=float, default=1.0, help="twap: parent quantity")
+    parser.add_argument("--durations", default='600,3600', help="twap: durations in seconds")
+    parser.add_argument("--orders", default='6,12', help="twap: slice counts")
+    parser.add_argument("--workers", type=int, help="Processes for the sweep (default: CPU count)")
+    parser.add_argument("--top", type=int, default=20, help="Rows of the ranked table to print")
+    parser.add_argument("--output", help="Also write every result to this CSV")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    fg_path = os.path.join(base_dir, 'data', 'fear_greed_index.csv')
+    trade_path = os.path.join(base_dir, 'data', 'historical_data.csv')
+
+    try:
+        print(f"Loading {args.coin} prices...")
+        market = load_market(trade_path, fg_path, args.coin)
+        if args.strategy == 'grid':
+            results = sweep_grid(market, _numbers(args.levels, int), _numbers(args.ranges), _gates(args.gates),
+                                 args.through, workers=args.workers)
+        else:
+            results = sweep_twap(market, args.qty, args.side, _numbers(args.durations), _numbers(args.orders, int),
+                                 _gates(args.gates), workers=args.workers)
+        print(f"{len(results)} combinations over {len(market)} trades:")
+        print(results.head(args.top).to_string())
+        if args.output:
+            results.to_csv(args.output, index=False)
+
+    except Exception as e:
+        print(f"Error: {e}")
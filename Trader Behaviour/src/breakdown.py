@@ -0,0 +1,210 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import charts
+
+# Statistics per (key, classification): win rate, PnL distribution and volume.
+BREAKDOWN_COLUMNS = ['count', 'wins', 'win_rate', 'pnl_sum', 'pnl_mean', 'pnl_std',
+                     'pnl_p10', 'pnl_median', 'pnl_p90', 'volume']
+QUANTILES = (0.1, 0.5, 0.9)
+RANK_COLUMNS = ['pnl_sum', 'volume', 'win_rate', 'count']
+TOP_N = 20
+# Shards per worker: several smaller shards even out accounts of very different sizes.
+SHARDS_PER_WORKER = 4
+
+# Column views of the shared-memory block, set in each worker by _attach.
+_shared = {}
+
+
+def _columns(merged_df, by):
+    """
+    Key code, bucket code, PnL and volume of every classified trade that has a
+    `by` value, sorted by key code so that each key is one contiguous range.
+    Buckets are ordered from fear to greed by their mean index value.
+    """
+    key_codes, keys = pd.factorize(merged_df[by], sort=True)
+    cls_codes, classifications = pd.factorize(merged_df['classification'])
+    keep = (key_codes >= 0) & (cls_codes >= 0)
+    key_codes, cls_codes = key_codes[keep], cls_codes[keep]
+    value = merged_df['value'].to_numpy(dtype='float64', na_value=np.nan)[keep]
+    mean_value = np.bincount(cls_codes, weights=value) / np.bincount(cls_codes)
+    fear_to_greed = np.argsort(mean_value, kind='stable')
+    bucket_rank = np.empty(len(fear_to_greed), dtype='int16')
+    bucket_rank[fear_to_greed] = np.arange(len(fear_to_greed))
+    buckets = pd.Index(classifications).take(fear_to_greed)
+
+    def numeric(name):
+        return pd.to_numeric(merged_df[name], errors='coerce').fillna(0).to_numpy(dtype='float64')[keep]
+
+    order = np.argsort(key_codes, kind='stable')
+    columns = {
+        'key': key_codes[order].astype('int32'),
+        'bucket': bucket_rank[cls_codes[order]],
+        'pnl': numeric('Closed PnL')[order],
+        'volume': numeric('Size USD')[order],
+    }
+    return columns, pd.Index(keys, name=by), pd.Index(buckets.astype(str), name='classification')
+
+
+def _shard_bounds(key, shards):
+    # Row offsets of `shards` ranges of about equal size, cut only where the key changes.
+    key_starts = np.flatnonzero(np.diff(key)) + 1
+    targets = np.arange(1, shards) * len(key) // shards
+    cuts = key_starts[np.minimum(np.searchsorted(key_starts, targets), len(key_starts) - 1)] if len(key_starts) else []
+    bounds = np.unique(np.concatenate([[0], cuts, [len(key)]])).astype('int64')
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _group_stats(key, bucket, pnl, volume, n_buckets):
+    """
+    BREAKDOWN_COLUMNS for every (key, bucket) group of rows that hold whole keys.
+    Sorting by (key, bucket, pnl) makes each group a run of sorted PnL, so the
+    sums are reduceat calls and the quantiles are direct lookups.
+    """
+    order = np.lexsort((pnl, bucket, key))
+    group = key[order].astype('int64') * n_buckets + bucket[order]
+    pnl, volume = pnl[order], volume[order]
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(group)) + 1]) if len(group) else np.zeros(0, 'int64')
+    count = np.diff(np.append(starts, len(group)))
+
+    def total(values):
+        return np.add.reduceat(values, starts) if len(starts) else np.zeros(0)
+
+    pnl_sum = total(pnl)
+    pnl_mean = pnl_sum / np.maximum(count, 1)
+    # Sample std (ddof=1), as pandas computes it; undefined for a single trade.
+    pnl_var = total((pnl - np.repeat(pnl_mean, count)) ** 2) / np.maximum(count - 1, 1)
+    stats = {
+        'group': group[starts],
+        'count': count,
+        'wins': total((pnl > 0).astype('int64')),
+        'pnl_sum': pnl_sum,
+        'pnl_mean': pnl_mean,
+        'pnl_std': np.where(count > 1, np.sqrt(pnl_var), np.nan),
+        'volume': total(volume),
+    }
+    # Linear interpolation between the closest ranks, as np.quantile does.
+    for q, name in zip(QUANTILES, ('pnl_p10', 'pnl_median', 'pnl_p90')):
+        position = q * (count - 1)
+        low = np.floor(position).astype('int64')
+        high = np.ceil(position).astype('int64')
+        stats[name] = pnl[starts + low] + (pnl[starts + high] - pnl[starts + low]) * (position - low)
+    return stats
+
+
+def _attach(name, layout):
+    shm = shared_memory.SharedMemory(name=name)
+    _shared['shm'] = shm
+    for column, (dtype, offset, length) in layout.items():
+        _shared[column] = np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=offset)
+
+
+def _shard_task(task):
+    start, end, n_buckets = task
+    return _group_stats(_shared['key'][start:end], _shared['bucket'][start:end], _shared['pnl'][start:end],
+                        _shared['volume'][start:end], n_buckets)
+
+
+def _to_shared(columns):
+    # One shared-memory block holding every column; workers map it instead of unpickling copies.
+    layout, offset = {}, 0
+    for name, values in columns.items():
+        layout[name] = (values.dtype.str, offset, len(values))
+        offset += values.nbytes + (-values.nbytes) % 8
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, values in columns.items():
+        dtype, start, length = layout[name]
+        np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=start)[:] = values
+    return shm, layout
+
+
+def compute_breakdown(merged_df, by='Account', workers=None):
+    """
+    Win rate, PnL distribution (mean, std, p10/median/p90) and volume of every
+    `by` value (Account or Coin) in every sentiment classification.
+
+    The trades are sorted by `by` and cut into shards of whole keys, so each
+    group's statistics, quantiles included, come from one shard and are exact.
+    With more than one worker the shards run in a process pool that reads the
+    columns from shared memory; only row ranges and small results are pickled.
+    Returns a DataFrame indexed by (`by`, classification).
+    """
+    columns, keys, buckets = _columns(merged_df, by)
+    workers = workers or charts.cpu_count()
+    bounds = _shard_bounds(columns['key'], workers * SHARDS_PER_WORKER) if workers > 1 else [(0, len(columns['key']))]
+    # No trades means no bounds; one empty task still yields the empty frame.
+    tasks = [(start, end, len(buckets)) for start, end in bounds] or [(0, 0, len(buckets))]
+
+    if workers > 1 and len(tasks) > 1:
+        shm, layout = _to_shared(columns)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                     initargs=(shm.name, layout)) as pool:
+                results = list(pool.map(_shard_task, tasks))
+        finally:
+            shm.close()
+            shm.unlink()
+    else:
+        results = [_group_stats(columns['key'][start:end], columns['bucket'][start:end],
+                                columns['pnl'][start:end], columns['volume'][start:end], n_buckets)
+                   for start, end, n_buckets in tasks]
+
+    stats = {name: np.concatenate([r[name] for r in results]) for name in results[0]}
+    group = stats.pop('group')
+    index = pd.MultiIndex.from_arrays([keys.take(group // len(buckets)), buckets.take(group % len(buckets))],
+                                      names=[by, 'classification'])
+    breakdown = pd.DataFrame(stats, index=index)
+    breakdown['win_rate'] = breakdown['wins'] / breakdown['count']
+    return breakdown[BREAKDOWN_COLUMNS]
+
+
+def rank(breakdown, top=TOP_N, rank_by='pnl_sum'):
+    """
+    Totals over all classifications of the `top` keys by `rank_by`, best first.
+    """
+    if rank_by not in RANK_COLUMNS:
+        raise ValueError(f"Cannot rank by {rank_by!r}; choose from {', '.join(RANK_COLUMNS)}")
+    by = breakdown.index.names[0]
+    totals = breakdown.groupby(level=by, sort=True)[['count', 'wins', 'pnl_sum', 'volume']].sum()
+    totals['win_rate'] = totals['wins'] / totals['count']
+    totals = totals.sort_values(rank_by, ascending=False, kind='stable').head(top)
+    totals.insert(0, 'rank', np.arange(1, len(totals) + 1))
+    return totals[['rank', 'count', 'win_rate', 'pnl_sum', 'volume']]
+
+
+def render_breakdown(breakdown, top=TOP_N, rank_by='pnl_sum'):
+    """
+    Markdown tables for the `top` keys: totals, then win rate, median PnL and
+    volume per classification (classifications ordered from fear to greed).
+    """
+    by = breakdown.index.names[0]
+    ranked = rank(breakdown, top, rank_by)
+    buckets = breakdown.index.get_level_values('classification').unique()
+    rows = breakdown[breakdown.index.get_level_values(by).isin(ranked.index)]
+
+    def pivot(column):
+        table = rows[column].unstack('classification')
+        return table.reindex(index=ranked.index, columns=[b for b in buckets if b in table.columns])
+
+    lines = [f"# Per-{by} Sentiment Breakdown",
+             f"Top {len(ranked)} of {breakdown.index.get_level_values(by).nunique()} by {rank_by}.",
+             "\n## Totals", ranked.to_string(),
+             "\n## Win Rate by Market Sentiment", pivot('win_rate').to_string(),
+             "\n## Median PnL by Market Sentiment", pivot('pnl_median').to_string(),
+             "\n## Volume (Size USD) by Market Sentiment", pivot('volume').to_string()]
+    return '\n'.join(lines)
+
+
+def write_breakdown(breakdown, output_dir, top=TOP_N, rank_by='pnl_sum'):
+    """
+    Writes breakdown_<by>.md (ranked top-N tables) and breakdown_<by>.csv (every
+    key and classification) into `output_dir`.
+    """
+    name = f"breakdown_{breakdown.index.names[0].lower()}"
+    os.makedirs(output_dir, exist_ok=True)
+    breakdown.to_csv(os.path.join(output_dir, f"{name}.csv"))
+    with open(os.path.join(output_dir, f"{name}.md"), 'w') as f:
+        f.write(render_breakdown(breakdown, top, rank_by))
+    print(f"Breakdown written to {os.path.join(output_dir, name + '.md')} and {name}.csv")
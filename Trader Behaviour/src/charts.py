@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Bump when chart styling changes so cached PNGs are redrawn.
+CHART_VERSION = 1
+# Chart keys of the last render, next to the PNGs.
+CACHE_FILE = '.charts.json'
+# Density grid of the sentiment-vs-PnL chart: drawing cost depends only on
+# these, not on the number of trades.
+DENSITY_BINS = (50, 60)
+# PnL range shown: quantiles of Closed PnL, so a few outliers don't flatten the plot.
+PNL_QUANTILES = (0.005, 0.995)
+
+
+def _new_figure():
+    # Object-oriented Agg figure: no pyplot state, safe in worker processes and without a display.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _bar_chart(path, labels, values, title, ylabel, color, ylim=None):
+    figure = _new_figure()
+    ax = figure.add_subplot()
+    ax.bar(range(len(values)), values, color=color, width=0.5)
+    ax.set_xticks(range(len(labels)), labels, rotation=45)
+    ax.set_xlabel('classification')
+    ax.set_title(title)
+    ax.set_ylabel(ylabel)
+    if ylim is not None:
+        ax.set_ylim(*ylim)
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def _density_chart(path, counts, x_edges, y_edges, total):
+    from matplotlib.colors import LogNorm
+
+    figure = _new_figure()
+    ax = figure.add_subplot()
+    masked = np.ma.masked_equal(counts.T, 0)
+    mesh = ax.pcolormesh(x_edges, y_edges, masked, norm=LogNorm(vmin=1, vmax=max(1, counts.max())),
+                         cmap='viridis', rasterized=True)
+    figure.colorbar(mesh, ax=ax, label='Trades')
+    ax.set_title(f'Fear/Greed Index vs PnL ({total:,} trades)')
+    ax.set_xlabel('Fear/Greed Index (0=Fear, 100=Greed)')
+    ax.set_ylabel('Closed PnL')
+    figure.tight_layout()
+    figure.savefig(path)
+
+
+def sentiment_density(merged_df, bins=DENSITY_BINS, pnl_range=None):
+    """
+    2-D histogram of (index value, Closed PnL) over classified trades, with PnL
+    clipped to `pnl_range` (default: the PNL_QUANTILES of this data).
+    Vectorized; the result's size is fixed by `bins`. Densities built with
+    the same range and bins can be added with merge_density.
+    """
+    classified = merged_df['classification'].notna().to_numpy()
+    value = merged_df['value'].to_numpy(dtype='float64', na_value=np.nan)[classified]
+    pnl = pd.to_numeric(merged_df['Closed PnL'], errors='coerce').fillna(0).to_numpy(dtype='float64')[classified]
+    if pnl_range is not None:
+        low, high = pnl_range
+    elif len(pnl):
+        low, high = np.quantile(pnl, PNL_QUANTILES)
+    else:
+        low, high = -1.0, 1.0
+    if low == high:
+        low, high = low - 1, high + 1
+    counts, x_edges, y_edges = np.histogram2d(value, np.clip(pnl, low, high),
+                                              bins=bins, range=[[0, 100], [low, high]])
+    return {'counts': counts.astype('int64'), 'x_edges': x_edges, 'y_edges': y_edges, 'total': int(len(pnl))}
+
+
+def merge_density(a, b):
+    if not (np.array_equal(a['x_edges'], b['x_edges']) and np.array_equal(a['y_edges'], b['y_edges'])):
+        raise ValueError("Densities have different bins")
+    return dict(a, counts=a['counts'] + b['counts'], total=a['total'] + b['total'])
+
+
+def chart_jobs(metrics, density):
+    """
+    (filename, draw function, kwargs) for every report chart. The kwargs are
+    small aggregates, cheap to send to worker processes.
+    """
+    def series(s):
+        return {'labels': [str(label) for label in s.index], 'values': s.to_numpy(dtype='float64')}
+
+    return [
+        ('pnl_by_sentiment.png', _bar_chart,
+         dict(series(metrics.pnl_stats['mean']), title='Average PnL by Market Sentiment',
+              ylabel='Average PnL (USD)', color='skyblue')),
+        ('whale_win_rate.png', _bar_chart,
+         dict(series(metrics.whale_win_rate), title='Whale Win Rate by Market Sentiment',
+              ylabel='Win Rate', color='gold', ylim=(0, 1))),
+        ('win_rate_by_sentiment.png', _bar_chart,
+         dict(series(metrics.win_rate), title='Win Rate by Market Sentiment',
+              ylabel='Win Rate', color='lightgreen', ylim=(0, 1))),
+        ('sentiment_vs_pnl.png', _density_chart, density),
+    ]
+
+
+def chart_key(fn, kwargs):
+    """
+    Hash of everything a chart is drawn from.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{CHART_VERSION}:{fn.__name__}".encode())
+    for name in sorted(kwargs):
+        value = kwargs[name]
+        h.update(name.encode())
+        if isinstance(value, np.ndarray):
+            h.update(str(value.dtype).encode() + str(value.shape).encode())
+            h.update(np.ascontiguousarray(value).tobytes())
+        else:
+            h.update(json.dumps(value, default=str).encode())
+    return h.hexdigest()
+
+
+def _draw(job):
+    path, fn, kwargs = job
+    fn(path, **kwargs)
+    return path
+
+
+def _load_keys(output_dir):
+    try:
+        with open(os.path.join(output_dir, CACHE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cpu_count():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def render_charts(metrics, merged_df, output_dir, workers=None, cache=True, density=None):
+    """
+    Draws the report charts into `output_dir` with the Agg backend, in parallel
+    on up to `workers` processes (default: one per chart, at most the usable CPUs).
+
+    With `cache`, a chart whose PNG exists and whose inputs are unchanged since
+    the last render is skipped. `density` (from sentiment_density) replaces
+    `merged_df`, which may then be None. Returns the filenames that were drawn.
+    """
+    if density is None:
+        density = sentiment_density(merged_df)
+    jobs = chart_jobs(metrics, density)
+    keys = {name: chart_key(fn, kwargs) for name, fn, kwargs in jobs}
+    previous = _load_keys(output_dir) if cache else {}
+    pending = [(os.path.join(output_dir, name), fn, kwargs) for name, fn, kwargs in jobs
+               if previous.get(name) != keys[name] or not os.path.exists(os.path.join(output_dir, name))]
+
+    workers = min(workers or cpu_count(), len(pending))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_draw, pending))
+    else:
+        for job in pending:
+            _draw(job)
+
+    tmp = os.path.join(output_dir, f"{CACHE_FILE}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(keys, f, indent=2)
+    os.replace(tmp, os.path.join(output_dir, CACHE_FILE))
+    return [os.path.basename(path) for path, _, _ in pending]
@@ -1,49 +1,281 @@
+import io
+import numpy as np
 import pandas as pd
 import os
+import parquet_cache
 
-def load_fear_greed(filepath):
+# Column types of historical_data.csv. Repeated labels are categoricals; price
+# and size columns that are only displayed or compared are float32, while the
+# columns the report sums (Size USD, Closed PnL, Fee) and the ids/timestamps
+# stay 64-bit so totals and ids are exact. Integer and boolean columns use the
+# nullable dtypes, so a blank cell reads as missing instead of failing the parse.
+TRADE_SCHEMA = {
+    'Account': 'category',
+    'Coin': 'category',
+    'Execution Price': 'float32',
+    'Size Tokens': 'float32',
+    'Size USD': 'float64',
+    'Side': 'category',
+    'Timestamp IST': 'string',
+    'Start Position': 'float32',
+    'Direction': 'category',
+    'Closed PnL': 'float64',
+    'Transaction Hash': 'string',
+    'Order ID': 'Int64',
+    'Crossed': 'boolean',
+    'Fee': 'float64',
+    'Trade ID': 'float64',
+    'Timestamp': 'float64',
+}
+
+# Columns the sentiment analysis needs; everything else is skipped while parsing.
+ANALYSIS_COLUMNS = ['Account', 'Coin', 'Side', 'Size USD', 'Closed PnL', 'Timestamp']
+
+# Rows per chunk in chunked/streaming mode.
+CHUNK_ROWS = 250_000
+
+
+def _parse_fear_greed(filepath):
+    df = pd.read_csv(filepath)
+    # Convert 'date' to datetime
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+def load_fear_greed(filepath, cache=True):
     """
     Loads Fear and Greed Index data.
+
+    With `cache` the parsed file is kept as Parquet in data/.cache/ and
+    reused until the CSV changes.
     """
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"File not found: {filepath}")
     
-    df = pd.read_csv(filepath)
-    # Convert 'date' to datetime
-    df['date'] = pd.to_datetime(df['date'])
+    if cache:
+        df = parquet_cache.load(filepath, _parse_fear_greed, 'fear_greed')
+    else:
+        df = _parse_fear_greed(filepath)
     # Normalize to date only (just in case)
-    df['date'] = df['date'].dt.date
+    df['date'] = df['date'].dt.normalize()
+    df['day'] = day_number(df['date'])
     return df
 
-def load_trade_data(filepath):
+def day_number(datetimes):
     """
-    Loads Historical Trader Data.
+    Days since 1970-01-01 for a datetime64 Series, as int64 (NaT maps to int64 min).
     """
-    if not os.path.exists(filepath):
-        raise FileNotFoundError(f"File not found: {filepath}")
-    
-    df = pd.read_csv(filepath)
-    
-    # Parse Timestamp. 'Timestamp' column seems to be in milliseconds.
-    # We can also use 'Timestamp IST' if needed, but unix timestamp is safer.
-    # However, looking at the preview, 'Timestamp' is float/scientific notation.
-    
-    # Let's try parsing 'Timestamp' as ms
+    return datetimes.to_numpy().astype('datetime64[D]').view('int64')
+
+def _read_options(columns):
+    if columns is None:
+        columns = ANALYSIS_COLUMNS
+    unknown = [c for c in columns if c not in TRADE_SCHEMA]
+    if unknown:
+        raise ValueError(f"Unknown trade columns: {', '.join(unknown)}")
+    if 'Timestamp' not in columns:
+        # Needed for the datetime/date columns every caller merges on.
+        columns = list(columns) + ['Timestamp']
+    return {'usecols': columns, 'dtype': {c: TRADE_SCHEMA[c] for c in columns}}
+
+def _add_dates(df):
+    if 'datetime' not in df:
+        # 'Timestamp' is unix milliseconds (stored as float, sometimes in scientific notation).
+        df['datetime'] = pd.to_datetime(df['Timestamp'], unit='ms')
+    # Midnight of the trade's UTC day, and the same day as an integer key for merging
+    df['date'] = df['datetime'].dt.normalize()
+    df['day'] = day_number(df['datetime'])
+    return df
+
+def _parse_trades(filepath, chunksize=None):
+    # Every column, typed, with the parsed datetime: what the Parquet cache stores.
+    options = _read_options(list(TRADE_SCHEMA))
+    if chunksize:
+        with pd.read_csv(filepath, chunksize=chunksize, **options) as reader:
+            df = concat_chunks(reader)
+    else:
+        df = pd.read_csv(filepath, **options)
     df['datetime'] = pd.to_datetime(df['Timestamp'], unit='ms')
-    
-    # Create a 'date' column for merging
-    df['date'] = df['datetime'].dt.date
-    
     return df
 
-def merge_datasets(trades_df, fear_greed_df):
+def _cached_columns(columns):
+    return _read_options(columns)['usecols'] + ['datetime']
+
+def iter_trade_data(filepath, columns=None, chunksize=CHUNK_ROWS, cache=True):
     """
-    Merges trades with fear/greed data on date.
+    Streams Historical Trader Data as typed DataFrames of up to `chunksize` rows,
+    for files too large to hold in memory. Each chunk has its own categories.
+    Reads the Parquet cache when it is fresh but never builds it.
     """
-    # Merge on date
-    # Fear Greed is daily, so we join on the 'date' column
-    merged_df = pd.merge(trades_df, fear_greed_df, on='date', how='left')
-    
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"File not found: {filepath}")
+
+    if cache and parquet_cache.available() and parquet_cache.is_fresh(filepath, TRADE_SCHEMA):
+        for batch in parquet_cache.iter_batches(filepath, _cached_columns(columns), chunksize):
+            yield _add_dates(batch)
+        return
+
+    with pd.read_csv(filepath, chunksize=chunksize, **_read_options(columns)) as reader:
+        for chunk in reader:
+            yield _add_dates(chunk)
+
+def concat_chunks(chunks):
+    """
+    Concatenates typed chunks, unifying categories so categorical columns stay categorical.
+    """
+    chunks = list(chunks)
+    if not chunks:
+        raise ValueError("No chunks to concatenate")
+    for column in chunks[0].columns:
+        if isinstance(chunks[0][column].dtype, pd.CategoricalDtype):
+            categories = pd.api.types.union_categoricals([c[column] for c in chunks]).categories
+            for chunk in chunks:
+                chunk[column] = chunk[column].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+def load_trade_data(filepath, columns=None, chunksize=None, cache=True):
+    """
+    Loads Historical Trader Data with the TRADE_SCHEMA dtypes.
+
+    Only `columns` are returned (default ANALYSIS_COLUMNS; pass list(TRADE_SCHEMA)
+    for every column). With `chunksize` the CSV is parsed in pieces, which
+    caps the parser's working memory at one chunk.
+
+    With `cache` (and pyarrow installed) the first load parses every column
+    into data/.cache/historical_data.csv.parquet; later loads read only the
+    requested columns from it until the CSV's size, mtime or hash changes.
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"File not found: {filepath}")
+
+    if cache:
+        df = parquet_cache.load(filepath, lambda path: _parse_trades(path, chunksize),
+                                TRADE_SCHEMA, _cached_columns(columns))
+        return _add_dates(df)
+
+    if chunksize:
+        return concat_chunks(iter_trade_data(filepath, columns, chunksize, cache=False))
+
+    df = pd.read_csv(filepath, **_read_options(columns))
+    return _add_dates(df)
+
+class _ByteRange(io.RawIOBase):
+    # Read-only view of bytes [start, end) of an open file, for pd.read_csv.
+    def __init__(self, f, start, end):
+        self._f = f
+        self._remaining = end - start
+        f.seek(start)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self._f.readinto(memoryview(buffer)[:min(len(buffer), self._remaining)])
+        self._remaining -= n
+        return n
+
+def complete_size(filepath):
+    """
+    Byte offset just past the file's last newline: the end of its complete rows,
+    leaving out a row that is still being appended.
+    """
+    with open(filepath, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            step = min(end, 1 << 16)
+            f.seek(end - step)
+            block = f.read(step)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                return end - step + newline + 1
+            end -= step
+    return 0
+
+def header_size(filepath):
+    with open(filepath, 'rb') as f:
+        return len(f.readline())
+
+def read_trade_rows(filepath, start, end, columns=None):
+    """
+    Typed trades from bytes [start, end) of the CSV, which must be whole rows
+    (start after the header). Used to read only rows appended since a
+    previous run; the header line supplies the column names.
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"File not found: {filepath}")
+
+    with open(filepath, 'rb') as f:
+        names = pd.read_csv(io.BytesIO(f.readline()), nrows=0).columns.tolist()
+        if end <= start:
+            usecols = _read_options(columns)['usecols']
+            df = pd.DataFrame({name: pd.Series(dtype=TRADE_SCHEMA[name]) for name in names if name in usecols})
+        else:
+            reader = io.BufferedReader(_ByteRange(f, start, end))
+            df = pd.read_csv(reader, header=None, names=names, **_read_options(columns))
+    return _add_dates(df)
+
+def _take(column, positions, allow_fill):
+    # Rows of `column` at `positions`. With allow_fill, -1 gives a missing value
+    # (ints become float, like an unmatched left merge).
+    if isinstance(column.dtype, pd.api.extensions.ExtensionDtype):
+        return column.array.take(positions, allow_fill=allow_fill)
+    return pd.api.extensions.take(column.to_numpy(), positions, allow_fill=allow_fill)
+
+def _day_positions(trade_days, fg_days):
+    # Direct-address table over the index's day range: one array lookup per trade.
+    positions = np.full(len(trade_days), -1, dtype=np.int64)
+    if len(fg_days) == 0:
+        return positions
+    lo = fg_days.min()
+    table = np.full(fg_days.max() - lo + 1, -1, dtype=np.int64)
+    table[fg_days - lo] = np.arange(len(fg_days))
+    offset = trade_days - lo
+    inside = (offset >= 0) & (offset < len(table))
+    positions[inside] = table[offset[inside]]
+    return positions
+
+def _asof_positions(trade_times, fg_times, tolerance):
+    # Latest reading at or before each trade (pd.merge_asof, direction='backward').
+    positions = np.searchsorted(fg_times, trade_times, side='right') - 1
+    if tolerance is not None:
+        stale = (positions >= 0) & (trade_times - fg_times[np.maximum(positions, 0)] > tolerance)
+        positions[stale] = -1
+    return positions
+
+def merge_datasets(trades_df, fear_greed_df, how='day', tolerance=None):
+    """
+    Merges trades with fear/greed data, keeping the trades' row order.
+
+    how='day': each trade gets the reading for its UTC day, looked up by the
+    integer `day` key in a table over the index's date range (no hash join, no
+    Python objects). Trades on days without a reading get NaN; readings
+    without a date are ignored.
+
+    how='asof': each trade gets the latest reading published at or before it,
+    by the index's `timestamp` (unix seconds), for intraday sentiment feeds.
+    `tolerance` (a Timedelta) leaves trades further than that from any reading
+    unmatched. Readings without a timestamp are ignored.
+    """
+    if how not in ('day', 'asof'):
+        raise ValueError(f"Unknown merge mode: {how}")
+    if how == 'day':
+        # A day with several readings keeps the last one, so the merge never duplicates trades.
+        # Readings without a date cannot match a day (and their int64-min key would size the table).
+        fg = fear_greed_df[fear_greed_df['date'].notna()].drop_duplicates('day', keep='last')
+        positions = _day_positions(trades_df['day'].to_numpy(), fg['day'].to_numpy())
+        joined = [c for c in fg.columns if c not in ('day', 'date')]
+    else:
+        fg = fear_greed_df[fear_greed_df['timestamp'].notna()].sort_values('timestamp', kind='stable')
+        fg_times = fg['timestamp'].to_numpy().astype('int64') * 1000
+        trade_times = trades_df['datetime'].to_numpy().astype('datetime64[ms]').view('int64')
+        tolerance_ms = None if tolerance is None else pd.Timedelta(tolerance) // pd.Timedelta(milliseconds=1)
+        positions = _asof_positions(trade_times, fg_times, tolerance_ms)
+        joined = [c for c in fg.columns if c not in trades_df.columns]
+
+    # Only new columns are added, so the trade columns can be shared rather than copied.
+    merged_df = trades_df.copy(deep=False)
+    matched = bool((positions >= 0).all())
+    for column in joined:
+        merged_df[column] = _take(fg[column], positions, allow_fill=not matched)
     return merged_df
 
 if __name__ == "__main__":
@@ -58,7 +290,7 @@ if __name__ == "__main__":
     
     print(f"Loading Trades from {trade_path}...")
     trades = load_trade_data(trade_path)
-    print(f"Loaded {len(trades)} rows.")
+    print(f"Loaded {len(trades)} rows, {trades.memory_usage(deep=True).sum() / 1e6:.1f} MB.")
     
     print("Merging...")
     merged = merge_datasets(trades, fg)
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+import analysis
+import charts
+import data_loader
+import parquet_cache
+
+# Bump when the saved state's layout or meaning changes; old state is rebuilt.
+STATE_VERSION = 3
+STATE_FILENAME = 'report_state.json'
+# Read size while hashing the processed prefix.
+DIGEST_BLOCK = 1 << 20
+
+
+def default_state_path(trade_path):
+    return os.path.join(os.path.dirname(os.path.abspath(trade_path)), parquet_cache.CACHE_DIRNAME, STATE_FILENAME)
+
+
+def _prefix_digest(filepath, end):
+    # Hashing runs at disk speed, far faster than parsing the rows it covers.
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        remaining = end
+        while remaining > 0:
+            block = f.read(min(DIGEST_BLOCK, remaining))
+            if not block:
+                break
+            h.update(block)
+            remaining -= len(block)
+    return h.hexdigest()
+
+
+def _partials_to_json(partials):
+    frame = partials.reset_index()
+    return {'columns': frame.columns.tolist(),
+            'rows': [[None if pd.isna(v) else v for v in row] for row in frame.itertuples(index=False)]}
+
+
+def _partials_from_json(payload):
+    frame = pd.DataFrame(payload['rows'], columns=payload['columns'])
+    partials = frame.set_index(['classification', 'Account'])[analysis.PARTIAL_COLUMNS]
+    for name in ('count', 'wins'):
+        partials[name] = partials[name].astype('int64')
+    return partials
+
+
+def _density_to_json(density):
+    return {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in density.items()}
+
+
+def _density_from_json(payload):
+    return {'counts': np.asarray(payload['counts'], dtype='int64'), 'x_edges': np.asarray(payload['x_edges']),
+            'y_edges': np.asarray(payload['y_edges']), 'total': int(payload['total'])}
+
+
+def load_state(state_path):
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('version') != STATE_VERSION:
+        return None
+    state['partials'] = _partials_from_json(state['partials'])
+    state['density'] = _density_from_json(state['density'])
+    return state
+
+
+def save_state(state, state_path):
+    payload = dict(state, partials=_partials_to_json(state['partials']),
+                   density=_density_to_json(state['density']))
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    tmp = f"{state_path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(payload, f, default=float)
+    os.replace(tmp, state_path)
+
+
+def _append_intact(trade_path, state):
+    # The rows read last time are still the file's prefix: every byte before
+    # the saved offset, header included, is unchanged.
+    return (os.path.getsize(trade_path) >= state['offset']
+            and _prefix_digest(trade_path, state['offset']) == state['prefix_digest'])
+
+
+def update(trade_path, fg_path, state_path=None, rebuild=False):
+    """
+    Brings the saved partial aggregates up to date with `trade_path` and
+    returns (state, info).
+
+    Normally only the bytes appended since the last run are parsed, merged
+    with the fear/greed index and aggregated; their partials are added to
+    the saved ones. The processed prefix is hashed each run to tell an
+    append from a rewrite. A rewritten prefix, a changed fear/greed file, a
+    different trade file or `rebuild` starts over from the whole file, so
+    the sums always describe the file as it is now.
+    """
+    state_path = state_path or default_state_path(trade_path)
+    fg_digest = parquet_cache.file_digest(fg_path)
+    state = None if rebuild else load_state(state_path)
+    if state is not None and (state['trade_path'] != os.path.abspath(trade_path)
+                              or state['fear_greed_digest'] != fg_digest):
+        state = None
+
+    header = data_loader.header_size(trade_path)
+    end = data_loader.complete_size(trade_path)
+    rewritten = state is not None and not _append_intact(trade_path, state)
+    if rewritten:
+        # Rows already counted were edited; their old sums cannot be taken back out.
+        state = None
+    if state is None:
+        mode, start = 'full', header
+    else:
+        mode, start = 'append', state['offset']
+
+    trades = data_loader.read_trade_rows(trade_path, start, end)
+    merged = data_loader.merge_datasets(trades, data_loader.load_fear_greed(fg_path))
+    partials = analysis.compute_partials(merged)
+
+    if state is None or state['density']['total'] == 0:
+        density = charts.sentiment_density(merged)
+    else:
+        y_edges = state['density']['y_edges']
+        density = charts.merge_density(
+            state['density'], charts.sentiment_density(merged, pnl_range=(y_edges[0], y_edges[-1])))
+    if state is not None:
+        partials = analysis.merge_partials(state['partials'], partials)
+
+    new_state = {
+        'version': STATE_VERSION,
+        'trade_path': os.path.abspath(trade_path),
+        'fear_greed_digest': fg_digest,
+        'offset': end,
+        'rows': (state['rows'] if state else 0) + len(trades),
+        'prefix_digest': _prefix_digest(trade_path, end),
+        'partials': partials,
+        'density': density,
+    }
+    save_state(new_state, state_path)
+    return new_state, {'mode': mode, 'rewritten': rewritten, 'new_rows': len(trades),
+                       'total_rows': new_state['rows']}
+
+
+def run(trade_path, fg_path, output_dir, rebuild=False, draw_charts=True, workers=None, chart_cache=True,
+        state_path=None):
+    """
+    Incremental counterpart of analysis.generate_report: updates the saved
+    state, then writes the report and charts from it. Returns the metrics.
+    """
+    state, info = update(trade_path, fg_path, state_path, rebuild)
+    if info['rewritten']:
+        print("Processed rows were rewritten; rebuilt from the whole file.")
+    print(f"{info['mode']} update: {info['new_rows']} new rows, {info['total_rows']} in total.")
+    metrics = analysis.metrics_from_partials(state['partials'])
+    analysis.write_report(metrics, output_dir, density=state['density'], draw_charts=draw_charts,
+                          workers=workers, chart_cache=chart_cache)
+    return metrics
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import warnings
+import pandas as pd
+
+# Bump when the cached layout changes so old cache files are rebuilt.
+CACHE_VERSION = 1
+CACHE_DIRNAME = '.cache'
+# Row groups bound the memory of streaming reads (iter_batches).
+ROW_GROUP_ROWS = 250_000
+
+_warned = False
+
+
+def available():
+    """
+    True if pyarrow is installed; without it loaders fall back to parsing the CSV.
+    """
+    global _warned
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        if not _warned:
+            warnings.warn("pyarrow is not installed; reading CSVs without the Parquet cache (pip install pyarrow).")
+            _warned = True
+        return False
+    return True
+
+
+def file_digest(filepath):
+    h = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_paths(filepath, cache_dir=None):
+    """
+    (parquet path, metadata path) for `filepath`, by default in data/.cache/.
+    """
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(filepath)), CACHE_DIRNAME)
+    stem = os.path.basename(filepath)
+    return os.path.join(cache_dir, f"{stem}.parquet"), os.path.join(cache_dir, f"{stem}.json")
+
+
+def _source_key(filepath, schema):
+    stat = os.stat(filepath)
+    return {'version': CACHE_VERSION, 'schema': schema, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def is_fresh(filepath, schema, cache_dir=None):
+    """
+    True if the cached copy of `filepath` matches its size, mtime and content hash.
+
+    The hash is only computed when size matches but mtime does not (a touched
+    or re-copied file); the cache is then re-stamped with the new mtime.
+    """
+    data_path, meta_path = cache_paths(filepath, cache_dir)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return False
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    key = _source_key(filepath, schema)
+    if any(meta.get(k) != key[k] for k in ('version', 'schema', 'size')):
+        return False
+    if meta.get('mtime_ns') == key['mtime_ns']:
+        return True
+    if meta.get('digest') != file_digest(filepath):
+        return False
+    meta['mtime_ns'] = key['mtime_ns']
+    _write_json(meta_path, meta)
+    return True
+
+
+def _write_json(path, payload):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+def write(filepath, df, schema, cache_dir=None):
+    """
+    Stores the parsed `df` of `filepath`. The Parquet file and its metadata are
+    each replaced atomically, metadata last, so readers never see a partial cache.
+    """
+    data_path, meta_path = cache_paths(filepath, cache_dir)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    key = _source_key(filepath, schema)
+    key['digest'] = file_digest(filepath)
+    tmp = f"{data_path}.tmp"
+    df.to_parquet(tmp, index=False, row_group_size=ROW_GROUP_ROWS)
+    os.replace(tmp, data_path)
+    _write_json(meta_path, key)
+
+
+def read(filepath, columns=None, cache_dir=None):
+    data_path, _ = cache_paths(filepath, cache_dir)
+    return pd.read_parquet(data_path, columns=columns)
+
+
+def iter_batches(filepath, columns=None, batch_size=ROW_GROUP_ROWS, cache_dir=None):
+    """
+    Streams the cached copy of `filepath` as DataFrames of up to `batch_size` rows.
+    """
+    import pyarrow.parquet as pq
+
+    data_path, _ = cache_paths(filepath, cache_dir)
+    parquet_file = pq.ParquetFile(data_path)
+    try:
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+    finally:
+        parquet_file.close()
+
+
+def load(filepath, parse, schema, columns=None, cache_dir=None):
+    """
+    Returns `filepath` parsed by `parse(filepath)`, restricted to `columns`,
+    going through the Parquet cache when pyarrow is available.
+
+    `schema` is any JSON-able description of what `parse` produces; changing
+    it invalidates the cache. On a miss the full parsed frame is cached and
+    the projection is applied afterwards.
+    """
+    if not available():
+        df = parse(filepath)
+        return df[columns] if columns is not None else df
+    if is_fresh(filepath, schema, cache_dir):
+        return read(filepath, columns, cache_dir)
+    df = parse(filepath)
+    try:
+        write(filepath, df, schema, cache_dir)
+    except OSError as e:
+        warnings.warn(f"Could not write the Parquet cache for {filepath}: {e}")
+    return df[columns] if columns is not None else df
@@ -0,0 +1,32 @@
+import os
+import shutil
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'src'))
+sys.path.append(os.path.join(ROOT, 'benchmarks'))
+
+from synthetic import write_trades
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """
+    A scratch data/ directory with the real fear/greed index, so caches and
+    state files are written there and never into the repository.
+    """
+    data = tmp_path / 'data'
+    data.mkdir()
+    shutil.copy(os.path.join(ROOT, 'data', 'fear_greed_index.csv'), data / 'fear_greed_index.csv')
+    return data
+
+
+@pytest.fixture
+def trade_path(data_dir):
+    return write_trades(str(data_dir / 'historical_data.csv'), 20_000)
+
+
+@pytest.fixture
+def fg_path(data_dir):
+    return str(data_dir / 'fear_greed_index.csv')
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+import analysis
+import backends
+import charts
+import data_loader
+
+
+@pytest.fixture
+def reference(trade_path, fg_path):
+    merged = data_loader.merge_datasets(data_loader.load_trade_data(trade_path), data_loader.load_fear_greed(fg_path))
+    return analysis.render_report(analysis.compute_metrics(merged)), charts.sentiment_density(merged)
+
+
+@pytest.mark.parametrize('name, options', [
+    ('pandas', {}),
+    ('chunked', {'chunksize': 3_000}),
+    ('duckdb', {}),
+])
+def test_backend_report_matches(name, options, reference, trade_path, fg_path):
+    if name == 'duckdb':
+        pytest.importorskip('duckdb')
+    report, density = reference
+    partials, backend_density = backends.get_backend(name, **options).aggregate(trade_path, fg_path)
+    assert analysis.render_report(analysis.metrics_from_partials(partials)) == report
+    assert backend_density['total'] == density['total']
+    np.testing.assert_array_equal(backend_density['counts'], density['counts'])
+    np.testing.assert_allclose(backend_density['y_edges'], density['y_edges'])
+
+
+def test_backend_run_writes_same_report(trade_path, fg_path, tmp_path, reference):
+    backends.run('chunked', trade_path, fg_path, str(tmp_path), draw_charts=False)
+    assert (tmp_path / 'report.md').read_text() == reference[0]
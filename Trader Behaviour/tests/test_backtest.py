@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+import backtest
+from run import loop_grid
+
+
+@pytest.fixture(scope='module')
+def market():
+    rng = np.random.default_rng(1)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, 5_000)))
+    sentiment = rng.integers(0, 101, len(prices)).astype('float64')
+    sentiment[::97] = np.nan
+    return prices, sentiment
+
+
+@pytest.mark.parametrize('count, width', [(5, 0.02), (20, 0.05), (50, 0.2)])
+@pytest.mark.parametrize('gate', [(0, 100), (0, 45), (55, 100)])
+def test_simulate_grid_matches_loop(market, count, width, gate):
+    prices, sentiment = market
+    grid_prices, _ = backtest.bot_strategies()
+    levels = grid_prices(prices[0] * (1 - width), prices[0] * (1 + width), count)
+    result = backtest.simulate_grid(prices, sentiment, levels, 1.0, gate)
+    assert result['pnl'] == pytest.approx(loop_grid(prices.tolist(), sentiment.tolist(), levels, 1.0, gate),
+                                          rel=1e-9, abs=1e-6)
+
+
+def test_running_clamp_matches_loop():
+    rng = np.random.default_rng(2)
+    low = rng.integers(0, 10, 1_000)
+    high = low + rng.integers(0, 10, 1_000)
+    expected, g = [], 5
+    for lo, hi in zip(low, high):
+        g = min(max(g, lo), hi)
+        expected.append(g)
+    np.testing.assert_array_equal(backtest.running_clamp(5, low, high), expected)
+
+
+def loop_twap(times, prices, sentiment, slices, duration_s, side, gate, slippage_bps=backtest.TWAP_SLIPPAGE_BPS,
+              fee=backtest.TWAP_FEE):
+    # One parent per day, one slice at a time: the first trade at or after each slice's send time.
+    sign = 1 if side == 'BUY' else -1
+    interval = duration_s * 1000 / len(slices)
+    costs = []
+    start = times[0]
+    while start < times[-1] - duration_s * 1000:
+        at = [int(np.searchsorted(times, start + i * interval, 'left')) for i in range(len(slices))]
+        start += 86_400_000
+        if at[-1] >= len(times) or not gate[0] <= sentiment[at[0]] <= gate[1]:
+            continue
+        filled = sum(prices[i] * (1 + sign * slippage_bps / 10_000) * qty for i, qty in zip(at, slices))
+        arrival = prices[at[0]]
+        costs.append(sign * (filled / sum(slices) - arrival) / arrival * 10_000 + fee * 10_000)
+    return len(costs), float(np.mean(costs))
+
+
+@pytest.mark.parametrize('side', ['BUY', 'SELL'])
+@pytest.mark.parametrize('gate', [(0, 100), (0, 45)])
+def test_simulate_twap_matches_loop(market, side, gate):
+    prices, sentiment = market
+    # A trade about every ten minutes, for 35 days.
+    times = 1.7e12 + np.cumsum(np.random.default_rng(3).exponential(600_000, len(prices)))
+    _, twap_slices = backtest.bot_strategies()
+    slices = [float(qty) for qty in twap_slices(1.0, 7)]
+    result = backtest.simulate_twap(times, prices, sentiment, slices, 3600, side, gate=gate)
+    parents, cost = loop_twap(times, prices, sentiment, slices, 3600, side, gate)
+    assert result['parents'] == parents > 0
+    assert result['cost_bps'] == pytest.approx(cost, rel=1e-9)
+
+
+def test_sweep_twap_rejects_quantity_below_one_step(market):
+    prices, sentiment = market
+    frame = pd.DataFrame({'Timestamp': np.arange(len(prices)) * 60_000.0, 'price': prices,
+                                   'sentiment': sentiment})
+    with pytest.raises(ValueError, match='below one step'):
+        backtest.sweep_twap(frame, 0.0004, workers=1)
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+import breakdown
+import data_loader
+
+
+@pytest.fixture
+def merged(trade_path, fg_path):
+    return data_loader.merge_datasets(data_loader.load_trade_data(trade_path), data_loader.load_fear_greed(fg_path))
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_matches_groupby(merged, workers):
+    table = breakdown.compute_breakdown(merged, 'Account', workers)
+    rows = merged.dropna(subset=['Account', 'classification'])
+    grouped = pd.to_numeric(rows['Closed PnL']).groupby([rows['Account'], rows['classification'].astype(str)],
+                                                         observed=True)
+    expected = pd.DataFrame({
+        'count': grouped.count(),
+        'pnl_sum': grouped.sum(),
+        'pnl_std': grouped.std(),
+        'pnl_p10': grouped.quantile(0.1),
+        'pnl_median': grouped.quantile(0.5),
+        'pnl_p90': grouped.quantile(0.9),
+    })
+    actual = table[expected.columns].sort_index()
+    assert len(actual) == len(expected)
+    np.testing.assert_array_equal(actual.index.to_numpy(), expected.index.to_numpy())
+    np.testing.assert_array_equal(actual['count'].to_numpy(), expected['count'].to_numpy())
+    for column in expected.columns[1:]:
+        np.testing.assert_allclose(actual[column].to_numpy(), expected[column].to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_empty_input(merged, workers):
+    table = breakdown.compute_breakdown(merged.iloc[:0], 'Account', workers)
+    assert table.empty
+    assert list(table.columns) == breakdown.BREAKDOWN_COLUMNS
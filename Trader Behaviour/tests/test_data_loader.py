@@ -0,0 +1,49 @@
+import pandas as pd
+import analysis
+import data_loader
+from synthetic import make_trades
+
+
+def write_with_blanks(path):
+    # Blank cells only in columns the analysis never reads.
+    df = make_trades(500)
+    for column in ('Crossed', 'Order ID', 'Transaction Hash', 'Trade ID'):
+        df[column] = df[column].astype(object)
+        df.loc[df.index[::7], column] = None
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_blank_unused_columns_load_with_cache(data_dir, fg_path):
+    path = write_with_blanks(data_dir / 'historical_data.csv')
+    expected = data_loader.load_trade_data(path, cache=False)
+    # Cold cache (parses every column), then warm.
+    for _ in range(2):
+        trades = data_loader.load_trade_data(path)
+        pd.testing.assert_frame_equal(trades, expected, check_like=True, check_categorical=False)
+    every = data_loader.load_trade_data(path, list(data_loader.TRADE_SCHEMA))
+    assert every['Crossed'].isna().sum() == len(every[::7])
+    assert str(every['Order ID'].dtype) == 'Int64'
+
+
+def test_blank_unused_columns_report(data_dir, fg_path):
+    path = write_with_blanks(data_dir / 'historical_data.csv')
+    fg = data_loader.load_fear_greed(fg_path)
+    cached = analysis.compute_metrics(data_loader.merge_datasets(data_loader.load_trade_data(path), fg))
+    parsed = analysis.compute_metrics(data_loader.merge_datasets(data_loader.load_trade_data(path, cache=False), fg))
+    assert analysis.render_report(cached) == analysis.render_report(parsed)
+
+
+
+def test_fear_greed_blank_date_and_timestamp(data_dir, trade_path, fg_path):
+    fg = pd.read_csv(fg_path)
+    fg.loc[3, 'date'] = None
+    fg.loc[5, 'timestamp'] = None
+    fg.to_csv(fg_path, index=False)
+    loaded = data_loader.load_fear_greed(fg_path)
+    trades = data_loader.load_trade_data(trade_path)
+    # Each mode ignores only the readings missing its own key.
+    for how, key in (('day', 'date'), ('asof', 'timestamp')):
+        merged = data_loader.merge_datasets(trades, loaded, how=how)
+        expected = data_loader.merge_datasets(trades, loaded.dropna(subset=[key]), how=how)
+        pd.testing.assert_frame_equal(merged, expected)
@@ -0,0 +1,59 @@
+import analysis
+import data_loader
+import incremental
+from synthetic import make_trades
+
+
+def full_report(trade_path, fg_path):
+    merged = data_loader.merge_datasets(data_loader.load_trade_data(trade_path, cache=False),
+                                        data_loader.load_fear_greed(fg_path))
+    return analysis.render_report(analysis.compute_metrics(merged))
+
+
+def incremental_report(trade_path, fg_path, state_path):
+    state, info = incremental.update(trade_path, fg_path, state_path)
+    return analysis.render_report(analysis.metrics_from_partials(state['partials'])), info
+
+
+def test_appends_match_full_report(data_dir, fg_path):
+    path, state_path = str(data_dir / 'historical_data.csv'), str(data_dir / 'state.json')
+    trades = make_trades(20_000)
+    trades.iloc[:5_000].to_csv(path, index=False)
+    modes = []
+    for start, end in ((5_000, 11_000), (11_000, 17_000), (17_000, 20_000)):
+        _, info = incremental_report(path, fg_path, state_path)
+        modes.append(info['mode'])
+        trades.iloc[start:end].to_csv(path, mode='a', header=False, index=False)
+    report, info = incremental_report(path, fg_path, state_path)
+    assert modes + [info['mode']] == ['full', 'append', 'append', 'append']
+    assert info['total_rows'] == len(trades)
+    assert report == full_report(path, fg_path)
+
+
+def test_early_rewrite_rebuilds(data_dir, fg_path):
+    path, state_path = str(data_dir / 'historical_data.csv'), str(data_dir / 'state.json')
+    trades = make_trades(20_000)
+    trades.loc[10, 'Closed PnL'] = 1234.5
+    trades.to_csv(path, index=False)
+    incremental_report(path, fg_path, state_path)
+    # One PnL digit far from the end, same file size: only a digest of the whole prefix sees it.
+    with open(path, 'r+b') as f:
+        data = f.read()
+        f.seek(data.index(b',1234.5,'))
+        f.write(b',9234.5,')
+    report, info = incremental_report(path, fg_path, state_path)
+    assert info['mode'] == 'full' and info['rewritten']
+    assert report == full_report(path, fg_path)
+
+
+def test_rewrite_with_appended_rows_rebuilds(data_dir, fg_path):
+    path, state_path = str(data_dir / 'historical_data.csv'), str(data_dir / 'state.json')
+    trades = make_trades(10_000)
+    trades.iloc[:6_000].to_csv(path, index=False)
+    incremental_report(path, fg_path, state_path)
+    trades.loc[0, 'Closed PnL'] = 1e6
+    trades.to_csv(path, index=False)
+    report, info = incremental_report(path, fg_path, state_path)
+    assert info['mode'] == 'full' and info['rewritten']
+    assert info['total_rows'] == len(trades)
+    assert report == full_report(path, fg_path)
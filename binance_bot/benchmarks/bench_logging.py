@@ -0,0 +1,76 @@
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Ensure src is in pythonpath
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import setup_logger, flush_logs
+
+PARAMS = {
+    'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT', 'quantity': 0.001, 'price': 65000.1,
+    'timeInForce': 'GTC', 'timestamp': 1769107097495,
+    'signature': 'e0c6fbf7c6ba044b5239f63d6bd3a71ec6461aff2363e6d48cf568e9cb6710b5',
+}
+QUERY = '&'.join(f"{k}={v}" for k, v in PARAMS.items())
+
+
+def legacy_logger(path):
+    """
+    The original setup: synchronous FileHandler + console handler.
+    """
+    logger = logging.getLogger('bench.legacy')
+    formatter = logging.Formatter('[%(asctime)s] [%(levelname)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+    for handler in (logging.FileHandler(path), logging.StreamHandler(io.StringIO())):
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def legacy_call(logger):
+    logger.info(f"Sending POST request to /fapi/v1/order with params: {PARAMS}")
+
+
+def current_call(logger):
+    logger.info("Sending %s request to %s", 'POST', '/fapi/v1/order',
+                extra={'method': 'POST', 'endpoint': '/fapi/v1/order'})
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Request params: %s", QUERY.partition('&signature=')[0])
+
+
+def measure(fn, logger, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(logger)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations=20000):
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = measure(legacy_call, legacy_logger(os.path.join(tmp, 'legacy.log')), iterations)
+        sync_text = measure(current_call, setup_logger(
+            os.path.join(tmp, 'sync.log'), async_mode=False, name='bench.sync', stream=io.StringIO()
+        ), iterations)
+        async_text = measure(current_call, setup_logger(
+            os.path.join(tmp, 'async.log'), name='bench.async', stream=io.StringIO()
+        ), iterations)
+        async_json = measure(current_call, setup_logger(
+            os.path.join(tmp, 'json.log'), json_format=True, name='bench.json', stream=io.StringIO()
+        ), iterations)
+        flush_logs()
+
+    print("Order-path logging overhead per request (caller thread):")
+    print(f"  legacy (sync, f-string params): {legacy:7.2f} us")
+    print(f"  sync, lazy:                     {sync_text:7.2f} us")
+    print(f"  async queue, text:              {async_text:7.2f} us")
+    print(f"  async queue, JSON:              {async_json:7.2f} us")
+    return {'legacy_us': legacy, 'sync_us': sync_text, 'async_us': async_text, 'async_json_us': async_json}
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,250 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Ensure src is in pythonpath
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from src.client import get_client, close_clients
+from src.rate_limiter import RateLimiter
+from src.simulator import ExchangeSimulator
+from src import exchange_info
+from src.advanced.grid_strategy import execute_grid_strategy
+from src.advanced.twap import execute_twap
+from src.utils import logger, flush_logs
+import config
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+BENCHMARKS = ('sign', 'send_request', 'grid', 'twap', 'cold_start')
+# Metrics where a higher value is better; every other compared metric is a latency.
+HIGHER_IS_BETTER = ('rps', 'orders_per_s')
+ORDER = {
+    'symbol': 'BTCUSDT',
+    'side': 'BUY',
+    'type': 'LIMIT',
+    'quantity': '0.001',
+    'price': '60000.0',
+    'timeInForce': 'GTC',
+}
+
+
+def summarize(samples_ms):
+    """
+    p50/p99/mean/max of a list of millisecond samples.
+    """
+    ordered = sorted(samples_ms)
+    rank = max(0, min(len(ordered) - 1, round(0.99 * len(ordered)) - 1))
+    return {
+        'p50_ms': statistics.median(ordered),
+        'p99_ms': ordered[rank],
+        'mean_ms': statistics.fmean(ordered),
+        'max_ms': ordered[-1],
+        'samples': len(ordered),
+    }
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def timed(fn, iterations):
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - start
+    result = summarize(samples)
+    result['rps'] = iterations / elapsed
+    return result
+
+
+def bench_sign(client, iterations):
+    query = f"symbol=BTCUSDT&side=BUY&type=LIMIT&quantity=0.001&price=60000.0&timeInForce=GTC&timestamp={int(time.time() * 1000)}"
+    return timed(lambda: client._sign(query), iterations)
+
+
+def bench_send_request(client, iterations):
+    return timed(lambda: client.send_request('POST', '/fapi/v1/order', ORDER), iterations)
+
+
+def bench_grid(levels_list, repeat):
+    results = {}
+    for levels in levels_list:
+        samples = []
+        placed = 0
+        for _ in range(repeat):
+            report = execute_grid_strategy('BTCUSDT', 60000, 70000, levels, 0.001)
+            if not report:
+                raise RuntimeError(f"Grid placement failed for {levels} levels")
+            samples.append(report['elapsed'] * 1000)
+            placed += report['placed']
+        result = summarize(samples)
+        result['orders_per_s'] = levels / (result['p50_ms'] / 1000)
+        result['placed'] = placed
+        result['requested'] = levels * repeat
+        results[str(levels)] = result
+    return results
+
+
+def bench_twap(duration, slices):
+    report = execute_twap('BTCUSDT', 'BUY', 0.1, duration, slices)
+    if not report:
+        raise RuntimeError("TWAP run failed")
+    result = summarize([s['slippage_ms'] for s in report['slices'] if 'slippage_ms' in s])
+    result['elapsed_s'] = report['elapsed_s']
+    result['schedule_error_s'] = report['elapsed_s'] - duration * (slices - 1) / slices
+    result['executed_qty'] = report['executed_qty']
+    result['target_qty'] = report['target_qty']
+    return result
+
+
+def bench_cold_start(runs):
+    """
+    Wall time of `python src/main.py` with no command (imports, argparse and
+    logger setup, then help output), run from a scratch directory.
+    """
+    main_py = os.path.join(ROOT, 'src', 'main.py')
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, main_py], cwd=tmp, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, check=True)
+            samples.append((time.perf_counter() - t0) * 1000)
+    result = summarize(samples)
+    result['peak_rss_mb'] = peak_rss_mb(resource.RUSAGE_CHILDREN)
+    return result
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current, baseline_path, threshold):
+    """
+    Prints per-metric changes against a previous results file and returns the
+    number of regressions beyond `threshold` (a fraction, e.g. 0.1).
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline['meta']['commit']} ({baseline_path}):")
+    regressions = 0
+
+    def walk(cur, base, path):
+        nonlocal regressions
+        for key, value in cur.items():
+            if key not in base:
+                continue
+            if isinstance(value, dict):
+                walk(value, base[key], f"{path}{key}.")
+                continue
+            if key not in HIGHER_IS_BETTER and key not in ('p50_ms', 'p99_ms', 'peak_rss_mb'):
+                continue
+            old = base[key]
+            if not old:
+                continue
+            change = (value - old) / old
+            worse = -change if key in HIGHER_IS_BETTER else change
+            flag = ' REGRESSION' if worse > threshold else ''
+            regressions += bool(flag)
+            print(f"  {path + key:<28} {old:12.3f} -> {value:12.3f} ({change:+.1%}){flag}")
+
+    walk(current['results'], baseline['results'], '')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Order-path and strategy benchmarks against the local simulator")
+    parser.add_argument("--only", default=','.join(BENCHMARKS), help=f"Comma-separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--iterations", type=int, default=2000, help="Requests for send_request (x50 for sign)")
+    parser.add_argument("--grid_levels", default="10,100,1000")
+    parser.add_argument("--grid_repeat", type=int, default=5)
+    parser.add_argument("--twap_duration", type=float, default=5.0)
+    parser.add_argument("--twap_slices", type=int, default=50)
+    parser.add_argument("--cold_start_runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated exchange latency (seconds)")
+    parser.add_argument("--rate_limits", action="store_true", help="Keep the client's real rate limiter")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regression threshold for --compare")
+    parser.add_argument("--verbose", action="store_true", help="Keep bot INFO logging on")
+    args = parser.parse_args(argv)
+
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    if not args.verbose:
+        logger.setLevel(logging.WARNING)
+
+    results = {}
+    with ExchangeSimulator(latency=args.latency) as simulator:
+        # Route the strategies' shared client (and its symbol filter cache) to the simulator.
+        config.API_KEY, config.API_SECRET, config.BASE_URL = simulator.api_key, simulator.api_secret, simulator.base_url
+        client = get_client(config.API_KEY, config.API_SECRET, config.BASE_URL)
+        if not args.rate_limits:
+            client.rate_limiter = RateLimiter(weight_limit=10**9, order_limit_1m=10**9, order_limit_10s=10**9)
+        exchange_info._cache = exchange_info.SymbolFilterCache(client, snapshot_path=None)
+        client.warm_up()
+
+        for name in selected:
+            print(f"Running {name}...", flush=True)
+            if name == 'sign':
+                results[name] = bench_sign(client, args.iterations * 50)
+            elif name == 'send_request':
+                results[name] = bench_send_request(client, args.iterations)
+            elif name == 'grid':
+                levels = [int(n) for n in args.grid_levels.split(',')]
+                results[name] = bench_grid(levels, args.grid_repeat)
+            elif name == 'twap':
+                results[name] = bench_twap(args.twap_duration, args.twap_slices)
+            elif name == 'cold_start':
+                results[name] = bench_cold_start(args.cold_start_runs)
+            if name != 'cold_start':
+                results[name]['peak_rss_mb'] = peak_rss_mb()
+        close_clients()
+    flush_logs()
+
+    current = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'simulated_latency_s': args.latency,
+            'rate_limits': args.rate_limits,
+        },
+        'results': results,
+    }
+    print(json.dumps(current, indent=2))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{current['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        return 1 if compare(current, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# Ensure src is in pythonpath
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from src.commands import COMMANDS
+
+MAIN_PY = os.path.join(ROOT, 'src', 'main.py')
+# Nothing beyond argparse may load before a subcommand is chosen.
+STARTUP_FORBIDDEN = ('requests', 'asyncio', 'config', 'src.client', 'src.utils')
+# Plain order commands must not drag in the event loop or the stream/async stack.
+SYNC_COMMANDS = ('market', 'limit', 'stop_limit')
+SYNC_FORBIDDEN = ('asyncio', 'websockets', 'src.async_client', 'src.user_stream')
+# Commands that only need the async stack for an optional mode (oco --monitor) load it then.
+LAZY_ASYNC_COMMANDS = ('oco',)
+# Strategy modules a command may legitimately import besides its own.
+ALLOWED_DEPENDENCIES = {'grid_dynamic': {'src.advanced.grid_strategy'}, 'serve': {'src.store'}}
+
+
+def import_times(args, cwd):
+    """
+    Runs python -X importtime with `args` and returns ({module: cumulative_us}, raw stderr, stdout).
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=cwd,
+                          capture_output=True, text=True)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules, proc.stderr, proc.stdout
+
+
+def top_level_ms(raw):
+    """
+    Total import time: the sum of cumulative times of top-level (unindented)
+    imports, leaving out interpreter start-up (`site` and its .pth hooks).
+    """
+    total = 0
+    for line in raw.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if not name.startswith('  ') and name.strip() != 'site':
+                total += int(cumulative)
+    return total / 1000
+
+
+def check_startup(budget_ms, cwd, verbose):
+    modules, raw, _ = import_times([MAIN_PY, '--help'], cwd)
+    total = top_level_ms(raw)
+    failures = [f"`main.py --help` imported {name}" for name in STARTUP_FORBIDDEN if name in modules]
+    if budget_ms and total > budget_ms:
+        failures.append(f"`main.py --help` import time {total:.1f} ms exceeds budget {budget_ms:.1f} ms")
+    print(f"main.py --help: {total:.1f} ms of imports, {len(modules)} modules")
+    if verbose:
+        for name, us in sorted(modules.items(), key=lambda item: -item[1])[:10]:
+            print(f"    {us / 1000:8.1f} ms  {name}")
+    return failures
+
+
+def check_thin_client(cwd):
+    """
+    `main.py --daemon ...` only forwards to the daemon; it must stay as light as --help.
+    """
+    argv = [MAIN_PY, '--socket', os.path.join(cwd, 'missing.sock'), '--daemon',
+            'market', '--symbol', 'BTCUSDT', '--side', 'BUY', '--qty', '0.001']
+    modules, raw, _ = import_times(argv, cwd)
+    print(f"main.py --daemon: {top_level_ms(raw):.1f} ms of imports, {len(modules)} modules")
+    return [f"`main.py --daemon` imported {name}" for name in STARTUP_FORBIDDEN if name in modules]
+
+
+def check_command(name, cwd, verbose):
+    module_name = COMMANDS[name][0]
+    # importlib.import_module bypasses -X importtime's report for the module
+    # itself, so the loaded set comes from sys.modules.
+    code = (f"import sys; sys.path.append({ROOT!r}); from src.commands import load_command; "
+            f"load_command({name!r}); print(' '.join(sys.modules))")
+    modules, raw, out = import_times(['-c', code], cwd)
+    loaded = set(out.split())
+    failures = []
+    if module_name not in loaded:
+        failures.append(f"{name}: {module_name} failed to import")
+    others = {module for command, (module, _) in COMMANDS.items() if command != name}
+    for leaked in sorted((others & loaded) - ALLOWED_DEPENDENCIES.get(name, set())):
+        failures.append(f"{name}: imported another command's module {leaked}")
+    advanced = {mod for mod in loaded if mod.startswith('src.advanced.')} - {module_name}
+    for leaked in sorted(advanced - ALLOWED_DEPENDENCIES.get(name, set())):
+        failures.append(f"{name}: imported strategy module {leaked}")
+    if name in SYNC_COMMANDS or name in LAZY_ASYNC_COMMANDS:
+        failures.extend(f"{name}: imported {mod}" for mod in SYNC_FORBIDDEN if mod in loaded)
+    print(f"{name:<12} {top_level_ms(raw):7.1f} ms of imports, {len(loaded)} modules")
+    if verbose:
+        for mod, us in sorted(modules.items(), key=lambda item: -item[1])[:5]:
+            print(f"    {us / 1000:8.1f} ms  {mod}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CLI startup import check (python -X importtime)")
+    parser.add_argument("--budget_ms", type=float, default=50.0,
+                        help="Max import time for `main.py --help` (0 disables the time check)")
+    parser.add_argument("--verbose", action="store_true", help="Show the slowest imports")
+    args = parser.parse_args(argv)
+
+    failures = []
+    # Run from a scratch directory so nothing can touch the repo's bot.log.
+    with tempfile.TemporaryDirectory() as tmp:
+        failures.extend(check_startup(args.budget_ms, tmp, args.verbose))
+        failures.extend(check_thin_client(tmp))
+        for name in COMMANDS:
+            failures.extend(check_command(name, tmp, args.verbose))
+
+    if failures:
+        print("\nStartup check FAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nStartup check passed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,3 +8,16 @@ BASE_URL = "https://testnet.binancefuture.com"
 
 # Uncomment for Real Trading (Risk Warning!)
 # BASE_URL = "https://fapi.binance.com"
+
+# Futures WebSocket endpoint (user-data stream). Testnet by default.
+WS_URL = "wss://fstream.binancefuture.com"
+# WS_URL = "wss://fstream.binance.com"
+
+# Logging: async writes through a background queue, optional JSON lines.
+LOG_ASYNC = True
+LOG_JSON = False
+LOG_LEVEL = "INFO"  # DEBUG also logs request params (signature redacted)
+
+# Local order/position store (SQLite, binance_bot/orders-<hash>.db per BASE_URL and API key, opened on the first recorded order).
+STORE_ENABLED = True
+STORE_RETENTION_DAYS = 7  # `store compact` drops closed orders older than this
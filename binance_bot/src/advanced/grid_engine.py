@@ -0,0 +1,323 @@
+import asyncio
+import secrets
+from array import array
+from src.client import get_client, format_param, error_code, ORDER_NOT_FOUND
+from src.async_client import AsyncBinanceClient
+from src.user_stream import UserDataStream
+from src.advanced.grid_strategy import validate_grid, place_batch_orders
+from src.exchange_info import get_symbol_filters
+from src.utils import logger
+import config
+
+EMPTY, BUY, SELL = 0, 1, 2
+SIDE_NAMES = {BUY: 'BUY', SELL: 'SELL'}
+QUEUED, IN_FLIGHT = 1, 2  # GridBook.pending states
+REPLACE_BACKOFF = 1.0  # first re-place delay after a rejection, doubled per failure
+REPLACE_BACKOFF_MAX = 60.0
+
+
+class GridBook:
+    """
+    Fixed-size level book for one symbol's grid.
+
+    Each level owns a slot in flat arrays (side, exchange order id, client id
+    generation), so memory is set once by the number of levels and does not
+    grow with the number of fills. Orders are tagged with a client order id
+    of the form <prefix><book>_<level>_<generation>, which lets a fill event
+    be mapped back to its level without any lookup table.
+    """
+
+    def __init__(self, book_id, symbol, prices, qty):
+        self.book_id = book_id
+        self.symbol = symbol
+        self.prices = [format_param(p) for p in prices]
+        self.qty = qty
+        levels = len(prices)
+        self.sides = bytearray(levels)
+        self.pending = bytearray(levels)
+        self.failures = bytearray(levels)
+        self.order_ids = array('q', bytes(8 * levels))
+        self.generations = array('I', bytes(4 * levels))
+        self.fills = 0
+        self.rejections = 0
+
+    def unplaced(self):
+        """
+        Levels that hold a side but no order: rejected and waiting to be re-placed.
+        """
+        return [level for level, side in enumerate(self.sides)
+                if side != EMPTY and not self.order_ids[level] and not self.pending[level]]
+
+    def __len__(self):
+        return len(self.prices)
+
+
+class GridEngine:
+    """
+    Resident, event-driven grid bot for any number of symbols.
+
+    When a level's BUY fills, a SELL is queued one level up; when a SELL
+    fills, a BUY is queued one level down. Queued replacements are coalesced
+    for `batch_window` seconds and flushed in as few batchOrders calls as
+    possible, all chunks in flight at once. A rejected level keeps its side
+    and is re-placed with exponential backoff (and on every resync).
+
+    `client` is an AsyncBinanceClient. Register on a UserDataStream with
+    attach() to receive fills. `symbol_filters` looks up exchange filters
+    for a symbol (None skips the checks).
+    """
+
+    def __init__(self, client, batch_window=0.05, symbol_filters=get_symbol_filters):
+        self.client = client
+        self.symbol_filters = symbol_filters
+        self.batch_window = batch_window
+        self.prefix = f"g{secrets.token_hex(2)}"
+        self.books = []
+        self._by_symbol = {}
+        self._queue = []
+        self._flush_task = None
+        self._retries = set()
+
+    def attach(self, stream):
+        stream.add_handler('ORDER_TRADE_UPDATE', self.on_order_update)
+        stream.add_resync_handler(self.resync)
+
+    def _client_id(self, book, level):
+        return f"{self.prefix}{book.book_id}_{level}_{book.generations[level]}"
+
+    def _parse_client_id(self, client_id):
+        if not client_id or not client_id.startswith(self.prefix):
+            return None
+        try:
+            book_id, level, generation = (int(x) for x in client_id[len(self.prefix):].split('_'))
+            book = self.books[book_id]
+        except (ValueError, IndexError):
+            return None
+        if level >= len(book) or generation != book.generations[level]:
+            return None  # Stale order from an earlier generation of this level.
+        return book, level
+
+    def _queue_level(self, book, level, side):
+        book.sides[level] = side
+        book.order_ids[level] = 0
+        book.generations[level] += 1
+        if book.pending[level] != QUEUED:
+            book.pending[level] = QUEUED
+            self._queue.append((book, level))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def add_grid(self, symbol, lower_price, upper_price, grid_levels, qty_per_grid):
+        """
+        Creates a grid and places its initial orders. The level closest to the
+        current price is left empty so every fill has a free level to move to.
+        """
+        if symbol in self._by_symbol:
+            raise ValueError(f"Grid already running for {symbol}")
+        loop = asyncio.get_running_loop()
+        filters = await loop.run_in_executor(None, self.symbol_filters, symbol)
+        prices, qty_per_grid = validate_grid(symbol, lower_price, upper_price, grid_levels, qty_per_grid, filters)
+
+        ticker = await self.client.send_request('GET', '/fapi/v1/ticker/price', {'symbol': symbol})
+        current_price = float(ticker['price'])
+
+        book = GridBook(len(self.books), symbol, prices, qty_per_grid)
+        self.books.append(book)
+        self._by_symbol[symbol] = book
+
+        gap = min(range(len(prices)), key=lambda i: abs(float(prices[i]) - current_price))
+        for level, price in enumerate(prices):
+            if level != gap:
+                self._queue_level(book, level, BUY if price < current_price else SELL)
+
+        logger.info(f"Grid Engine: {symbol} {grid_levels} levels [{lower_price} - {upper_price}], Current: {current_price}")
+        await self.flush()
+        return book
+
+    async def on_order_update(self, event):
+        order = event.get('o', {})
+        if order.get('X') != 'FILLED':
+            return
+        located = self._parse_client_id(order.get('c'))
+        if located is None:
+            return
+        book, level = located
+        side = book.sides[level]
+        if side == EMPTY:
+            return  # Duplicate fill event (e.g. replayed by resync).
+        book.sides[level] = EMPTY
+        book.order_ids[level] = 0
+        book.fills += 1
+
+        target, new_side = (level + 1, SELL) if side == BUY else (level - 1, BUY)
+        # An occupied target level is already covered; never orphan its order.
+        if 0 <= target < len(book) and book.sides[target] == EMPTY:
+            self._queue_level(book, target, new_side)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.batch_window)
+        await self.flush()
+
+    def _order_params(self, book, level):
+        return {
+            'symbol': book.symbol,
+            'side': SIDE_NAMES[book.sides[level]],
+            'type': 'LIMIT',
+            'quantity': book.qty,
+            'price': book.prices[level],
+            'timeInForce': 'GTC',
+            'newClientOrderId': self._client_id(book, level),
+        }
+
+    async def flush(self):
+        """
+        Sends every queued level through concurrent batchOrders calls.
+        """
+        queue, self._queue = self._queue, []
+        if not queue:
+            return
+
+        slots = []
+        for book, level in queue:
+            book.pending[level] = 0
+            if book.sides[level] != EMPTY:
+                book.pending[level] = IN_FLIGHT
+                slots.append((book, level, self._client_id(book, level)))
+
+        report = await place_batch_orders(self.client, [self._order_params(book, level) for book, level, _ in slots])
+
+        for (book, level, client_id), placed in zip(slots, report['results']):
+            # The level may have been filled and re-queued while this batch was in flight.
+            if client_id != self._client_id(book, level) or book.sides[level] == EMPTY:
+                continue
+            book.pending[level] = 0
+            if 'orderId' in placed:
+                book.order_ids[level] = placed['orderId']
+                book.failures[level] = 0
+            else:
+                book.rejections += 1
+                delay = self._schedule_replace(book, level)
+                logger.error(f"Grid order {book.symbol} level {level} rejected: {placed.get('msg', placed)} "
+                             f"(retrying in {delay:.1f}s)")
+
+    def _schedule_replace(self, book, level):
+        book.failures[level] = min(book.failures[level] + 1, 255)
+        delay = min(REPLACE_BACKOFF_MAX, REPLACE_BACKOFF * 2 ** (book.failures[level] - 1))
+        task = asyncio.create_task(self._replace_later(book, level, self._client_id(book, level), delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+        return delay
+
+    async def _replace_later(self, book, level, client_id, delay):
+        await asyncio.sleep(delay)
+        # Filled, re-queued or re-placed (e.g. by resync) in the meantime.
+        if client_id == self._client_id(book, level) and level in book.unplaced():
+            await self._replace(book, level)
+
+    async def _replace(self, book, level):
+        """
+        Re-places a rejected level. Its last order is looked up first: an
+        outcome the batch could not determine may still have left it live.
+        """
+        client_id = self._client_id(book, level)
+        try:
+            order = await self.client.lookup_order(book.symbol, client_id)
+        except Exception as e:
+            if error_code(e) != ORDER_NOT_FOUND:
+                logger.warning(f"Grid lookup failed for {book.symbol} level {level}: {e}")
+                self._schedule_replace(book, level)
+                return
+            order = None
+        status = order.get('status') if order is not None else None
+        if status in ('NEW', 'PARTIALLY_FILLED', 'FILLED'):
+            book.order_ids[level] = order['orderId']
+            book.failures[level] = 0
+            if status == 'FILLED':
+                await self.on_order_update({'o': {'X': 'FILLED', 'c': client_id}})
+        else:
+            self._queue_level(book, level, book.sides[level])
+
+    async def resync(self):
+        """
+        After a reconnect, replays fills missed while the stream was down by
+        comparing each book with the exchange's open orders, and re-places
+        rejected levels without waiting for their backoff.
+        """
+        for book in self.books:
+            try:
+                open_orders = await self.client.send_request('GET', '/fapi/v1/openOrders', {'symbol': book.symbol})
+            except Exception as e:
+                logger.warning(f"Grid resync failed for {book.symbol}: {e}")
+                continue
+            live = {o.get('clientOrderId') for o in open_orders}
+            for level in range(len(book)):
+                if book.order_ids[level] and self._client_id(book, level) not in live:
+                    try:
+                        order = await self.client.lookup_order(book.symbol, self._client_id(book, level))
+                    except Exception as e:
+                        logger.warning(f"Grid resync lookup failed for {book.symbol} level {level}: {e}")
+                        continue
+                    status = order.get('status')
+                    if status == 'FILLED':
+                        await self.on_order_update({'o': {'X': 'FILLED', 'c': self._client_id(book, level)}})
+                    elif status in ('CANCELED', 'EXPIRED', 'REJECTED'):
+                        book.sides[level] = EMPTY
+                        book.order_ids[level] = 0
+            for level in book.unplaced():
+                await self._replace(book, level)
+
+    def stats(self):
+        return {
+            book.symbol: {
+                'levels': len(book),
+                'open': sum(1 for side in book.sides if side != EMPTY),
+                'fills': book.fills,
+                'rejections': book.rejections,
+                'unplaced': len(book.unplaced()),
+            }
+            for book in self.books
+        }
+
+
+async def run_grids(client, stream, grids):
+    """
+    Starts one grid per (symbol, lower, upper, levels, qty) tuple and keeps
+    re-placing filled levels until the stream stops.
+    """
+    engine = GridEngine(client)
+    engine.attach(stream)
+    runner = asyncio.create_task(stream.run())
+    connected = asyncio.create_task(stream.wait_connected())
+    await asyncio.wait({runner, connected}, return_when=asyncio.FIRST_COMPLETED)
+    if runner.done():
+        # The stream stopped before connecting (e.g. websockets not installed): surface why.
+        connected.cancel()
+        runner.result()
+        raise RuntimeError("User stream stopped before connecting.")
+    for grid in grids:
+        await engine.add_grid(*grid)
+    await runner
+    return engine
+
+
+def execute_dynamic_grid(symbol, lower_price, upper_price, grid_levels, qty_per_grid):
+    """
+    Runs a resident grid for one symbol until interrupted (Ctrl+C).
+    """
+    async def _run():
+        client = get_client(config.API_KEY, config.API_SECRET, config.BASE_URL)
+        async with AsyncBinanceClient.from_client(client) as async_client:
+            stream = UserDataStream(async_client, getattr(config, 'WS_URL', "wss://fstream.binancefuture.com"))
+            if client.store is not None:
+                client.store.attach(stream)
+            await run_grids(async_client, stream, [(symbol, lower_price, upper_price, grid_levels, qty_per_grid)])
+
+    try:
+        asyncio.run(_run())
+        return True
+    except KeyboardInterrupt:
+        logger.info("Grid Engine stopped by user.")
+        return True
+    except Exception as e:
+        logger.error(f"Grid Engine Failed: {e}")
+        return False
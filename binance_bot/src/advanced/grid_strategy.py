@@ -1,17 +1,168 @@
-from src.client import BinanceClient
+import asyncio
+import time
+from src.client import (
+    get_client, format_param, new_client_order_id, error_code, outcome_unknown, ORDER_NOT_FOUND, REJECTED_CODES,
+    UNKNOWN_OUTCOME_CODES,
+)
+from src.async_client import AsyncBinanceClient
+from src.exchange_info import get_symbol_filters
+from src.rate_limiter import PRIORITY_GRID
 from src.utils import logger, validate_inputs
 import config
 import json
 
-def execute_grid_strategy(symbol, lower_price, upper_price, grid_levels, qty_per_grid):
+BATCH_SIZE = 5  # Binance Futures accepts at most 5 orders per batchOrders call.
+MAX_IN_FLIGHT = 5
+MAX_RETRIES = 2
+# Per-order rejections worth resending: overload and timestamp drift. Unknown-outcome
+# codes (-1001/-1006/-1007) are only resent after a lookup finds no order; -1003
+# (rate limited) is not resent, the limiter holds later requests back instead.
+RETRYABLE_CODES = REJECTED_CODES
+
+def grid_prices(lower_price, upper_price, grid_levels, filters=None):
+    """
+    Returns the evenly spaced, rounded price of every grid level (lowest first).
+    With symbol filters, prices snap to the tick size instead of 2 decimals.
+    """
+    price_step = (upper_price - lower_price) / (grid_levels - 1)
+    prices = [lower_price + (i * price_step) for i in range(grid_levels)]
+    if filters is None:
+        return [round(price, 2) for price in prices]
+    return [filters.round_price(price) for price in prices]
+
+def validate_grid(symbol, lower_price, upper_price, grid_levels, qty_per_grid, filters=None):
+    """
+    Checks the grid parameters and every level against the symbol filters.
+    Returns (prices, qty_per_grid) with the quantity rounded to the step size.
+    """
+    if grid_levels < 2:
+        raise ValueError("A grid needs at least 2 levels.")
+    if lower_price <= 0 or upper_price <= lower_price:
+        raise ValueError(f"Invalid grid range [{lower_price} - {upper_price}]")
+    if qty_per_grid <= 0:
+        raise ValueError(f"Quantity must be positive. Got {qty_per_grid}")
+
+    prices = grid_prices(lower_price, upper_price, grid_levels, filters)
+    if filters is not None:
+        qty_per_grid = filters.round_qty(qty_per_grid)
+        if len(set(prices)) != len(prices):
+            raise ValueError(f"Grid step is smaller than the tick size {filters.tick_size} for {symbol}")
+        for price in prices:
+            filters.validate(qty_per_grid, price)
+    return prices, qty_per_grid
+
+async def place_batch_orders(client, orders, max_in_flight=MAX_IN_FLIGHT, max_retries=MAX_RETRIES,
+                             priority=PRIORITY_GRID):
+    """
+    Submits orders through /fapi/v1/batchOrders, BATCH_SIZE per call and up to
+    max_in_flight calls at once.
+
+    Each batch response holds one entry per order: the order itself, or an
+    error object ({'code': ..., 'msg': ...}). Every order is batched once; the
+    client already retries a batch that was rejected unexecuted. Orders
+    without a newClientOrderId get one. Afterwards, an order whose outcome is
+    unknown (e.g. its batch timed out) is looked up by that id, and an order
+    the exchange does not have, or one rejected on its own with a retryable
+    code, is resent once through /fapi/v1/order, where the client's retries
+    (up to max_retries) and client-order-id check apply.
+
+    Returns a report dict:
+        results  - one entry per input order, in input order (order or error)
+        placed   - number of orders accepted
+        failed   - [{'order': params, 'error': ...}] for orders that never went through
+        batches  - number of batchOrders calls made
+        retries  - number of order resends
+        elapsed  - wall-clock seconds
+    """
+    started = time.perf_counter()
+    orders = [
+        order if 'newClientOrderId' in order else {**order, 'newClientOrderId': new_client_order_id()}
+        for order in orders
+    ]
+    semaphore = asyncio.Semaphore(max_in_flight)
+    results = [None] * len(orders)
+    settled = set()  # failed as a whole batch, with nothing left to resend
+    batches = 0
+    retries = 0
+
+    async def send_chunk(indices):
+        nonlocal batches
+        async with semaphore:
+            batches += 1
+            params = {'batchOrders': json.dumps([orders[i] for i in indices], default=format_param)}
+            try:
+                response = await client.send_request('POST', "/fapi/v1/batchOrders", params, priority=priority)
+            except Exception as e:
+                error = {'code': error_code(e), 'msg': str(e)}
+                if outcome_unknown(e):
+                    error['unknown'] = True
+                else:
+                    # The client already retried it if it was rejected unexecuted.
+                    settled.update(indices)
+                response = [error] * len(indices)
+        if not isinstance(response, list) or len(response) != len(indices):
+            # A whole-batch error body, or a reply that cannot be matched to the orders.
+            if isinstance(response, dict) and 'code' in response:
+                error = {'code': response['code'], 'msg': response.get('msg')}
+                settled.update(indices)
+            else:
+                error = {'code': None, 'msg': f"Unexpected batchOrders response: {response!r}", 'unknown': True}
+            response = [error] * len(indices)
+        for i, entry in zip(indices, response):
+            results[i] = entry
+
+    async def resend(i):
+        async with semaphore:
+            if results[i].get('unknown') or results[i].get('code') in UNKNOWN_OUTCOME_CODES:
+                try:
+                    results[i] = await client.lookup_order(orders[i]['symbol'], orders[i]['newClientOrderId'])
+                    return False
+                except Exception as e:
+                    if error_code(e) != ORDER_NOT_FOUND:
+                        results[i] = {'code': error_code(e), 'msg': f"Outcome unknown, not resent: {e}"}
+                        return False
+            try:
+                results[i] = await client.send_request('POST', '/fapi/v1/order', orders[i], priority=priority,
+                                                       retries=max_retries)
+            except Exception as e:
+                results[i] = {'code': error_code(e), 'msg': str(e)}
+            return True
+
+    indices = list(range(len(orders)))
+    chunks = [indices[i:i + BATCH_SIZE] for i in range(0, len(indices), BATCH_SIZE)]
+    await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+    pending = [
+        i for i in indices
+        if 'orderId' not in results[i] and i not in settled
+        and (results[i].get('unknown') or results[i].get('code') in RETRYABLE_CODES | UNKNOWN_OUTCOME_CODES)
+    ]
+    if pending:
+        logger.info(f"Reconciling {len(pending)} unplaced orders one by one...")
+        retries = sum(await asyncio.gather(*(resend(i) for i in pending)))
+
+    failed = [{'order': orders[i], 'error': results[i]} for i in range(len(orders)) if 'orderId' not in results[i]]
+    return {
+        'results': results,
+        'placed': len(orders) - len(failed),
+        'failed': failed,
+        'batches': batches,
+        'retries': retries,
+        'elapsed': time.perf_counter() - started,
+    }
+
+def execute_grid_strategy(symbol, lower_price, upper_price, grid_levels, qty_per_grid, max_in_flight=MAX_IN_FLIGHT):
     """
     Places a simple Grid of Limit Orders (Long/Short) within a range.
-    Note: Real grid bots are dynamic. This is a static 'Place Orders' setup.
+    Note: Real grid bots are dynamic. This is a static 'Place Orders' setup
+    (see grid_engine for the resident version).
+    Batches are submitted concurrently; returns the placement report from
+    place_batch_orders, or False if the grid could not be set up.
     """
     try:
-        client = BinanceClient(config.API_KEY, config.API_SECRET, config.BASE_URL)
-        
-        price_step = (upper_price - lower_price) / (grid_levels - 1)
+        client = get_client(config.API_KEY, config.API_SECRET, config.BASE_URL)
+        prices, qty_per_grid = validate_grid(
+            symbol, lower_price, upper_price, grid_levels, qty_per_grid, get_symbol_filters(symbol)
+        )
         
         orders = []
         
@@ -20,10 +171,7 @@ def execute_grid_strategy(symbol, lower_price, upper_price, grid_levels, qty_per
         
         logger.info(f"Grid Strategy: Range [{lower_price} - {upper_price}], Current: {current_price}")
         
-        for i in range(grid_levels):
-            price = lower_price + (i * price_step)
-            price = round(price, 2) # Adjust precision
-            
+        for price in prices:
             # Simple Neutral Grid logic:
             # Below Market Price -> BUY
             # Above Market Price -> SELL
@@ -38,26 +186,27 @@ def execute_grid_strategy(symbol, lower_price, upper_price, grid_levels, qty_per
                 'side': side,
                 'type': 'LIMIT',
                 'quantity': qty_per_grid,
-                'price': str(price),
+                'price': format_param(price),
                 'timeInForce': 'GTC'
             }
             orders.append(order)
             
-        # Send Batch
-        # Binance limits batch to 5 orders per request usually. We'll chunk it.
-        chunk_size = 5
-        for i in range(0, len(orders), chunk_size):
-            chunk = orders[i:i + chunk_size]
-            logger.info(f"Placing Grid Batch {i//chunk_size + 1} ({len(chunk)} orders)...")
-            
-            params = {
-                'batchOrders': json.dumps(chunk)
-            }
-            client.send_request('POST', "/fapi/v1/batchOrders", params)
-            
-        logger.info(f"Grid Strategy Placed {len(orders)} orders.")
-        return True
+        # Send Batches concurrently
+        logger.info(f"Placing Grid: {len(orders)} orders in batches of {BATCH_SIZE}, {max_in_flight} in flight...")
+        report = asyncio.run(_place(client, orders, max_in_flight))
+
+        for failure in report['failed']:
+            logger.error(f"Grid order {failure['order']['side']} @ {failure['order']['price']} failed: {failure['error'].get('msg')}")
+        logger.info(
+            f"Grid Strategy Placed {report['placed']}/{len(orders)} orders in {report['batches']} batches "
+            f"({report['retries']} retries, {report['elapsed']:.2f}s)."
+        )
+        return report
         
     except Exception as e:
         logger.error(f"Grid Strategy Failed: {e}")
         return False
+
+async def _place(client, orders, max_in_flight):
+    async with AsyncBinanceClient.from_client(client, pool_size=max_in_flight) as async_client:
+        return await place_batch_orders(async_client, orders, max_in_flight)
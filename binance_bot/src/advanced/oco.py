@@ -1,8 +1,10 @@
-from src.client import BinanceClient
+from src.client import get_client, format_param
+from src.exchange_info import normalize_order, normalize_price
+from src.rate_limiter import PRIORITY_STOP_LOSS
 from src.utils import logger, validate_inputs
 import config
 
-def place_oco_order(symbol, side, qty, price, stop_price, stop_limit_price):
+def place_oco_order(symbol, side, qty, price, stop_price, stop_limit_price, monitor=False):
     """
     Simulates an OCO (One-Cancels-the-Other) order for Futures.
     Note: Binance Futures does not have a native single 'OCO' endpoint like Spot.
@@ -10,13 +12,16 @@ def place_oco_order(symbol, side, qty, price, stop_price, stop_limit_price):
     1. Limit Order (Take Profit)
     2. Stop Market/Limit Order (Stop Loss)
     
-    This function places BOTH. (Note: Cancelling one when other fills requires WebSocket monitoring, 
-    unavailable in this simple CLI. We just place both legs here).
+    This function places BOTH. With monitor=True it then stays on the user-data
+    stream and cancels the remaining leg as soon as the other one fills.
     """
     try:
         validate_inputs(symbol, side, qty, price)
+        qty, price = normalize_order(symbol, qty, price)
+        _, stop_limit_price = normalize_order(symbol, qty, stop_limit_price)
+        stop_price = normalize_price(symbol, stop_price)
         
-        client = BinanceClient(config.API_KEY, config.API_SECRET, config.BASE_URL)
+        client = get_client(config.API_KEY, config.API_SECRET, config.BASE_URL)
         
         logger.info(f"Placing OCO Strategy for {symbol} {side} {qty}")
         
@@ -55,15 +60,35 @@ def place_oco_order(symbol, side, qty, price, stop_price, stop_limit_price):
         endpoint = "/fapi/v1/batchOrders"
         import json
         batch_params = {
-            'batchOrders': json.dumps([params_tp, params_sl])
+            'batchOrders': json.dumps([params_tp, params_sl], default=format_param)
         }
         
         logger.info(f"Sending Batch OCO: TP @ {price}, SL @ {stop_price}")
-        response = client.send_request('POST', endpoint, batch_params)
+        response = client.send_request('POST', endpoint, batch_params, priority=PRIORITY_STOP_LOSS)
         
         logger.info(f"OCO Orders Placed. Responses: {len(response)}")
+
+        if monitor:
+            import asyncio
+            try:
+                asyncio.run(_monitor(client, symbol, response))
+            except Exception as e:
+                # Both legs are live at this point; report them even if monitoring stopped.
+                logger.error(f"OCO monitoring stopped: {e}")
         return response
         
     except Exception as e:
         logger.error(f"Failed to place OCO order: {e}")
         return None
+
+async def _monitor(client, symbol, response):
+    # The async stack is only needed with --monitor; a plain OCO stays synchronous.
+    from src.async_client import AsyncBinanceClient
+    from src.user_stream import UserDataStream
+    from src.advanced.oco_monitor import monitor_oco
+
+    async with AsyncBinanceClient.from_client(client, pool_size=2) as async_client:
+        stream = UserDataStream(async_client, getattr(config, 'WS_URL', "wss://fstream.binancefuture.com"))
+        if client.store is not None:
+            client.store.attach(stream)
+        await monitor_oco(async_client, stream, symbol, response)
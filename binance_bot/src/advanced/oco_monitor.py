@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import deque
+from src.rate_limiter import PRIORITY_CANCEL
+from src.utils import logger
+
+FILL_STATUSES = ('PARTIALLY_FILLED', 'FILLED')
+DONE_STATUSES = ('FILLED', 'CANCELED', 'EXPIRED', 'REJECTED')
+
+
+class OcoMonitor:
+    """
+    Cancels the sibling leg of an OCO pair as soon as either leg fills.
+
+    Register it on a UserDataStream with attach(). Fill-to-cancel latency is
+    recorded per cancel in `latencies` (bounded), measured both from local
+    receipt of the fill event and from the exchange's event time.
+    """
+
+    def __init__(self, client, max_latency_samples=1000):
+        self.client = client
+        self._siblings = {}
+        self._symbols = {}
+        self.latencies = deque(maxlen=max_latency_samples)
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def attach(self, stream):
+        stream.add_handler('ORDER_TRADE_UPDATE', self.on_order_update)
+        stream.add_resync_handler(self.resync)
+
+    def track(self, symbol, take_profit_id, stop_loss_id):
+        take_profit_id, stop_loss_id = int(take_profit_id), int(stop_loss_id)
+        self._siblings[take_profit_id] = stop_loss_id
+        self._siblings[stop_loss_id] = take_profit_id
+        self._symbols[take_profit_id] = self._symbols[stop_loss_id] = symbol
+        self._idle.clear()
+        logger.info(f"OCO monitor tracking {symbol}: TP {take_profit_id} / SL {stop_loss_id}")
+
+    def track_batch_response(self, symbol, response):
+        """
+        Tracks the two legs returned by place_oco_order's batchOrders call.
+        """
+        if not response or len(response) != 2 or any('orderId' not in leg for leg in response):
+            raise ValueError(f"Cannot monitor OCO, a leg was not placed: {response}")
+        self.track(symbol, response[0]['orderId'], response[1]['orderId'])
+
+    @property
+    def pending(self):
+        return len(self._siblings) // 2
+
+    async def wait_idle(self):
+        """
+        Waits until every tracked pair has been resolved.
+        """
+        await self._idle.wait()
+
+    def _untrack(self, order_id, notify=True):
+        sibling = self._siblings.pop(order_id, None)
+        self._symbols.pop(order_id, None)
+        if sibling is not None:
+            self._siblings.pop(sibling, None)
+            self._symbols.pop(sibling, None)
+        if notify:
+            self._notify_if_idle()
+        return sibling
+
+    def _notify_if_idle(self):
+        if not self._siblings:
+            self._idle.set()
+
+    async def _cancel_sibling(self, order_id, received, event_time_ms=None):
+        symbol = self._symbols.get(order_id)
+        # Untrack first so a duplicate fill event cannot cancel twice, but only
+        # report idle once the cancel has actually been acknowledged.
+        sibling = self._untrack(order_id, notify=False)
+        if sibling is None:
+            return
+        sent = time.perf_counter()
+        try:
+            await self.client.send_request(
+                'DELETE', "/fapi/v1/order", {'symbol': symbol, 'orderId': sibling},
+                priority=PRIORITY_CANCEL,
+            )
+        except Exception as e:
+            logger.error(f"OCO sibling cancel failed for {sibling}: {e}")
+            return
+        finally:
+            self._notify_if_idle()
+        done = time.perf_counter()
+        sample = {
+            'order_id': order_id,
+            'cancelled_id': sibling,
+            'event_to_send_ms': (sent - received) * 1000,
+            'event_to_ack_ms': (done - received) * 1000,
+        }
+        if event_time_ms is not None:
+            sample['exchange_to_send_ms'] = time.time() * 1000 - event_time_ms - (done - sent) * 1000
+        self.latencies.append(sample)
+        logger.info(
+            f"OCO leg {order_id} filled, cancelled {sibling} "
+            f"(fill->cancel sent {sample['event_to_send_ms']:.2f} ms, acked {sample['event_to_ack_ms']:.2f} ms)"
+        )
+
+    async def on_order_update(self, event):
+        received = time.perf_counter()
+        order = event.get('o', {})
+        order_id = order.get('i')
+        if order_id not in self._siblings:
+            return
+        status = order.get('X')
+        if status in FILL_STATUSES:
+            await self._cancel_sibling(order_id, received, event.get('E'))
+        elif status in DONE_STATUSES:
+            # Leg cancelled or expired outside the monitor: nothing left to protect.
+            self._untrack(order_id)
+
+    async def resync(self):
+        """
+        Catches up on fills missed while the stream was disconnected.
+        """
+        pairs = {tuple(sorted(pair)) for pair in self._siblings.items()}
+        for pair in pairs:
+            for order_id in pair:
+                if order_id not in self._siblings:
+                    break
+                try:
+                    order = await self.client.lookup_order(self._symbols[order_id], order_id=order_id)
+                except Exception as e:
+                    logger.warning(f"OCO resync failed for {order_id}: {e}")
+                    continue
+                status = order.get('status')
+                if status in FILL_STATUSES:
+                    await self._cancel_sibling(order_id, time.perf_counter())
+                elif status in DONE_STATUSES:
+                    self._untrack(order_id)
+
+async def monitor_oco(client, stream, symbol, response):
+    """
+    Runs the user-data stream until the OCO pair in `response` is resolved.
+    """
+    monitor = OcoMonitor(client)
+    monitor.attach(stream)
+    monitor.track_batch_response(symbol, response)
+    runner = asyncio.create_task(stream.run())
+    idle = asyncio.create_task(monitor.wait_idle())
+    try:
+        await asyncio.wait({runner, idle}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stream.stop()
+        idle.cancel()
+        # Surfaces stream start-up failures (e.g. websockets not installed).
+        await runner
+    return monitor
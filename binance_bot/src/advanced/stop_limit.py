@@ -1,4 +1,6 @@
-from src.client import BinanceClient
+from src.client import get_client
+from src.exchange_info import normalize_order, normalize_price
+from src.rate_limiter import PRIORITY_STOP_LOSS
 from src.utils import logger, validate_inputs
 import config
 
@@ -11,8 +13,10 @@ def place_stop_limit_order(symbol, side, qty, price, stop_price, time_in_force='
         validate_inputs(symbol, side, qty, price)
         if stop_price <= 0:
             raise ValueError("Stop Price must be positive.")
+        qty, price = normalize_order(symbol, qty, price)
+        stop_price = normalize_price(symbol, stop_price)
             
-        client = BinanceClient(config.API_KEY, config.API_SECRET, config.BASE_URL)
+        client = get_client(config.API_KEY, config.API_SECRET, config.BASE_URL)
         
         logger.info(f"Placing Stop-Limit: {side} {qty} {symbol} Trigger: {stop_price} Limit: {price}")
         
@@ -27,7 +31,7 @@ def place_stop_limit_order(symbol, side, qty, price, stop_price, time_in_force='
             'timeInForce': time_in_force
         }
         
-        response = client.send_request('POST', endpoint, params)
+        response = client.send_request('POST', endpoint, params, priority=PRIORITY_STOP_LOSS)
         
         logger.info(f"Stop-Limit Order Placed: {response['orderId']}")
         return response
@@ -1,52 +1,177 @@
-import time
-from src.client import BinanceClient
+import asyncio
+from decimal import Decimal, ROUND_DOWN
+from src.client import get_client, new_client_order_id, outcome_unknown
+from src.async_client import AsyncBinanceClient
+from src.exchange_info import get_symbol_filters
 from src.utils import logger, validate_inputs
 import config
 
+DEFAULT_STEP_SIZE = '0.001'  # Used when exchange filters are unavailable.
+
+def twap_slices(total_qty, num_orders, step_size=DEFAULT_STEP_SIZE):
+    """
+    Splits total_qty into num_orders step-aligned slices whose sum is exactly
+    total_qty (rounded down to the step). Each slice is the difference between
+    consecutive cumulative targets, so rounding remainders carry forward
+    instead of being lost. Returns Decimals.
+    """
+    step = Decimal(step_size)
+    if step <= 0:
+        step = Decimal(DEFAULT_STEP_SIZE)
+    total = (Decimal(str(total_qty)) / step).to_integral_value(ROUND_DOWN) * step
+    slices = []
+    done = Decimal(0)
+    for i in range(1, num_orders + 1):
+        target = (total * i / num_orders / step).to_integral_value(ROUND_DOWN) * step
+        slices.append(target - done)
+        done = target
+    return slices
+
+async def run_twap(client, symbol, side, total_qty, duration_seconds, num_orders, filters=None, price=None):
+    """
+    Runs one TWAP parent on the event loop.
+
+    Slice i is sent at start + i * interval on the loop's monotonic clock, so
+    request latency never pushes later slices back. Every slice is checked
+    against the symbol filters (min/max quantity, and minNotional at the
+    reference `price` when one is given); a slice above the maximum is capped.
+    Quantity a slice could not execute (request failed, or rejected by the
+    filters) is carried into the next slice. The client already looks a
+    slice up by its client order id after an unknown outcome, so a slice
+    that still fails with one is reported as unknown instead of being sent
+    again. Returns a report with per-slice schedule slippage.
+    """
+    loop = asyncio.get_running_loop()
+    interval = duration_seconds / num_orders
+    step = filters.market_step_size if filters is not None else DEFAULT_STEP_SIZE
+    max_qty = Decimal(str(filters.market_max_qty)) if filters is not None else Decimal(0)
+    planned = twap_slices(total_qty, num_orders, step)
+    side = side.upper()
+
+    logger.info(f"Starting TWAP: {side} {total_qty} {symbol} over {duration_seconds}s in {num_orders} slices.")
+
+    start = loop.time()
+    carry = Decimal(0)
+    executed = Decimal(0)
+    unknown = Decimal(0)
+    slices = []
+    for i, qty in enumerate(planned):
+        scheduled = start + i * interval
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        qty += carry
+        carry = Decimal(0)
+        entry = {'slice': i + 1, 'qty': float(qty), 'scheduled_s': i * interval}
+        if max_qty and qty > max_qty:
+            carry, qty = qty - max_qty, max_qty
+            entry['qty'] = float(qty)
+        try:
+            if qty <= 0:
+                raise ValueError(f"Quantity {qty} is not positive")
+            if filters is not None:
+                filters.validate(qty, price, market=True)
+        except ValueError as rejected:
+            logger.info(f"TWAP {symbol} Slice {i+1}/{num_orders}: {rejected}, carrying forward")
+            carry += qty
+            entry['skipped'] = True
+            slices.append(entry)
+            continue
+
+        sent = loop.time()
+        entry['slippage_ms'] = (sent - scheduled) * 1000
+        logger.info(f"TWAP {symbol} Slice {i+1}/{num_orders}: Placing Market Order for {qty}")
+        params = {
+            'symbol': symbol,
+            'side': side,
+            'type': 'MARKET',
+            'quantity': format(qty, 'f'),
+            'newClientOrderId': new_client_order_id(),
+        }
+        try:
+            resp = await client.send_request('POST', "/fapi/v1/order", params)
+            executed += qty
+            entry['order_id'] = resp.get('orderId')
+            logger.info(f"Slice {i+1} Filled: {resp.get('orderId', 'Unknown ID')}")
+        except Exception as slice_err:
+            entry['error'] = str(slice_err)
+            logger.error(f"Slice {i+1} Failed: {slice_err}")
+            if outcome_unknown(slice_err):
+                # Sending it again could double the fill; leave it for the operator.
+                unknown += qty
+                entry['unknown'] = True
+                logger.error(f"Slice {i+1} outcome unknown, not carried forward")
+            else:
+                # Continue strategy even if one fails; the next slice picks up the quantity.
+                carry += qty
+        entry['latency_ms'] = (loop.time() - sent) * 1000
+        slices.append(entry)
+
+    slippages = [s['slippage_ms'] for s in slices if 'slippage_ms' in s]
+    report = {
+        'symbol': symbol,
+        'side': side,
+        'target_qty': float(sum(planned)),
+        'executed_qty': float(executed),
+        'unexecuted_qty': float(carry),
+        'unknown_qty': float(unknown),
+        'elapsed_s': loop.time() - start,
+        'max_slippage_ms': max(slippages, default=0.0),
+        'mean_slippage_ms': sum(slippages) / len(slippages) if slippages else 0.0,
+        'slices': slices,
+    }
+    logger.info(
+        f"TWAP {symbol} Completed: executed {report['executed_qty']} of {report['target_qty']}, "
+        f"max slippage {report['max_slippage_ms']:.1f} ms."
+    )
+    return report
+
+async def run_twaps(client, parents, symbol_filters=get_symbol_filters):
+    """
+    Runs many TWAP parents concurrently in one event loop. `parents` is an
+    iterable of (symbol, side, total_qty, duration_seconds, num_orders).
+    Returns one report (or exception) per parent, in order.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def run_one(symbol, side, total_qty, duration_seconds, num_orders):
+        validate_inputs(symbol, side, total_qty)
+        if duration_seconds <= 0 or num_orders <= 0:
+            raise ValueError("Duration and Order Count must be positive.")
+        filters = await loop.run_in_executor(None, symbol_filters, symbol) if symbol_filters else None
+        price = None
+        if filters is not None and filters.min_notional:
+            # minNotional needs a price; market slices use the price at the start.
+            ticker = await client.send_request('GET', "/fapi/v1/ticker/price", {'symbol': symbol})
+            price = float(ticker['price'])
+        return await run_twap(client, symbol, side, total_qty, duration_seconds, num_orders, filters, price)
+
+    return await asyncio.gather(*(run_one(*parent) for parent in parents), return_exceptions=True)
+
+def execute_twaps(parents):
+    """
+    Blocking entry point for run_twaps using the shared client.
+    """
+    async def _run():
+        client = get_client(config.API_KEY, config.API_SECRET, config.BASE_URL)
+        async with AsyncBinanceClient.from_client(client) as async_client:
+            return await run_twaps(async_client, parents)
+
+    return asyncio.run(_run())
+
 def execute_twap(symbol, side, total_qty, duration_seconds, num_orders):
     """
     Executes a TWAP (Time Weighted Average Price) strategy.
     Splits total_qty into num_orders and executes them over duration_seconds.
+    Returns the run_twap report, or False if the strategy could not run.
     """
     try:
-        validate_inputs(symbol, side, total_qty)
-        
-        if duration_seconds <= 0 or num_orders <= 0:
-            raise ValueError("Duration and Order Count must be positive.")
-            
-        qty_per_order = round(total_qty / num_orders, 3) # Adjust precision logic for real usage
-        interval = duration_seconds / num_orders
-        
-        client = BinanceClient(config.API_KEY, config.API_SECRET, config.BASE_URL)
-        
-        logger.info(f"Starting TWAP: {side} {total_qty} {symbol} over {duration_seconds}s in {num_orders} slices.")
-        
-        for i in range(num_orders):
-            logger.info(f"TWAP Slice {i+1}/{num_orders}: Placing Market Order for {qty_per_order}")
-            
-            # Place Market Order slice
-            params = {
-                'symbol': symbol,
-                'side': side.upper(),
-                'type': 'MARKET',
-                'quantity': qty_per_order
-            }
-            
-            # Fire and log
-            try:
-                resp = client.send_request('POST', "/fapi/v1/order", params)
-                logger.info(f"Slice {i+1} Filled: {resp.get('orderId', 'Unknown ID')}")
-            except Exception as slice_err:
-                logger.error(f"Slice {i+1} Failed: {slice_err}")
-                # Continue strategy even if one fails? Yes, usually.
-            
-            if i < num_orders - 1:
-                logger.info(f"Sleeping for {interval:.2f}s...")
-                time.sleep(interval)
-                
-        logger.info("TWAP Strategy Completed.")
-        return True
-        
+        report = execute_twaps([(symbol, side, total_qty, duration_seconds, num_orders)])[0]
+        if isinstance(report, Exception):
+            raise report
+        return report
+
     except Exception as e:
         logger.error(f"TWAP Strategy Failed: {e}")
         return False
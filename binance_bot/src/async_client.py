@@ -0,0 +1,101 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from src.client import BinanceClient
+
+
+class AsyncBinanceClient:
+    """
+    asyncio front-end for BinanceClient.
+
+    Requests run on a bounded worker pool that shares one keep-alive
+    connection pool, so at most `pool_size` requests are in flight and
+    every one of them reuses a warm connection.
+    """
+
+    def __init__(self, api_key, api_secret, base_url="https://testnet.binancefuture.com", pool_size=10):
+        self.pool_size = pool_size
+        self._client = BinanceClient(api_key, api_secret, base_url, pool_size=pool_size)
+        self._owns_client = True
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='binance-http')
+
+    @classmethod
+    def from_client(cls, client, pool_size=10):
+        """
+        Wraps an existing BinanceClient (and its session) instead of creating a new one.
+        """
+        self = cls.__new__(cls)
+        self.pool_size = pool_size
+        self._client = client
+        self._owns_client = False
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='binance-http')
+        return self
+
+    @property
+    def client(self):
+        return self._client
+
+    async def send_request(self, method, endpoint, params=None, priority=None, signed=True, retries=None):
+        """
+        Sends a signed request without blocking the event loop (retries and
+        order dedup as in BinanceClient.send_request).
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._client.send_request, method, endpoint, params, priority, signed, retries
+        )
+
+    async def place_order(self, symbol, side, order_type, quantity, price=None, time_in_force="GTC", priority=None):
+        """
+        Places a new order.
+        """
+        endpoint = "/fapi/v1/order"
+        params = {
+            'symbol': symbol,
+            'side': side,
+            'type': order_type,
+            'quantity': quantity,
+        }
+
+        if price:
+            params['price'] = price
+            params['timeInForce'] = time_in_force
+
+        return await self.send_request('POST', endpoint, params, priority)
+
+    async def lookup_order(self, symbol, client_order_id=None, order_id=None):
+        """
+        Current state of an order (store first, as in BinanceClient.lookup_order).
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._client.lookup_order, symbol, client_order_id, order_id
+        )
+
+    async def get_account_info(self):
+        """
+        Retrieves account information.
+        """
+        return await self.send_request('GET', "/fapi/v2/account")
+
+    async def gather(self, requests, return_exceptions=True):
+        """
+        Fires many signed requests at once.
+
+        `requests` is an iterable of (method, endpoint, params) or
+        (method, endpoint, params, priority) tuples. Results
+        come back in the same order; with return_exceptions=True a failed
+        request yields its exception instead of cancelling the others.
+        """
+        tasks = [self.send_request(*request) for request in requests]
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self._owns_client:
+            self._client.session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
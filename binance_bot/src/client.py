@@ -1,69 +1,312 @@
+import logging
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import hmac
 import hashlib
-from urllib.parse import urlencode
+import itertools
+import secrets
+import threading
+from decimal import Decimal
+from urllib.parse import quote_plus
 from src.utils import logger
+from src.rate_limiter import RateLimiter, PRIORITY_NORMAL, PRIORITY_CANCEL
+
+ORDER_ENDPOINTS = ('/fapi/v1/order', '/fapi/v1/batchOrders')
+SUPPORTED_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+REQUEST_TIMEOUT = 10  # seconds; a request without one can hang an order path forever
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.2  # first retry delay in seconds, doubled per attempt
+RETRY_BACKOFF_MAX = 2.0
+TIMESTAMP_ERROR = -1021
+ORDER_NOT_FOUND = -2013
+# Rejected before execution: safe to resend as is.
+REJECTED_CODES = {-1008, TIMESTAMP_ERROR}
+# The exchange could not say whether the request executed.
+UNKNOWN_OUTCOME_CODES = {-1001, -1006, -1007}
+
+_client_id_prefix = f"bot{secrets.token_hex(3)}-"
+_client_id_counter = itertools.count(1)
+
+
+def new_client_order_id():
+    """
+    Returns a newClientOrderId unique to this process run (prefix + counter).
+    """
+    return f"{_client_id_prefix}{next(_client_id_counter)}"
+
+
+def error_code(exc):
+    """
+    Binance error code carried by a failed request, or None.
+    """
+    response = getattr(exc, 'response', None)
+    if response is None:
+        return None
+    try:
+        return response.json().get('code')
+    except ValueError:
+        return None
+
+
+def outcome_unknown(exc):
+    """
+    True when a failed request may still have been executed by the exchange
+    (read timeout, dropped connection, 5xx, or an unknown-status error code).
+    """
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return False
+    if isinstance(exc, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    response = getattr(exc, 'response', None)
+    if response is None:
+        return False
+    return response.status_code >= 500 or error_code(exc) in UNKNOWN_OUTCOME_CODES
+
+
+def _transient(exc):
+    if isinstance(exc, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    response = getattr(exc, 'response', None)
+    if response is None:
+        return False
+    return response.status_code >= 500 or error_code(exc) in REJECTED_CODES | UNKNOWN_OUTCOME_CODES
+
+
+def format_param(value):
+    """
+    Wire form of a request or batchOrders value: Decimals in fixed-point
+    notation (0.00005, never 5E-5), anything else as str().
+    """
+    return format(value, 'f') if isinstance(value, Decimal) else str(value)
+
+
+def build_query(params):
+    """
+    Builds a query string in one pass (same encoding as urlencode). The exact
+    string that gets signed is the one sent, so nothing is re-encoded later.
+    """
+    return '&'.join([f"{key}={quote_plus(format_param(value))}" for key, value in params.items()])
+
 
 class BinanceClient:
-    def __init__(self, api_key, api_secret, base_url="https://testnet.binancefuture.com"):
+    def __init__(self, api_key, api_secret, base_url="https://testnet.binancefuture.com", pool_size=10,
+                 rate_limiter=None, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES):
         self.api_key = api_key
         self.api_secret = api_secret
         self.base_url = base_url
         self.session = requests.Session()
+        # Keep-alive pool. pool_block makes extra callers wait for a free
+        # connection instead of opening (and then discarding) new ones.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'X-MBX-APIKEY': self.api_key
         })
+        # Keyed once; each signature copies this instead of re-keying HMAC.
+        self._hmac = hmac.new(self.api_secret.encode('utf-8'), digestmod=hashlib.sha256)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        # Exchange clock minus local clock, applied to every signed timestamp.
+        self.time_offset_ms = 0.0
+        self.time_synced_at = None
+        # Optional OrderStore (src.store.attach_store) that records order responses.
+        self.store = None
+        # Cold-start metrics: how long after creating the client the first
+        # order went out, and how long that first order request took.
+        self.created_at = time.perf_counter()
+        self.time_to_first_order = None
+        self.first_order_latency = None
+
+    def warm_up(self, background=False):
+        """
+        Opens the pooled connection ahead of the first order (TCP + TLS handshake)
+        and syncs the server time offset on the same round trip. With
+        background=True this runs on a daemon thread so it overlaps with
+        argument parsing and validation.
+        """
+        if background:
+            thread = threading.Thread(target=self.warm_up, name='binance-warmup', daemon=True)
+            thread.start()
+            return thread
+        try:
+            start = time.perf_counter()
+            self.sync_time()
+            logger.info("Connection to %s warmed up in %.1f ms", self.base_url, (time.perf_counter() - start) * 1000)
+        except Exception as e:
+            # Warm-up is best effort; the first real request will connect anyway.
+            logger.warning("Warm-up failed: %s", e)
+        return None
+
+    def sync_time(self):
+        """
+        Measures the exchange clock offset with /fapi/v1/time, assuming the
+        server stamped the reply halfway through the round trip.
+        """
+        self.rate_limiter.acquire('/fapi/v1/time', 'GET', None, PRIORITY_NORMAL)
+        before = time.time()
+        response = self.session.get(f"{self.base_url}/fapi/v1/time", timeout=self.timeout)
+        after = time.time()
+        response.raise_for_status()
+        self.time_offset_ms = response.json()['serverTime'] - (before + after) * 500
+        self.time_synced_at = after
+        logger.info("Server time offset %.1f ms (round trip %.1f ms)", self.time_offset_ms, (after - before) * 1000)
+        return self.time_offset_ms
+
+    def _record_order_timing(self, endpoint, method, started):
+        if self.time_to_first_order is not None:
+            return
+        if method.upper() != 'POST' or endpoint not in ORDER_ENDPOINTS:
+            return
+        now = time.perf_counter()
+        self.first_order_latency = now - started
+        self.time_to_first_order = now - self.created_at
+        logger.info(
+            "Time to first order: %.1f ms (request %.1f ms)",
+            self.time_to_first_order * 1000, self.first_order_latency * 1000,
+        )
 
     def _sign(self, params):
         """
-        Signs the request parameters using HMAC SHA256.
+        Signs the request parameters (a dict or an already built query string)
+        using HMAC SHA256.
         """
-        query_string = urlencode(params)
-        signature = hmac.new(
-            self.api_secret.encode('utf-8'),
-            query_string.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-        return signature
+        query_string = params if isinstance(params, str) else build_query(params)
+        mac = self._hmac.copy()
+        mac.update(query_string.encode('utf-8'))
+        return mac.hexdigest()
 
-    def send_request(self, method, endpoint, params=None):
+    def send_request(self, method, endpoint, params=None, priority=None, signed=True, retries=None):
         """
         Sends a signed request to the Binance API.
+        Waits for the rate limiter first; cancels default to the highest priority.
+        signed=False sends API-key-only requests (e.g. listenKey management).
+
+        Transient failures (timeouts, dropped connections, 5xx, overload and
+        timestamp errors) are retried up to `retries` times (default
+        max_retries) with exponential backoff; a timestamp error resyncs the
+        server time first. Single orders get a newClientOrderId when none is
+        given, and after a failure whose outcome is unknown the order is
+        looked up by that id before anything is resent, so a retry never
+        places it twice. batchOrders is only resent when it was rejected
+        unexecuted.
         """
         if params is None:
             params = {}
-            
-        # Add timestamp
-        params['timestamp'] = int(time.time() * 1000)
-        
-        # Sign
-        params['signature'] = self._sign(params)
-        
-        url = f"{self.base_url}{endpoint}"
+        method = method.upper()
+        if method not in SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported method: {method}")
+        if priority is None:
+            priority = PRIORITY_CANCEL if method == 'DELETE' else PRIORITY_NORMAL
+        retries = self.max_retries if retries is None else retries
+
+        single_order = method == 'POST' and endpoint == '/fapi/v1/order'
+        if single_order and 'newClientOrderId' not in params:
+            params = {**params, 'newClientOrderId': new_client_order_id()}
+        # A batch may have partly executed; the caller must reconcile it.
+        batch = method == 'POST' and endpoint == '/fapi/v1/batchOrders'
+
+        attempt = 0
+        verify = False
+        while True:
+            try:
+                if verify:
+                    existing = self._find_order(params)
+                    verify = False
+                    if existing is not None:
+                        logger.warning("Order %s already placed, not resending", params['newClientOrderId'])
+                        return self._record(method, endpoint, existing)
+                return self._record(method, endpoint, self._send_once(method, endpoint, params, priority, signed))
+            except Exception as e:
+                unknown = outcome_unknown(e)
+                if attempt >= retries or not _transient(e) or (batch and unknown):
+                    raise
+                if error_code(e) == TIMESTAMP_ERROR:
+                    try:
+                        self.sync_time()
+                    except Exception as sync_error:
+                        logger.warning("Server time sync failed: %s", sync_error)
+                if single_order and unknown:
+                    verify = True
+                attempt += 1
+                delay = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** (attempt - 1))
+                logger.warning("Retrying %s %s in %.2fs (attempt %d/%d): %s", method, endpoint, delay, attempt, retries, e)
+                time.sleep(delay)
+
+    def _record(self, method, endpoint, response):
+        if self.store is not None:
+            try:
+                self.store.record_response(method, endpoint, response)
+            except Exception as e:
+                # The store is a local cache; never fail an order because of it.
+                logger.warning("Order store update failed: %s", e)
+        return response
+
+    def _stored_order(self, closed_only=False, **key):
+        if self.store is None:
+            return None
+        try:
+            return self.store.lookup(closed_only=closed_only, **key)
+        except Exception as e:
+            logger.warning("Order store lookup failed: %s", e)
+            return None
+
+    def _find_order(self, params):
+        """
+        Looks an order up by its client order id; None if the exchange has no such order.
+        An order the store already holds was placed, so the exchange is not asked.
+        """
+        stored = self._stored_order(client_order_id=params['newClientOrderId'])
+        if stored is not None:
+            return stored
+        query = {'symbol': params['symbol'], 'origClientOrderId': params['newClientOrderId']}
+        try:
+            return self._send_once('GET', '/fapi/v1/order', query, PRIORITY_NORMAL, True)
+        except requests.exceptions.HTTPError as e:
+            if error_code(e) == ORDER_NOT_FOUND:
+                return None
+            raise
+
+    def _send_once(self, method, endpoint, params, priority, signed):
+        # Queue before timestamping so time spent waiting never ages the signature.
+        self.rate_limiter.acquire(endpoint, method, params, priority)
+
+        query = build_query(params)
+        if signed:
+            # Add timestamp
+            timestamp = f"timestamp={int(time.time() * 1000 + self.time_offset_ms)}"
+            query = f"{query}&{timestamp}" if query else timestamp
+
+            # Sign
+            query = f"{query}&signature={self._sign(query)}"
+
+        url = f"{self.base_url}{endpoint}?{query}" if query else f"{self.base_url}{endpoint}"
         
         try:
-            logger.info(f"Sending {method} request to {endpoint} with params: {params}")
-            if method.upper() == 'GET':
-                response = self.session.get(url, params=params)
-            elif method.upper() == 'POST':
-                response = self.session.post(url, params=params)
-            elif method.upper() == 'DELETE':
-                response = self.session.delete(url, params=params)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
-                
+            logger.info("Sending %s request to %s", method, endpoint, extra={'method': method, 'endpoint': endpoint})
+            if logger.isEnabledFor(logging.DEBUG):
+                # Never write the signature to the log.
+                logger.debug("Request params: %s", query.partition('&signature=')[0])
+            started = time.perf_counter()
+            response = self.session.request(method, url, timeout=self.timeout)
+
+            self.rate_limiter.update_from_headers(response.headers)
+            if response.status_code in (418, 429):
+                self.rate_limiter.on_rate_limited(response.status_code, response.headers.get('Retry-After'))
             response.raise_for_status()
+            self._record_order_timing(endpoint, method, started)
             return response.json()
             
         except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP Error: {e.response.text}")
+            logger.error("HTTP Error: %s", e.response.text)
             raise
         except Exception as e:
-            logger.error(f"Request Error: {e}")
+            logger.error("Request Error: %s", e)
             raise
 
-    def place_order(self, symbol, side, order_type, quantity, price=None, time_in_force="GTC"):
+    def place_order(self, symbol, side, order_type, quantity, price=None, time_in_force="GTC", priority=None):
         """
         Places a new order.
         """
@@ -79,11 +322,58 @@ class BinanceClient:
             params['price'] = price
             params['timeInForce'] = time_in_force
             
-        return self.send_request('POST', endpoint, params)
+        return self.send_request('POST', endpoint, params, priority)
+
+    def lookup_order(self, symbol, client_order_id=None, order_id=None):
+        """
+        Current state of an order, by client order id or order id. Orders the
+        store holds in a closed status are final and answered locally; anything
+        else is fetched from /fapi/v1/order.
+        """
+        stored = self._stored_order(closed_only=True, client_order_id=client_order_id, order_id=order_id)
+        if stored is not None:
+            return stored
+        if client_order_id is not None:
+            params = {'symbol': symbol, 'origClientOrderId': client_order_id}
+        else:
+            params = {'symbol': symbol, 'orderId': order_id}
+        return self.send_request('GET', '/fapi/v1/order', params)
 
     def get_account_info(self):
         """
-        Retrieves account information.
+        Retrieves account information. Heavy (weight 5); open orders and
+        positions are kept locally by the order store (`store` command).
         """
         endpoint = "/fapi/v2/account"
         return self.send_request('GET', endpoint)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key, api_secret, base_url="https://testnet.binancefuture.com", warm_up=False):
+    """
+    Returns the process-wide BinanceClient for (api_key, base_url), creating it
+    on first use. Reusing it keeps the session's pooled connections warm across
+    orders instead of paying a new TCP/TLS handshake per call.
+    """
+    key = (api_key, base_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = BinanceClient(api_key, api_secret, base_url)
+            _clients[key] = client
+            if warm_up:
+                client.warm_up(background=True)
+    return client
+
+
+def close_clients():
+    """
+    Closes and forgets every registered client.
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.session.close()
+        _clients.clear()
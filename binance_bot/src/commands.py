@@ -0,0 +1,142 @@
+import argparse
+import importlib
+
+# Subcommand -> (module, function). Strategy modules (and with them requests,
+# asyncio and the logger) are imported only once their command is chosen, so
+# `--help` and bad arguments never pay for them.
+COMMANDS = {
+    "market": ("src.market_orders", "place_market_order"),
+    "limit": ("src.limit_orders", "place_limit_order"),
+    "stop_limit": ("src.advanced.stop_limit", "place_stop_limit_order"),
+    "oco": ("src.advanced.oco", "place_oco_order"),
+    "twap": ("src.advanced.twap", "execute_twap"),
+    "grid": ("src.advanced.grid_strategy", "execute_grid_strategy"),
+    "grid_dynamic": ("src.advanced.grid_engine", "execute_dynamic_grid"),
+    "serve": ("src.daemon", "serve"),
+    "store": ("src.store", "run_store_command"),
+}
+DEFAULT_SOCKET = "/tmp/binance_bot.sock"
+
+def load_command(name):
+    """
+    Imports and returns the function behind a subcommand.
+    """
+    module_name, func_name = COMMANDS[name]
+    return getattr(importlib.import_module(module_name), func_name)
+
+class CommandParser(argparse.ArgumentParser):
+    """
+    ArgumentParser that raises ValueError instead of exiting, for commands
+    arriving over the daemon socket.
+    """
+
+    def error(self, message):
+        raise ValueError(message)
+
+def build_parser(parser_class=argparse.ArgumentParser):
+    parser = parser_class(description="Binance Futures Trading Bot")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Daemon socket path (serve / --daemon)")
+    parser.add_argument("--daemon", action="store_true", help="Forward the command to a running `serve` daemon")
+    subparsers = parser.add_subparsers(dest="command", help="Order Type / Strategy")
+
+    # Market Order
+    market_parser = subparsers.add_parser("market", help="Place Market Order")
+    market_parser.add_argument("--symbol", required=True, help="Trading Pair (e.g., BTCUSDT)")
+    market_parser.add_argument("--side", required=True, choices=["BUY", "SELL"], help="Order Side")
+    market_parser.add_argument("--qty", required=True, type=float, help="Quantity")
+
+    # Limit Order
+    limit_parser = subparsers.add_parser("limit", help="Place Limit Order")
+    limit_parser.add_argument("--symbol", required=True, help="Trading Pair")
+    limit_parser.add_argument("--side", required=True, choices=["BUY", "SELL"])
+    limit_parser.add_argument("--qty", required=True, type=float)
+    limit_parser.add_argument("--price", required=True, type=float, help="Limit Price")
+
+    # Stop Limit
+    stop_parser = subparsers.add_parser("stop_limit", help="Place Stop-Limit Order")
+    stop_parser.add_argument("--symbol", required=True)
+    stop_parser.add_argument("--side", required=True, choices=["BUY", "SELL"])
+    stop_parser.add_argument("--qty", required=True, type=float)
+    stop_parser.add_argument("--price", required=True, type=float, help="Limit Price")
+    stop_parser.add_argument("--stop_price", required=True, type=float, help="Trigger Price")
+
+    # OCO
+    oco_parser = subparsers.add_parser("oco", help="Place OCO Order (TP + SL)")
+    oco_parser.add_argument("--symbol", required=True)
+    oco_parser.add_argument("--side", required=True, choices=["BUY", "SELL"])
+    oco_parser.add_argument("--qty", required=True, type=float)
+    oco_parser.add_argument("--price", required=True, type=float, help="Take Profit Price")
+    oco_parser.add_argument("--stop_price", required=True, type=float, help="Stop Loss Trigger")
+    oco_parser.add_argument("--stop_limit_price", required=True, type=float, help="Stop Loss Limit Price")
+    oco_parser.add_argument("--monitor", action="store_true", help="Stay running and cancel the other leg when one fills")
+
+    # TWAP
+    twap_parser = subparsers.add_parser("twap", help="Execute TWAP Strategy")
+    twap_parser.add_argument("--symbol", required=True)
+    twap_parser.add_argument("--side", required=True, choices=["BUY", "SELL"])
+    twap_parser.add_argument("--qty", required=True, type=float, help="Total Quantity")
+    twap_parser.add_argument("--duration", required=True, type=int, help="Duration in seconds")
+    twap_parser.add_argument("--orders", required=True, type=int, help="Number of slices")
+
+    # Grid
+    grid_parser = subparsers.add_parser("grid", help="Place Grid Orders")
+    grid_parser.add_argument("--symbol", required=True)
+    grid_parser.add_argument("--lower", required=True, type=float, help="Lower Price Range")
+    grid_parser.add_argument("--upper", required=True, type=float, help="Upper Price Range")
+    grid_parser.add_argument("--levels", required=True, type=int, help="Number of Grid Levels")
+    grid_parser.add_argument("--qty_per_grid", required=True, type=float, help="Quantity per order")
+    grid_parser.add_argument("--dynamic", action="store_true", help="Keep running and re-place filled levels")
+    grid_parser.add_argument("--max_in_flight", type=int, default=5, help="Concurrent batchOrders requests")
+
+    # Local order/position store
+    store_parser = subparsers.add_parser("store", help="Query or maintain the local order/position store")
+    store_parser.add_argument("action", choices=["orders", "positions", "sync", "compact"])
+    store_parser.add_argument("--symbol", help="Filter by symbol (required for sync)")
+    store_parser.add_argument("--status", help="Order status filter (NEW, FILLED, ...) or 'open'")
+    store_parser.add_argument("--limit", type=int, default=50, help="Max orders listed")
+    store_parser.add_argument("--days", type=float, help="compact: drop closed orders older than this")
+
+    # Daemon
+    serve_parser = subparsers.add_parser("serve", help="Run a resident daemon that executes commands sent over --socket")
+    serve_parser.add_argument("--workers", type=int, default=8, help="Commands executed concurrently")
+    serve_parser.add_argument("--symbols", default="BTCUSDT", help="Comma-separated symbols whose filters are preloaded")
+
+    return parser
+
+def params_to_argv(command, params):
+    """
+    Turns {"symbol": "BTCUSDT", "qty": 0.01, "monitor": True} into CLI arguments
+    for `command`, so daemon requests go through the same parser as the CLI.
+    """
+    argv = [command]
+    for key, value in params.items():
+        if value is True:
+            argv.append(f"--{key}")
+        elif value is not False and value is not None:
+            argv.extend([f"--{key}", str(value)])
+    return argv
+
+def run_command(args):
+    """
+    Executes a parsed order/strategy command and returns its result
+    (None or False when the command failed; the reason is in the log).
+    """
+    if args.command == "market":
+        return load_command("market")(args.symbol, args.side, args.qty)
+    elif args.command == "limit":
+        return load_command("limit")(args.symbol, args.side, args.qty, args.price)
+    elif args.command == "stop_limit":
+        return load_command("stop_limit")(args.symbol, args.side, args.qty, args.price, args.stop_price)
+    elif args.command == "oco":
+        return load_command("oco")(args.symbol, args.side, args.qty, args.price, args.stop_price, args.stop_limit_price, args.monitor)
+    elif args.command == "twap":
+        return load_command("twap")(args.symbol, args.side, args.qty, args.duration, args.orders)
+    elif args.command == "grid":
+        if args.dynamic:
+            return load_command("grid_dynamic")(args.symbol, args.lower, args.upper, args.levels, args.qty_per_grid)
+        return load_command("grid")(args.symbol, args.lower, args.upper, args.levels, args.qty_per_grid, args.max_in_flight)
+    elif args.command == "store":
+        import config
+        days = args.days if args.days is not None else getattr(config, 'STORE_RETENTION_DAYS', 7)
+        return load_command("store")(args.action, args.symbol, args.status, args.limit, days)
+    raise ValueError(f"Unknown command: {args.command}")
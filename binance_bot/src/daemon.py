@@ -0,0 +1,180 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.client import get_client, close_clients
+from src.exchange_info import get_symbol_filters
+from src.store import attach_store
+from src.commands import CommandParser, build_parser, params_to_argv, run_command
+from src.utils import logger
+import config
+
+
+class CommandServer:
+    """
+    Resident executor for CLI commands sent over a Unix domain socket.
+
+    Protocol: one JSON object per line. A request is
+    {"id": 1, "command": "market", "args": {"symbol": "BTCUSDT", "side": "BUY", "qty": 0.01}}
+    with the same argument names as the CLI; the reply is
+    {"id": 1, "ok": true, "result": ..., "elapsed_ms": ...} or
+    {"id": 1, "ok": false, "error": "..."}. The command "ping" replies "pong".
+
+    Requests on one connection run concurrently on a thread pool (a long
+    TWAP does not hold up a market order), so replies can come back out of
+    order and are matched by id. Every command shares the process-wide
+    client, its warm connection pool, the symbol filter cache and the logger.
+    """
+
+    def __init__(self, socket_path, workers=8):
+        self.socket_path = socket_path
+        self.parser = build_parser(CommandParser)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bot-command')
+        self.handled = 0
+        self._stop = None
+
+    def parse(self, request):
+        command = request.get('command')
+        params = request.get('args') or {}
+        if not isinstance(command, str) or not isinstance(params, dict):
+            raise ValueError("Request needs a string 'command' and an object 'args'")
+        if command == 'serve':
+            raise ValueError("The daemon cannot start another daemon")
+        try:
+            args = self.parser.parse_args(params_to_argv(command, params))
+        except SystemExit:
+            # --help and friends print and exit instead of calling error().
+            raise ValueError(f"Invalid arguments for {command}")
+        if args.command == 'grid' and args.dynamic:
+            raise ValueError("Dynamic grids run until interrupted; start them with the CLI instead")
+        if args.command == 'oco' and args.monitor:
+            raise ValueError("oco --monitor holds a worker until a leg fills; start it with the CLI instead")
+        return args
+
+    async def execute(self, request):
+        if request.get('command') == 'ping':
+            return {'ok': True, 'result': 'pong'}
+        args = self.parse(request)
+        logger.info(f"Daemon Command Received: {args.command}")
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.executor, run_command, args)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if result is None or result is False:
+            return {'ok': False, 'error': f"{args.command} failed, see bot.log", 'elapsed_ms': elapsed_ms}
+        return {'ok': True, 'result': result, 'elapsed_ms': elapsed_ms}
+
+    async def _respond(self, line, writer, write_lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            request_id = request.get('id')
+            reply = await self.execute(request)
+        except Exception as e:
+            reply = {'ok': False, 'error': str(e)}
+        self.handled += 1
+        reply['id'] = request_id
+        async with write_lock:
+            try:
+                writer.write(json.dumps(reply, default=str).encode() + b'\n')
+                await writer.drain()
+            except ConnectionError:
+                logger.warning(f"Daemon client went away before reply {request_id}")
+
+    async def _handle_connection(self, reader, writer):
+        write_lock = asyncio.Lock()
+        pending = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError) as e:
+                    logger.warning(f"Dropping daemon connection: {e}")
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self._respond(line, writer, write_lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            writer.close()
+
+    def _claim_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(self.socket_path)  # Left behind by a daemon that did not shut down cleanly.
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    async def run(self):
+        self._stop = asyncio.Event()
+        self._claim_socket()
+        # The socket places orders with this process's keys: owner only, from
+        # the moment it exists (a chmod after bind would leave a window).
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+        finally:
+            os.umask(umask)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+        logger.info(f"Daemon listening on {self.socket_path}")
+        try:
+            await self._stop.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            logger.info(f"Daemon stopped after {self.handled} requests.")
+
+
+def serve(socket_path, workers=8, symbols="BTCUSDT"):
+    """
+    Runs the command daemon until SIGINT/SIGTERM. The shared client's
+    connection and the filters for `symbols` are loaded up front, so the
+    first command already runs warm.
+    """
+    client = get_client(config.API_KEY, config.API_SECRET, config.BASE_URL)
+    client.warm_up()
+    if getattr(config, 'STORE_ENABLED', False):
+        attach_store(client)
+    for symbol in symbols.split(','):
+        if symbol.strip():
+            try:
+                get_symbol_filters(symbol.strip().upper())
+            except ValueError as e:
+                logger.warning(f"Not preloading filters: {e}")
+
+    server = CommandServer(socket_path, workers)
+    try:
+        asyncio.run(server.run())
+    except Exception as e:
+        logger.error(f"Daemon Failed: {e}")
+        return 1
+    finally:
+        close_clients()
+    return 0
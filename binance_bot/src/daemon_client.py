@@ -0,0 +1,76 @@
+import itertools
+import json
+import socket
+
+
+class DaemonError(Exception):
+    pass
+
+
+class DaemonClient:
+    """
+    Connection to a running `serve` daemon.
+
+    Keeps one Unix socket open, so scripts sending many commands pay for the
+    connection once. Only the standard library is imported here, keeping
+    the thin CLI client's start-up cheap.
+    """
+
+    def __init__(self, socket_path, timeout=None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._sock = None
+        self._reader = None
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise DaemonError(f"Daemon not reachable at {self.socket_path}: {e}")
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+        return self
+
+    def close(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = self._reader = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def send(self, command, params=None):
+        """
+        Sends one command and waits for its reply:
+        {"id", "ok": true, "result", "elapsed_ms"} or {"id", "ok": false, "error"}.
+        """
+        if self._sock is None:
+            self.connect()
+        request_id = next(self._ids)
+        line = json.dumps({'id': request_id, 'command': command, 'args': params or {}})
+        try:
+            self._sock.sendall(line.encode() + b'\n')
+            reply = self._reader.readline()
+        except OSError as e:
+            self.close()
+            raise DaemonError(f"Daemon connection failed: {e}")
+        if not reply:
+            self.close()
+            raise DaemonError("Daemon closed the connection without replying")
+        return json.loads(reply)
+
+
+def send_command(socket_path, command, params=None, timeout=None):
+    """
+    One-shot helper: connects, sends `command` with `params`, returns the reply.
+    """
+    with DaemonClient(socket_path, timeout) as client:
+        return client.send(command, params)
@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+from src.client import get_client
+from src.utils import logger
+import config
+
+EXCHANGE_INFO_TTL = 3600
+SNAPSHOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_BY_BASE_URL = object()
+
+
+class UnknownSymbolError(ValueError):
+    pass
+
+
+class ExchangeInfoUnavailable(ValueError):
+    """
+    Raised when a symbol's filters cannot be obtained, so its order is not sent unchecked.
+    """
+
+
+def snapshot_file(base_url):
+    """
+    Snapshot file for one API endpoint, so testnet and mainnet filters never mix.
+    """
+    digest = hashlib.sha256(base_url.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(SNAPSHOT_DIR, f"exchange_info-{digest}.json")
+
+
+def _quantize(value, step, rounding):
+    # Decimal, not float: 5e-05 would reach the query string in scientific notation.
+    value, step = Decimal(str(value)), Decimal(step)
+    if step <= 0:
+        return value
+    return (value / step).to_integral_value(rounding) * step
+
+
+class SymbolFilters:
+    """
+    Trading rules for one symbol, taken from /fapi/v1/exchangeInfo filters.
+    """
+
+    def __init__(self, symbol, tick_size='0', min_price='0', max_price='0', step_size='0', min_qty='0',
+                 max_qty='0', market_step_size=None, market_min_qty=None, market_max_qty=None, min_notional='0'):
+        self.symbol = symbol
+        self.tick_size = tick_size
+        self.min_price = float(min_price)
+        self.max_price = float(max_price)
+        self.step_size = step_size
+        self.min_qty = float(min_qty)
+        self.max_qty = float(max_qty)
+        self.market_step_size = market_step_size or step_size
+        self.market_min_qty = float(market_min_qty or min_qty)
+        self.market_max_qty = float(market_max_qty or max_qty)
+        self.min_notional = float(min_notional)
+
+    @classmethod
+    def from_exchange_info(cls, info):
+        filters = {f['filterType']: f for f in info.get('filters', [])}
+        price = filters.get('PRICE_FILTER', {})
+        lot = filters.get('LOT_SIZE', {})
+        market_lot = filters.get('MARKET_LOT_SIZE', {})
+        notional = filters.get('MIN_NOTIONAL', {})
+        return cls(
+            info['symbol'],
+            tick_size=price.get('tickSize', '0'),
+            min_price=price.get('minPrice', '0'),
+            max_price=price.get('maxPrice', '0'),
+            step_size=lot.get('stepSize', '0'),
+            min_qty=lot.get('minQty', '0'),
+            max_qty=lot.get('maxQty', '0'),
+            market_step_size=market_lot.get('stepSize'),
+            market_min_qty=market_lot.get('minQty'),
+            market_max_qty=market_lot.get('maxQty'),
+            min_notional=notional.get('notional', notional.get('minNotional', '0')),
+        )
+
+    def to_dict(self):
+        return {
+            'symbol': self.symbol,
+            'tick_size': self.tick_size,
+            'min_price': self.min_price,
+            'max_price': self.max_price,
+            'step_size': self.step_size,
+            'min_qty': self.min_qty,
+            'max_qty': self.max_qty,
+            'market_step_size': self.market_step_size,
+            'market_min_qty': self.market_min_qty,
+            'market_max_qty': self.market_max_qty,
+            'min_notional': self.min_notional,
+        }
+
+    def round_price(self, price):
+        """
+        Rounds a price to the nearest tick.
+        """
+        return _quantize(price, self.tick_size, ROUND_HALF_UP)
+
+    def round_qty(self, qty, market=False):
+        """
+        Rounds a quantity down to the step size (never sends more than asked).
+        """
+        return _quantize(qty, self.market_step_size if market else self.step_size, ROUND_DOWN)
+
+    def validate(self, qty, price=None, market=False):
+        """
+        Raises ValueError if the (already rounded) order would be rejected by the exchange.
+        """
+        # The limits are floats: compare as floats so a Decimal 0.001 is not below a float 0.001.
+        qty = float(qty)
+        price = None if price is None else float(price)
+        min_qty = self.market_min_qty if market else self.min_qty
+        max_qty = self.market_max_qty if market else self.max_qty
+        if qty < min_qty:
+            raise ValueError(f"Quantity {qty} below minimum {min_qty} for {self.symbol}")
+        if max_qty and qty > max_qty:
+            raise ValueError(f"Quantity {qty} above maximum {max_qty} for {self.symbol}")
+        if price is not None:
+            if price < self.min_price:
+                raise ValueError(f"Price {price} below minimum {self.min_price} for {self.symbol}")
+            if self.max_price and price > self.max_price:
+                raise ValueError(f"Price {price} above maximum {self.max_price} for {self.symbol}")
+            if qty * price < self.min_notional:
+                raise ValueError(f"Order notional {qty * price:.4f} below minimum {self.min_notional} for {self.symbol}")
+        return True
+
+
+class SymbolFilterCache:
+    """
+    TTL-refreshed index of exchangeInfo symbol filters.
+
+    On first use the on-disk snapshot is loaded if it is younger than `ttl`,
+    so startup does not need a round trip; otherwise (and whenever the data
+    expires) the index is refreshed from /fapi/v1/exchangeInfo and the
+    snapshot rewritten. If a refresh fails, stale data is kept in use. The
+    snapshot file is keyed by the client's base URL (snapshot_path=None
+    disables it).
+    """
+
+    def __init__(self, client, ttl=EXCHANGE_INFO_TTL, snapshot_path=_BY_BASE_URL):
+        self.client = client
+        self.ttl = ttl
+        if snapshot_path is _BY_BASE_URL:
+            snapshot_path = snapshot_file(client.base_url)
+        self.snapshot_path = snapshot_path
+        self._symbols = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            if snapshot.get('base_url', self.client.base_url) != self.client.base_url:
+                return False
+            self._symbols = {s: SymbolFilters(**f) for s, f in snapshot['symbols'].items()}
+            self._fetched_at = snapshot['fetched_at']
+            return True
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable exchange info snapshot: {e}")
+            return False
+
+    def _save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        snapshot = {
+            'base_url': self.client.base_url,
+            'fetched_at': self._fetched_at,
+            'symbols': {s: f.to_dict() for s, f in self._symbols.items()},
+        }
+        tmp_path = f"{self.snapshot_path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Could not write exchange info snapshot: {e}")
+
+    def refresh(self):
+        info = self.client.send_request('GET', '/fapi/v1/exchangeInfo', signed=False)
+        symbols = {
+            s['symbol']: SymbolFilters.from_exchange_info(s)
+            for s in info.get('symbols', [])
+        }
+        if not symbols:
+            raise ValueError("exchangeInfo returned no symbols")
+        self._symbols = symbols
+        self._fetched_at = time.time()
+        self._save_snapshot()
+        logger.info(f"Exchange info refreshed: {len(self._symbols)} symbols.")
+
+    def _ensure_fresh(self):
+        if not self._symbols:
+            self._load_snapshot()
+        if time.time() - self._fetched_at < self.ttl:
+            return
+        try:
+            self.refresh()
+        except Exception as e:
+            if not self._symbols:
+                raise
+            # Back off for a minute instead of retrying on every order.
+            self._fetched_at = time.time() - self.ttl + 60
+            logger.warning(f"Exchange info refresh failed, using cached filters: {e}")
+
+    def get(self, symbol):
+        """
+        Returns the SymbolFilters for `symbol`. Raises UnknownSymbolError for unknown symbols.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            filters = self._symbols.get(symbol.upper())
+        if filters is None:
+            raise UnknownSymbolError(f"Unknown symbol: {symbol}")
+        return filters
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_symbol_filters(symbol):
+    """
+    Returns cached filters for `symbol`. Raises ExchangeInfoUnavailable when
+    exchange info cannot be obtained at all, so no order goes out unchecked.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SymbolFilterCache(get_client(config.API_KEY, config.API_SECRET, config.BASE_URL))
+    try:
+        return _cache.get(symbol)
+    except UnknownSymbolError:
+        raise
+    except Exception as e:
+        logger.error(f"Exchange info unavailable for {symbol}: {e}")
+        raise ExchangeInfoUnavailable(f"Exchange info unavailable for {symbol}, order not sent: {e}") from e
+
+
+def normalize_order(symbol, qty, price=None, market=False):
+    """
+    Rounds qty/price to the symbol's step and tick sizes and validates the
+    result, so orders that would be rejected never leave the process.
+    Returns (qty, price) as Decimals.
+    """
+    filters = get_symbol_filters(symbol)
+    qty = filters.round_qty(qty, market=market)
+    if price is not None:
+        price = filters.round_price(price)
+    filters.validate(qty, price, market=market)
+    return qty, price
+
+
+def normalize_price(symbol, price):
+    """
+    Rounds a standalone price (e.g. a stop trigger) to the symbol's tick size.
+    """
+    filters = get_symbol_filters(symbol)
+    price = filters.round_price(price)
+    if price < filters.min_price or (filters.max_price and price > filters.max_price):
+        raise ValueError(f"Price {price} outside [{filters.min_price}, {filters.max_price}] for {symbol}")
+    return price
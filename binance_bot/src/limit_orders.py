@@ -1,4 +1,5 @@
-from src.client import BinanceClient
+from src.client import get_client
+from src.exchange_info import normalize_order
 from src.utils import logger, validate_inputs
 import config
 
@@ -8,8 +9,9 @@ def place_limit_order(symbol, side, qty, price, time_in_force='GTC'):
     """
     try:
         validate_inputs(symbol, side, qty, price)
+        qty, price = normalize_order(symbol, qty, price)
         
-        client = BinanceClient(config.API_KEY, config.API_SECRET, config.BASE_URL)
+        client = get_client(config.API_KEY, config.API_SECRET, config.BASE_URL)
         
         logger.info(f"Placing Limit Order: {side} {qty} {symbol} @ {price}")
         response = client.place_order(symbol, side.upper(), 'LIMIT', qty, price, time_in_force)
@@ -1,4 +1,5 @@
-from src.client import BinanceClient
+from src.client import get_client
+from src.exchange_info import normalize_order
 from src.utils import logger, validate_inputs
 import config
 
@@ -8,8 +9,9 @@ def place_market_order(symbol, side, qty):
     """
     try:
         validate_inputs(symbol, side, qty)
+        qty, _ = normalize_order(symbol, qty, market=True)
         
-        client = BinanceClient(config.API_KEY, config.API_SECRET, config.BASE_URL)
+        client = get_client(config.API_KEY, config.API_SECRET, config.BASE_URL)
         
         logger.info(f"Placing Market Order: {side} {qty} {symbol}")
         response = client.place_order(symbol, side.upper(), 'MARKET', qty)
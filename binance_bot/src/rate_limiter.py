@@ -0,0 +1,214 @@
+import heapq
+import itertools
+import json
+import threading
+import time
+
+# Lower number = served first.
+PRIORITY_CANCEL = 0
+PRIORITY_STOP_LOSS = 1
+PRIORITY_NORMAL = 2
+PRIORITY_GRID = 3
+
+# Request weight per endpoint (USDT-M Futures). Unknown endpoints cost DEFAULT_WEIGHT.
+ENDPOINT_WEIGHTS = {
+    '/fapi/v1/order': 1,
+    '/fapi/v1/batchOrders': 5,
+    '/fapi/v1/ticker/price': 1,
+    '/fapi/v2/account': 5,
+    '/fapi/v2/positionRisk': 5,
+    '/fapi/v1/exchangeInfo': 1,
+    '/fapi/v1/openOrders': 1,
+    '/fapi/v1/allOrders': 5,
+    '/fapi/v1/time': 1,
+    '/fapi/v1/ping': 1,
+    '/fapi/v1/listenKey': 1,
+}
+# Weight when the endpoint is called without a `symbol` filter.
+NO_SYMBOL_WEIGHTS = {
+    '/fapi/v1/ticker/price': 2,
+    '/fapi/v1/openOrders': 40,
+}
+DEFAULT_WEIGHT = 1
+
+INTERVAL_SECONDS = {'S': 1, 'M': 60, 'H': 3600, 'D': 86400}
+
+
+def request_cost(endpoint, method='GET', params=None):
+    """
+    Returns (weight, order_count) for a request.
+    """
+    params = params or {}
+    if 'symbol' not in params and endpoint in NO_SYMBOL_WEIGHTS:
+        weight = NO_SYMBOL_WEIGHTS[endpoint]
+    else:
+        weight = ENDPOINT_WEIGHTS.get(endpoint, DEFAULT_WEIGHT)
+
+    orders = 0
+    if method.upper() == 'POST':
+        if endpoint == '/fapi/v1/order':
+            orders = 1
+        elif endpoint == '/fapi/v1/batchOrders':
+            batch = params.get('batchOrders', '[]')
+            orders = len(json.loads(batch) if isinstance(batch, str) else batch)
+    return weight, orders
+
+
+def _parse_interval(suffix):
+    """
+    Converts a header suffix such as '1m' or '10s' into seconds.
+    """
+    suffix = suffix.strip().upper()
+    if not suffix or suffix[-1] not in INTERVAL_SECONDS:
+        return None
+    try:
+        return int(suffix[:-1] or 1) * INTERVAL_SECONDS[suffix[-1]]
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at capacity / interval tokens per second.
+    """
+
+    def __init__(self, capacity, interval):
+        self.capacity = capacity
+        self.interval = interval
+        self.rate = capacity / interval
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost, reserve=0.0):
+        """
+        Seconds until `cost` tokens can be taken while leaving `reserve` behind.
+        """
+        missing = cost + reserve - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def sync(self, used, now):
+        """
+        Aligns the bucket with the server's view of the used allowance.
+        """
+        self.refill(now)
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class RateLimiter:
+    """
+    Client-side scheduler for Binance request-weight and order-count limits.
+
+    Requests wait in a priority queue until every bucket has room, so cancels
+    and stop-losses jump ahead of bulk grid placement. Low-priority requests
+    also leave `reserve` of each bucket untouched so urgent requests always
+    have headroom. Buckets are re-synced from the X-MBX-USED-WEIGHT-* and
+    X-MBX-ORDER-COUNT-* response headers, and a 429/418 pauses all traffic
+    for Retry-After.
+    """
+
+    def __init__(self, weight_limit=2400, order_limit_1m=1200, order_limit_10s=300,
+                 safety=0.9, reserve=0.1):
+        # Run slightly under the published limits to absorb clock skew with the server.
+        self.weight_buckets = {60: TokenBucket(weight_limit * safety, 60)}
+        self.order_buckets = {
+            60: TokenBucket(order_limit_1m * safety, 60),
+            10: TokenBucket(order_limit_10s * safety, 10),
+        }
+        self.reserve = reserve
+        self.banned_until = 0.0
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+
+    def _wait_time(self, weight, orders, priority, now):
+        wait = max(0.0, self.banned_until - now)
+        urgent = priority <= PRIORITY_STOP_LOSS
+        for buckets, cost in ((self.weight_buckets, weight), (self.order_buckets, orders)):
+            if not cost:
+                continue
+            for bucket in buckets.values():
+                bucket.refill(now)
+                cost_here = min(cost, bucket.capacity)
+                # Clamped so a request that fits the bucket but not beside the reserve still runs once it is full.
+                reserve = 0.0 if urgent else min(bucket.capacity * self.reserve, bucket.capacity - cost_here)
+                wait = max(wait, bucket.wait_time(cost_here, reserve))
+        return wait
+
+    def _consume(self, weight, orders):
+        for bucket in self.weight_buckets.values():
+            bucket.tokens -= weight
+        if orders:
+            for bucket in self.order_buckets.values():
+                bucket.tokens -= orders
+
+    def acquire(self, endpoint, method='GET', params=None, priority=PRIORITY_NORMAL):
+        """
+        Blocks until the request may be sent without exceeding any limit.
+        Returns the number of seconds spent waiting.
+        """
+        weight, orders = request_cost(endpoint, method, params)
+        started = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            # A new head may outrank whoever is currently waiting for tokens.
+            self._cond.notify_all()
+            try:
+                while True:
+                    timeout = None
+                    if self._queue[0] == ticket:
+                        now = time.monotonic()
+                        timeout = self._wait_time(weight, orders, priority, now)
+                        if timeout <= 0:
+                            self._consume(weight, orders)
+                            heapq.heappop(self._queue)
+                            self._cond.notify_all()
+                            return time.monotonic() - started
+                    self._cond.wait(timeout)
+            except BaseException:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+
+    def update_from_headers(self, headers):
+        """
+        Syncs buckets with X-MBX-USED-WEIGHT-<interval> / X-MBX-ORDER-COUNT-<interval>.
+        """
+        now = time.monotonic()
+        with self._cond:
+            for name, value in headers.items():
+                name = name.lower()
+                if name.startswith('x-mbx-used-weight'):
+                    buckets, suffix = self.weight_buckets, name[len('x-mbx-used-weight'):]
+                elif name.startswith('x-mbx-order-count'):
+                    buckets, suffix = self.order_buckets, name[len('x-mbx-order-count'):]
+                else:
+                    continue
+                interval = _parse_interval(suffix.lstrip('-')) if suffix else 60
+                bucket = buckets.get(interval)
+                if bucket is None:
+                    continue
+                try:
+                    bucket.sync(float(value), now)
+                except ValueError:
+                    continue
+
+    def on_rate_limited(self, status_code, retry_after=None):
+        """
+        Pauses every queued request after a 429 (rate limit) or 418 (IP ban).
+        """
+        if retry_after is None:
+            retry_after = 120 if status_code == 418 else 60
+        now = time.monotonic()
+        with self._cond:
+            self.banned_until = max(self.banned_until, now + float(retry_after))
+            for bucket in list(self.weight_buckets.values()) + list(self.order_buckets.values()):
+                bucket.refill(now)
+                bucket.tokens = min(bucket.tokens, 0.0)
+            self._cond.notify_all()
@@ -0,0 +1,651 @@
+import argparse
+import bisect
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from decimal import Decimal
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+
+# Ensure src is in pythonpath when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.rate_limiter import request_cost
+
+DEFAULT_SYMBOLS = {'BTCUSDT': 65000.0, 'ETHUSDT': 3500.0}
+DEFAULT_BALANCE = 100000.0
+RECV_WINDOW = 5000
+FAULTS = ('reject_timestamp', 'server_error', 'disconnect')
+
+
+class SimulatorError(Exception):
+    """
+    A Binance-style API error ({"code": ..., "msg": ...}).
+    """
+
+    def __init__(self, code, msg, status=400):
+        super().__init__(msg)
+        self.code = code
+        self.msg = msg
+        self.status = status
+
+    def to_dict(self):
+        return {'code': self.code, 'msg': self.msg}
+
+
+class _Disconnect(Exception):
+    """
+    Raised by handle() to drop the connection without replying.
+    """
+
+
+def _fmt(value):
+    return format(Decimal(repr(float(value))).normalize(), 'f')
+
+
+class SymbolSpec:
+    """
+    Reference price and trading filters of one simulated symbol.
+    """
+
+    def __init__(self, symbol, price, tick_size='0.10', step_size='0.001', min_qty='0.001',
+                 max_qty='1000', min_notional='5'):
+        self.symbol = symbol
+        self.last_price = float(price)
+        self.tick_size = tick_size
+        self.step_size = step_size
+        self.min_qty = float(min_qty)
+        self.max_qty = float(max_qty)
+        self.min_notional = float(min_notional)
+
+    def exchange_info(self):
+        return {
+            'symbol': self.symbol,
+            'status': 'TRADING',
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'minPrice': self.tick_size, 'maxPrice': '10000000',
+                 'tickSize': self.tick_size},
+                {'filterType': 'LOT_SIZE', 'minQty': _fmt(self.min_qty), 'maxQty': _fmt(self.max_qty),
+                 'stepSize': self.step_size},
+                {'filterType': 'MARKET_LOT_SIZE', 'minQty': _fmt(self.min_qty), 'maxQty': _fmt(self.max_qty),
+                 'stepSize': self.step_size},
+                {'filterType': 'MIN_NOTIONAL', 'notional': _fmt(self.min_notional)},
+            ],
+        }
+
+    def check(self, qty, price):
+        if qty <= 0:
+            raise SimulatorError(-4003, "Quantity less than or equal to zero.")
+        if not _is_multiple(qty, self.step_size) or (price is not None and not _is_multiple(price, self.tick_size)):
+            raise SimulatorError(-1111, "Precision is over the maximum defined for this asset.")
+        if qty < self.min_qty or qty > self.max_qty:
+            raise SimulatorError(-4005, "Quantity outside the allowed range.")
+        if qty * (price if price is not None else self.last_price) < self.min_notional:
+            raise SimulatorError(-4164, f"Order's notional must be no smaller than {_fmt(self.min_notional)}")
+
+
+def _is_multiple(value, step):
+    return Decimal(repr(float(value))) % Decimal(step) == 0
+
+
+class OrderBook:
+    """
+    Price-time priority book: one FIFO queue per price level, with the level
+    prices kept sorted for best-price lookups.
+    """
+
+    def __init__(self):
+        self.levels = {'BUY': {}, 'SELL': {}}
+        self.prices = {'BUY': [], 'SELL': []}
+
+    def add(self, order):
+        side, price = order['side'], order['price']
+        queue = self.levels[side].get(price)
+        if queue is None:
+            queue = self.levels[side][price] = deque()
+            bisect.insort(self.prices[side], price)
+        queue.append(order)
+
+    def remove(self, order):
+        side, price = order['side'], order['price']
+        queue = self.levels[side].get(price)
+        if queue is None:
+            return
+        try:
+            queue.remove(order)
+        except ValueError:
+            return
+        if not queue:
+            self._drop_level(side, price)
+
+    def _drop_level(self, side, price):
+        del self.levels[side][price]
+        prices = self.prices[side]
+        del prices[bisect.bisect_left(prices, price)]
+
+    def best(self, side):
+        """
+        Best resting price on `side` (highest bid / lowest ask), or None.
+        """
+        prices = self.prices[side]
+        if not prices:
+            return None
+        return prices[-1] if side == 'BUY' else prices[0]
+
+    def pop_front(self, side, price):
+        queue = self.levels[side][price]
+        order = queue[0]
+        return order, queue
+
+    def prune(self, side, price):
+        if not self.levels[side].get(price):
+            if price in self.levels[side]:
+                self._drop_level(side, price)
+
+    def open_orders(self):
+        for side in ('BUY', 'SELL'):
+            for queue in self.levels[side].values():
+                yield from queue
+
+
+class ExchangeSimulator:
+    """
+    In-process Binance USDT-M Futures stand-in for offline load testing.
+
+    Serves the REST endpoints the bot uses (order, batchOrders, openOrders,
+    ticker/price, exchangeInfo, account, positionRisk, time, ping, listenKey) over HTTP,
+    checks API key, HMAC signature and recvWindow, and matches orders with
+    price-time priority. Marketable orders that exhaust the book fill against
+    synthetic liquidity at the reference price, so MARKET orders always fill.
+    STOP / STOP_MARKET orders trigger when the last price crosses stopPrice.
+    `set_price` (or POST /sim/price?symbol=..&price=..) moves the reference
+    price and fills resting orders it passes through. `inject_fault` (or
+    POST /sim/fault?path=..&fault=..&count=..&method=..) makes requests fail, to
+    exercise retry and dedup handling. `latency` plus up to
+    `jitter` seconds is added to every response.
+
+    Point BinanceClient's base_url at `simulator.base_url`.
+    """
+
+    def __init__(self, api_key='sim-key', api_secret='sim-secret', symbols=None, latency=0.0, jitter=0.0,
+                 host='127.0.0.1', port=0, balance=DEFAULT_BALANCE):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.latency = latency
+        self.jitter = jitter
+        self.specs = {
+            symbol: (spec if isinstance(spec, SymbolSpec) else SymbolSpec(symbol, spec))
+            for symbol, spec in (symbols or DEFAULT_SYMBOLS).items()
+        }
+        self.books = {symbol: OrderBook() for symbol in self.specs}
+        self.stops = {symbol: [] for symbol in self.specs}
+        self.orders = {}
+        self.client_ids = {}
+        self.positions = {symbol: {'qty': 0.0, 'entry': 0.0} for symbol in self.specs}
+        self.wallet = balance
+        self.request_count = 0
+        self._faults = {}
+        self._order_ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._weights = deque()
+        self._order_counts = deque()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='exchange-sim', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # --- Matching engine ---------------------------------------------------
+
+    def _spec(self, symbol):
+        spec = self.specs.get(symbol)
+        if spec is None:
+            raise SimulatorError(-1121, "Invalid symbol.")
+        return spec
+
+    def _fill(self, order, qty, price, now):
+        total = order['executedQty'] + qty
+        order['avgPrice'] = (order['avgPrice'] * order['executedQty'] + price * qty) / total
+        order['executedQty'] = total
+        order['status'] = 'FILLED' if total >= order['origQty'] - 1e-12 else 'PARTIALLY_FILLED'
+        order['updateTime'] = now
+        self._apply_position(order['symbol'], qty if order['side'] == 'BUY' else -qty, price)
+
+    def _apply_position(self, symbol, signed_qty, price):
+        position = self.positions[symbol]
+        held = position['qty']
+        if held == 0 or (held > 0) == (signed_qty > 0):
+            new_qty = held + signed_qty
+            position['entry'] = (position['entry'] * abs(held) + price * abs(signed_qty)) / abs(new_qty)
+            position['qty'] = new_qty
+            return
+        closed = min(abs(held), abs(signed_qty))
+        self.wallet += closed * (price - position['entry']) * (1 if held > 0 else -1)
+        new_qty = held + signed_qty
+        if new_qty == 0:
+            position['entry'] = 0.0
+        elif (new_qty > 0) != (held > 0):
+            position['entry'] = price
+        position['qty'] = new_qty
+
+    def _remaining(self, order):
+        return order['origQty'] - order['executedQty']
+
+    def _marketable(self, order, price):
+        if order['type'] in ('MARKET', 'STOP_MARKET'):
+            return True
+        return order['price'] >= price if order['side'] == 'BUY' else order['price'] <= price
+
+    def _match(self, order, now):
+        spec = self.specs[order['symbol']]
+        book = self.books[order['symbol']]
+        opposite = 'SELL' if order['side'] == 'BUY' else 'BUY'
+        while self._remaining(order) > 1e-12:
+            best = book.best(opposite)
+            if best is None or not self._marketable(order, best):
+                break
+            if (spec.last_price < best) if order['side'] == 'BUY' else (spec.last_price > best):
+                break  # Synthetic liquidity at the reference price is better than the book.
+            resting, queue = book.pop_front(opposite, best)
+            qty = min(self._remaining(order), self._remaining(resting))
+            self._fill(order, qty, best, now)
+            self._fill(resting, qty, best, now)
+            if resting['status'] == 'FILLED':
+                queue.popleft()
+                book.prune(opposite, best)
+            spec.last_price = best
+
+        remaining = self._remaining(order)
+        if remaining <= 1e-12:
+            return
+        if self._marketable(order, spec.last_price):
+            # Synthetic liquidity at the reference price.
+            self._fill(order, remaining, spec.last_price, now)
+        elif order['timeInForce'] in ('IOC', 'FOK'):
+            order['status'] = 'EXPIRED'
+        else:
+            book.add(order)
+
+    def _trigger_stops(self, symbol, now):
+        price = self.specs[symbol].last_price
+        triggered = [
+            o for o in self.stops[symbol]
+            if (o['side'] == 'BUY' and price >= o['stopPrice']) or (o['side'] == 'SELL' and price <= o['stopPrice'])
+        ]
+        for order in triggered:
+            self.stops[symbol].remove(order)
+            self._match(order, now)
+
+    def set_price(self, symbol, price):
+        """
+        Moves the reference price, filling resting orders it crosses and
+        triggering stops.
+        """
+        with self._lock:
+            spec = self._spec(symbol)
+            price = float(price)
+            spec.last_price = price
+            now = int(time.time() * 1000)
+            book = self.books[symbol]
+            for side in ('BUY', 'SELL'):
+                while True:
+                    best = book.best(side)
+                    if best is None or (side == 'BUY' and best < price) or (side == 'SELL' and best > price):
+                        break
+                    for order in list(book.levels[side][best]):
+                        self._fill(order, self._remaining(order), best, now)
+                    del book.levels[side][best]
+                    book.prices[side].remove(best)
+            self._trigger_stops(symbol, now)
+
+    def place_order(self, params):
+        with self._lock:
+            symbol = params.get('symbol', '')
+            spec = self._spec(symbol)
+            side = params.get('side', '').upper()
+            order_type = params.get('type', '').upper()
+            if side not in ('BUY', 'SELL'):
+                raise SimulatorError(-1117, "Invalid side.")
+            if order_type not in ('MARKET', 'LIMIT', 'STOP', 'STOP_MARKET'):
+                raise SimulatorError(-1116, "Invalid orderType.")
+            try:
+                qty = float(params['quantity'])
+                price = float(params['price']) if order_type in ('LIMIT', 'STOP') else None
+                stop_price = float(params['stopPrice']) if order_type in ('STOP', 'STOP_MARKET') else None
+            except KeyError as e:
+                raise SimulatorError(-1102, f"Mandatory parameter '{e.args[0]}' was not sent, was empty/null, or malformed.")
+            except ValueError:
+                raise SimulatorError(-1100, "Illegal characters found in a parameter.")
+            spec.check(qty, price)
+
+            order_id = next(self._order_ids)
+            client_id = params.get('newClientOrderId') or f"sim{order_id}"
+            existing = self.client_ids.get(client_id)
+            if existing is not None and existing['status'] in ('NEW', 'PARTIALLY_FILLED'):
+                raise SimulatorError(-4015, "Client order id is not valid.")
+
+            now = int(time.time() * 1000)
+            order = {
+                'orderId': order_id,
+                'clientOrderId': client_id,
+                'symbol': symbol,
+                'side': side,
+                'type': order_type,
+                'status': 'NEW',
+                'price': price if price is not None else 0.0,
+                'stopPrice': stop_price if stop_price is not None else 0.0,
+                'origQty': qty,
+                'executedQty': 0.0,
+                'avgPrice': 0.0,
+                'timeInForce': params.get('timeInForce', 'GTC'),
+                'updateTime': now,
+            }
+            self.orders[order['orderId']] = order
+            self.client_ids[client_id] = order
+
+            if stop_price is not None:
+                self.stops[symbol].append(order)
+                self._trigger_stops(symbol, now)
+            else:
+                if order['timeInForce'] == 'GTX' and self._marketable(order, spec.last_price):
+                    order['status'] = 'EXPIRED'
+                else:
+                    self._match(order, now)
+                    self._trigger_stops(symbol, now)
+            return self._render(order)
+
+    def _find(self, params):
+        if 'orderId' in params:
+            order = self.orders.get(int(params['orderId']))
+        else:
+            order = self.client_ids.get(params.get('origClientOrderId'))
+        if order is None or order['symbol'] != params.get('symbol'):
+            raise SimulatorError(-2013, "Order does not exist.")
+        return order
+
+    def cancel_order(self, params):
+        with self._lock:
+            order = self._find(params)
+            if order['status'] not in ('NEW', 'PARTIALLY_FILLED'):
+                raise SimulatorError(-2011, "Unknown order sent.")
+            if order in self.stops[order['symbol']]:
+                self.stops[order['symbol']].remove(order)
+            else:
+                self.books[order['symbol']].remove(order)
+            order['status'] = 'CANCELED'
+            order['updateTime'] = int(time.time() * 1000)
+            return self._render(order)
+
+    def _render(self, order):
+        rendered = dict(order)
+        for key in ('price', 'stopPrice', 'origQty', 'executedQty', 'avgPrice'):
+            rendered[key] = _fmt(order[key])
+        return rendered
+
+    def open_orders(self, symbol=None):
+        with self._lock:
+            symbols = [symbol] if symbol else list(self.books)
+            orders = []
+            for s in symbols:
+                orders.extend(self.books[self._spec(s).symbol].open_orders())
+                orders.extend(self.stops[s])
+            return [self._render(o) for o in sorted(orders, key=lambda o: o['orderId'])]
+
+    def account(self):
+        with self._lock:
+            positions = []
+            unrealized = 0.0
+            for symbol, position in self.positions.items():
+                pnl = (self.specs[symbol].last_price - position['entry']) * position['qty']
+                unrealized += pnl
+                positions.append({
+                    'symbol': symbol,
+                    'positionAmt': _fmt(position['qty']),
+                    'entryPrice': _fmt(position['entry']),
+                    'unrealizedProfit': _fmt(pnl),
+                })
+            return {
+                'totalWalletBalance': _fmt(self.wallet),
+                'totalUnrealizedProfit': _fmt(unrealized),
+                'availableBalance': _fmt(self.wallet + unrealized),
+                'assets': [{'asset': 'USDT', 'walletBalance': _fmt(self.wallet)}],
+                'positions': positions,
+            }
+
+    def position_risk(self, symbol=None):
+        with self._lock:
+            symbols = [self._spec(symbol).symbol] if symbol else list(self.positions)
+            return [{
+                'symbol': s,
+                'positionAmt': _fmt(self.positions[s]['qty']),
+                'entryPrice': _fmt(self.positions[s]['entry']),
+                'markPrice': _fmt(self.specs[s].last_price),
+                'unRealizedProfit': _fmt((self.specs[s].last_price - self.positions[s]['entry']) * self.positions[s]['qty']),
+                'positionSide': 'BOTH',
+            } for s in symbols]
+
+    # --- HTTP layer ----------------------------------------------------------
+
+    def _used(self, window, cost, now, interval=60):
+        while window and window[0][0] <= now - interval:
+            window.popleft()
+        if cost:
+            window.append((now, cost))
+        return sum(c for _, c in window)
+
+    def inject_fault(self, path, fault, count=1, method='POST'):
+        """
+        Makes the next `count` `method` requests to `path` fail:
+        'reject_timestamp' - -1021 without executing;
+        'server_error'     - executes, then answers 503 / -1007 (outcome unknown);
+        'disconnect'       - executes, then drops the connection without a reply.
+        """
+        if fault not in FAULTS:
+            raise ValueError(f"Unknown fault {fault}, expected one of {FAULTS}")
+        with self._lock:
+            self._faults.setdefault((method.upper(), path), deque()).extend([fault] * int(count))
+
+    def _next_fault(self, method, path):
+        with self._lock:
+            faults = self._faults.get((method, path))
+            return faults.popleft() if faults else None
+
+    def _authenticate(self, headers, raw_query, params):
+        if headers.get('X-MBX-APIKEY') != self.api_key:
+            raise SimulatorError(-2014, "API-key format invalid.", status=401)
+        payload, _, signature = raw_query.rpartition('&signature=')
+        expected = hmac.new(self.api_secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+        if not signature or not hmac.compare_digest(signature, expected):
+            raise SimulatorError(-1022, "Signature for this request is not valid.", status=400)
+        try:
+            timestamp = int(params['timestamp'])
+        except (KeyError, ValueError):
+            raise SimulatorError(-1102, "Mandatory parameter 'timestamp' was not sent, was empty/null, or malformed.")
+        server_time = int(time.time() * 1000)
+        recv_window = int(params.get('recvWindow', RECV_WINDOW))
+        if timestamp > server_time + 1000 or server_time - timestamp > recv_window:
+            raise SimulatorError(-1021, "Timestamp for this request is outside of the recvWindow.")
+
+    def handle(self, method, path, raw_query, headers):
+        """
+        Routes one request; returns (status, body, extra_headers).
+        """
+        params = dict(parse_qsl(raw_query, keep_blank_values=True))
+        with self._lock:
+            self.request_count += 1
+        if path.startswith('/sim/'):
+            if path == '/sim/price' and method == 'POST':
+                self.set_price(params['symbol'], params['price'])
+                return 200, {'symbol': params['symbol'], 'price': params['price']}, {}
+            if path == '/sim/fault' and method == 'POST':
+                try:
+                    self.inject_fault(params['path'], params['fault'], params.get('count', 1), params.get('method', 'POST'))
+                except (KeyError, ValueError) as e:
+                    raise SimulatorError(-1102, f"Bad fault request: {e}")
+                return 200, {'path': params['path'], 'fault': params['fault']}, {}
+            raise SimulatorError(-1, "Unknown simulator command.", status=404)
+
+        public = path in ('/fapi/v1/ping', '/fapi/v1/time', '/fapi/v1/exchangeInfo', '/fapi/v1/ticker/price')
+        if path == '/fapi/v1/listenKey':
+            if headers.get('X-MBX-APIKEY') != self.api_key:
+                raise SimulatorError(-2014, "API-key format invalid.", status=401)
+        elif not public:
+            self._authenticate(headers, raw_query, params)
+
+        weight, orders = request_cost(path, method, params)
+        now = time.monotonic()
+        with self._lock:
+            used_weight = self._used(self._weights, weight, now)
+            used_orders = self._used(self._order_counts, orders, now)
+        extra = {'X-MBX-USED-WEIGHT-1M': str(used_weight)}
+        if orders:
+            extra['X-MBX-ORDER-COUNT-1M'] = str(used_orders)
+
+        fault = self._next_fault(method, path)
+        if fault == 'reject_timestamp':
+            raise SimulatorError(-1021, "Timestamp for this request is outside of the recvWindow.")
+
+        route = (method, path)
+        if route == ('GET', '/fapi/v1/ping'):
+            body = {}
+        elif route == ('GET', '/fapi/v1/time'):
+            body = {'serverTime': int(time.time() * 1000)}
+        elif route == ('GET', '/fapi/v1/exchangeInfo'):
+            body = {'symbols': [spec.exchange_info() for spec in self.specs.values()]}
+        elif route == ('GET', '/fapi/v1/ticker/price'):
+            if 'symbol' in params:
+                spec = self._spec(params['symbol'])
+                body = {'symbol': spec.symbol, 'price': _fmt(spec.last_price)}
+            else:
+                body = [{'symbol': s.symbol, 'price': _fmt(s.last_price)} for s in self.specs.values()]
+        elif route == ('POST', '/fapi/v1/order'):
+            body = self.place_order(params)
+        elif route == ('GET', '/fapi/v1/order'):
+            with self._lock:
+                body = self._render(self._find(params))
+        elif route == ('DELETE', '/fapi/v1/order'):
+            body = self.cancel_order(params)
+        elif route == ('POST', '/fapi/v1/batchOrders'):
+            try:
+                batch = json.loads(params.get('batchOrders', ''))
+            except ValueError:
+                raise SimulatorError(-1130, "Data sent for parameter 'batchOrders' is not valid.")
+            if not isinstance(batch, list) or not 0 < len(batch) <= 5:
+                raise SimulatorError(-1130, "Data sent for parameter 'batchOrders' is not valid.")
+            body = []
+            for entry in batch:
+                try:
+                    body.append(self.place_order({k: str(v) for k, v in entry.items()}))
+                except SimulatorError as e:
+                    body.append(e.to_dict())
+        elif route == ('GET', '/fapi/v1/openOrders'):
+            body = self.open_orders(params.get('symbol'))
+        elif route == ('GET', '/fapi/v2/account'):
+            body = self.account()
+        elif route == ('GET', '/fapi/v2/positionRisk'):
+            body = self.position_risk(params.get('symbol'))
+        elif path == '/fapi/v1/listenKey' and method in ('POST', 'PUT', 'DELETE'):
+            body = {'listenKey': 'sim-listen-key'} if method == 'POST' else {}
+        else:
+            raise SimulatorError(-1, f"Unsupported endpoint {method} {path}", status=404)
+        if fault == 'server_error':
+            raise SimulatorError(-1007, "Timeout waiting for response from backend server. "
+                                        "Send status unknown; execution status unknown.", status=503)
+        if fault == 'disconnect':
+            raise _Disconnect()
+        return 200, body, extra
+
+    def _make_handler(self):
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without TCP_NODELAY
+            # the body waits on the client's delayed ACK (~40 ms per request).
+            disable_nagle_algorithm = True
+
+            def _dispatch(self):
+                delay = simulator.latency + (random.uniform(0, simulator.jitter) if simulator.jitter else 0.0)
+                if delay:
+                    time.sleep(delay)
+                parts = urlsplit(self.path)
+                raw_query = parts.query
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    body = self.rfile.read(length).decode()
+                    raw_query = f"{raw_query}{body}" if raw_query else body
+                try:
+                    status, body, extra = simulator.handle(self.command, parts.path, raw_query, self.headers)
+                except _Disconnect:
+                    self.close_connection = True
+                    return
+                except SimulatorError as e:
+                    status, body, extra = e.status, e.to_dict(), {}
+                except Exception as e:
+                    status, body, extra = 500, {'code': -1000, 'msg': str(e)}, {}
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Binance Futures exchange simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per response (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency up to this many seconds")
+    parser.add_argument("--api_key", default="sim-key")
+    parser.add_argument("--api_secret", default="sim-secret")
+    args = parser.parse_args()
+
+    simulator = ExchangeSimulator(args.api_key, args.api_secret, latency=args.latency, jitter=args.jitter,
+                                  host=args.host, port=args.port)
+    print(f"Simulator listening on {simulator.base_url} (key={args.api_key}, secret={args.api_secret})")
+    try:
+        simulator._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from src.utils import logger
+
+STORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RETENTION_DAYS = 7
+CLOSED_STATUSES = ('FILLED', 'CANCELED', 'EXPIRED', 'REJECTED')
+RECORDED_ENDPOINTS = ('/fapi/v1/order', '/fapi/v1/batchOrders')
+ORDER_COLUMNS = ('client_order_id', 'order_id', 'symbol', 'side', 'type', 'status', 'price', 'stop_price',
+                 'orig_qty', 'executed_qty', 'avg_price', 'update_time')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    client_order_id TEXT PRIMARY KEY,
+    order_id INTEGER,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    type TEXT,
+    status TEXT NOT NULL,
+    price REAL,
+    stop_price REAL,
+    orig_qty REAL,
+    executed_qty REAL NOT NULL DEFAULT 0,
+    avg_price REAL,
+    update_time INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_symbol_status ON orders (symbol, status);
+CREATE INDEX IF NOT EXISTS idx_orders_status_time ON orders (status, update_time);
+CREATE INDEX IF NOT EXISTS idx_orders_order_id ON orders (order_id);
+CREATE TABLE IF NOT EXISTS positions (
+    symbol TEXT PRIMARY KEY,
+    qty REAL NOT NULL,
+    entry_price REAL NOT NULL,
+    update_time INTEGER NOT NULL,
+    snapshot_time INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def store_path(base_url, api_key):
+    """
+    Database file for one account on one API endpoint, so testnet and mainnet
+    orders (or two accounts) never share a position.
+    """
+    digest = hashlib.sha256(f"{base_url}\n{api_key}".encode('utf-8')).hexdigest()[:12]
+    return os.path.join(STORE_DIR, f"orders-{digest}.db")
+
+
+def _float(value):
+    return float(value) if value not in (None, '') else 0.0
+
+
+def _row_from_response(order):
+    """
+    Maps a REST order response (/fapi/v1/order, batchOrders entry) to a row.
+    """
+    return {
+        'client_order_id': order['clientOrderId'],
+        'order_id': order.get('orderId'),
+        'symbol': order['symbol'],
+        'side': order.get('side'),
+        'type': order.get('type'),
+        'status': order.get('status', 'NEW'),
+        'price': _float(order.get('price')),
+        'stop_price': _float(order.get('stopPrice')),
+        'orig_qty': _float(order.get('origQty')),
+        'executed_qty': _float(order.get('executedQty')),
+        'avg_price': _float(order.get('avgPrice')),
+        'update_time': int(order.get('updateTime') or time.time() * 1000),
+    }
+
+
+def _row_from_event(order, event_time):
+    """
+    Maps the `o` object of an ORDER_TRADE_UPDATE stream event to a row.
+    """
+    return {
+        'client_order_id': order['c'],
+        'order_id': order.get('i'),
+        'symbol': order['s'],
+        'side': order.get('S'),
+        'type': order.get('o'),
+        'status': order.get('X', 'NEW'),
+        'price': _float(order.get('p')),
+        'stop_price': _float(order.get('sp')),
+        'orig_qty': _float(order.get('q')),
+        'executed_qty': _float(order.get('z')),
+        'avg_price': _float(order.get('ap')),
+        'update_time': int(order.get('T') or event_time or time.time() * 1000),
+    }
+
+
+def _response_from_row(row):
+    """
+    Maps a stored row back to the fields of a REST order response.
+    """
+    return {
+        'clientOrderId': row['client_order_id'],
+        'orderId': row['order_id'],
+        'symbol': row['symbol'],
+        'side': row['side'],
+        'type': row['type'],
+        'status': row['status'],
+        'price': row['price'],
+        'stopPrice': row['stop_price'],
+        'origQty': row['orig_qty'],
+        'executedQty': row['executed_qty'],
+        'avgPrice': row['avg_price'],
+        'updateTime': row['update_time'],
+    }
+
+
+class OrderStore:
+    """
+    Local SQLite record of placed orders and positions.
+
+    Fed from order responses (attach_store hooks BinanceClient), user-data
+    stream deltas (attach()) and incremental REST syncs (sync()), so
+    strategies and the CLI can answer "what is open / what do we hold"
+    without polling /fapi/v2/account, and order lookups (retry dedup, grid
+    and OCO resyncs) skip the exchange for orders it already holds. The
+    database is opened on first use. Updates never move an order back in
+    time or out of a closed status, and position changes are applied from
+    the executed-quantity delta, so the same fill reported by a response,
+    the stream and a sync is only counted once. Positions assume one-way
+    mode.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        # Opened on first use (with the lock held), so attaching the store to a
+        # one-shot CLI client costs nothing before its order is on the wire.
+        if self._conn is not None:
+            return
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: commits do not fsync; a power cut can lose the last
+        # few updates, which the next sync() restores from the exchange.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Writes ---------------------------------------------------------------
+
+    def _upsert(self, row):
+        old = self._conn.execute(
+            "SELECT status, executed_qty, avg_price, update_time FROM orders WHERE client_order_id = ?",
+            (row['client_order_id'],),
+        ).fetchone()
+        if old is not None:
+            if row['update_time'] < old['update_time']:
+                return
+            if old['status'] in CLOSED_STATUSES and row['status'] not in CLOSED_STATUSES:
+                return
+        self._conn.execute(
+            f"INSERT INTO orders ({', '.join(ORDER_COLUMNS)}) VALUES ({', '.join('?' * len(ORDER_COLUMNS))}) "
+            "ON CONFLICT (client_order_id) DO UPDATE SET "
+            + ', '.join(f"{col} = excluded.{col}" for col in ORDER_COLUMNS[1:]),
+            [row[col] for col in ORDER_COLUMNS],
+        )
+        old_qty = old['executed_qty'] if old is not None else 0.0
+        delta = row['executed_qty'] - old_qty
+        if delta > 1e-12 and row['side'] in ('BUY', 'SELL'):
+            old_value = old_qty * (old['avg_price'] if old is not None else 0.0)
+            fill_price = (row['executed_qty'] * row['avg_price'] - old_value) / delta
+            self._apply_fill(row['symbol'], delta if row['side'] == 'BUY' else -delta, fill_price, row['update_time'])
+
+    def _apply_fill(self, symbol, signed_qty, price, update_time):
+        current = self._conn.execute(
+            "SELECT qty, entry_price, snapshot_time FROM positions WHERE symbol = ?", (symbol,)
+        ).fetchone()
+        if current is not None and current['snapshot_time'] >= update_time:
+            return  # An absolute position taken after this fill already includes it.
+        qty, entry = (current['qty'], current['entry_price']) if current is not None else (0.0, 0.0)
+        new_qty = qty + signed_qty
+        if qty == 0 or (qty > 0) == (signed_qty > 0):
+            entry = (abs(qty) * entry + abs(signed_qty) * price) / abs(new_qty)
+        elif abs(signed_qty) > abs(qty):
+            entry = price  # Position flipped; the remainder opened at this fill.
+        if abs(new_qty) < 1e-12:
+            new_qty, entry = 0.0, 0.0
+        self._set_position(symbol, new_qty, entry, update_time)
+
+    def _set_position(self, symbol, qty, entry, update_time, snapshot=False):
+        """
+        Writes a position; snapshot=True marks it as an absolute exchange value
+        (stream ACCOUNT_UPDATE or REST) that fills up to update_time are part of.
+        """
+        self._conn.execute(
+            "INSERT INTO positions (symbol, qty, entry_price, update_time, snapshot_time) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (symbol) DO UPDATE SET qty = excluded.qty, entry_price = excluded.entry_price, "
+            "update_time = excluded.update_time, "
+            "snapshot_time = MAX(positions.snapshot_time, excluded.snapshot_time)",
+            (symbol, qty, entry, update_time, update_time if snapshot else 0),
+        )
+
+    def _write(self, rows):
+        with self._lock:
+            self._open()
+            self._conn.execute("BEGIN")
+            try:
+                for row in rows:
+                    self._upsert(row)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def record_orders(self, orders):
+        """
+        Records REST order responses (entries without an orderId are skipped).
+        """
+        self._write([_row_from_response(o) for o in orders if isinstance(o, dict) and 'orderId' in o])
+
+    def record_response(self, method, endpoint, response):
+        """
+        BinanceClient hook: records the orders in a successful response.
+        """
+        if endpoint in RECORDED_ENDPOINTS and method in ('POST', 'GET', 'DELETE'):
+            self.record_orders(response if isinstance(response, list) else [response])
+
+    def apply_order_update(self, event):
+        """
+        ORDER_TRADE_UPDATE stream handler.
+        """
+        order = event.get('o', {})
+        if 'c' in order and 's' in order:
+            self._write([_row_from_event(order, event.get('E'))])
+
+    def apply_account_update(self, event):
+        """
+        ACCOUNT_UPDATE stream handler: positions are absolute, so they overwrite.
+        """
+        update_time = int(event.get('E') or time.time() * 1000)
+        with self._lock:
+            self._open()
+            for position in event.get('a', {}).get('P', []):
+                self._set_position(position['s'], _float(position.get('pa')), _float(position.get('ep')), update_time,
+                                   snapshot=True)
+
+    def attach(self, stream):
+        stream.add_handler('ORDER_TRADE_UPDATE', self.apply_order_update)
+        stream.add_handler('ACCOUNT_UPDATE', self.apply_account_update)
+
+    def sync(self, client, symbol):
+        """
+        Incremental REST sync for one symbol: refreshes live orders from
+        openOrders, looks up only the stored open orders that are no longer
+        live, and overwrites the position from positionRisk.
+        """
+        symbol = symbol.upper()
+        live = client.send_request('GET', '/fapi/v1/openOrders', {'symbol': symbol})
+        self.record_orders(live)
+        live_ids = {o.get('clientOrderId') for o in live}
+        resolved = 0
+        for row in self.open_orders(symbol):
+            if row['client_order_id'] in live_ids:
+                continue
+            try:
+                order = client.send_request(
+                    'GET', '/fapi/v1/order', {'symbol': symbol, 'origClientOrderId': row['client_order_id']}
+                )
+            except Exception as e:
+                logger.warning(f"Store sync could not resolve {row['client_order_id']}: {e}")
+                continue
+            self.record_orders([order])
+            resolved += 1
+        positions = client.send_request('GET', '/fapi/v2/positionRisk', {'symbol': symbol})
+        as_of = int(time.time() * 1000)
+        with self._lock:
+            self._open()
+            for position in positions:
+                self._set_position(position['symbol'], _float(position.get('positionAmt')),
+                                   _float(position.get('entryPrice')),
+                                   as_of, snapshot=True)
+        logger.info(f"Store synced {symbol}: {len(live)} open, {resolved} resolved.")
+        return {'symbol': symbol, 'open': len(live), 'resolved': resolved}
+
+    def compact(self, retention_days=RETENTION_DAYS):
+        """
+        Deletes closed orders last updated more than `retention_days` ago.
+        Returns the number of orders removed.
+        """
+        cutoff = int((time.time() - retention_days * 86400) * 1000)
+        placeholders = ', '.join('?' * len(CLOSED_STATUSES))
+        with self._lock:
+            self._open()
+            removed = self._conn.execute(
+                f"DELETE FROM orders WHERE status IN ({placeholders}) AND update_time < ?",
+                (*CLOSED_STATUSES, cutoff),
+            ).rowcount
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info(f"Store compacted: {removed} closed orders removed.")
+        return removed
+
+    # --- Queries --------------------------------------------------------------
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            self._open()
+            return [dict(row) for row in self._conn.execute(sql, args).fetchall()]
+
+    def get_order(self, client_order_id=None, order_id=None):
+        if client_order_id is not None:
+            rows = self._query("SELECT * FROM orders WHERE client_order_id = ?", (client_order_id,))
+        else:
+            rows = self._query("SELECT * FROM orders WHERE order_id = ?", (order_id,))
+        return rows[0] if rows else None
+
+    def lookup(self, client_order_id=None, order_id=None, closed_only=False):
+        """
+        A stored order in the REST response format, or None. closed_only=True
+        ignores orders that may still change: only a closed status is final.
+        """
+        row = self.get_order(client_order_id, order_id)
+        if row is None or (closed_only and row['status'] not in CLOSED_STATUSES):
+            return None
+        return _response_from_row(row)
+
+    def open_orders(self, symbol=None):
+        placeholders = ', '.join('?' * len(CLOSED_STATUSES))
+        if symbol is not None:
+            return self._query(
+                f"SELECT * FROM orders WHERE symbol = ? AND status NOT IN ({placeholders}) ORDER BY update_time",
+                (symbol.upper(), *CLOSED_STATUSES),
+            )
+        return self._query(
+            f"SELECT * FROM orders WHERE status NOT IN ({placeholders}) ORDER BY update_time", CLOSED_STATUSES
+        )
+
+    def orders(self, symbol=None, status=None, limit=50):
+        clauses, args = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            args.append(symbol.upper())
+        if status is not None:
+            clauses.append("status = ?")
+            args.append(status.upper())
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        return self._query(f"SELECT * FROM orders {where}ORDER BY update_time DESC LIMIT ?", (*args, limit))
+
+    def position(self, symbol):
+        rows = self._query("SELECT * FROM positions WHERE symbol = ?", (symbol.upper(),))
+        return rows[0] if rows else None
+
+    def positions(self, include_flat=False):
+        if include_flat:
+            return self._query("SELECT * FROM positions ORDER BY symbol")
+        return self._query("SELECT * FROM positions WHERE qty != 0 ORDER BY symbol")
+
+
+_stores = {}
+_store_lock = threading.Lock()
+
+
+def get_store(path):
+    """
+    Returns the process-wide OrderStore for `path`, opening it on first use.
+    """
+    with _store_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = OrderStore(path)
+    return store
+
+
+def attach_store(client, path=None):
+    """
+    Makes `client` record every order response in the shared store of its
+    base URL and API key (or in `path`).
+    """
+    client.store = get_store(path or store_path(client.base_url, client.api_key))
+    return client.store
+
+
+def run_store_command(action, symbol=None, status=None, limit=50, retention_days=RETENTION_DAYS):
+    """
+    CLI entry point for `store`: orders / positions / sync / compact.
+    """
+    import config
+    store = get_store(store_path(config.BASE_URL, config.API_KEY))
+    if action == 'orders':
+        if status is not None and status.lower() == 'open':
+            return store.open_orders(symbol)
+        return store.orders(symbol, status, limit)
+    elif action == 'positions':
+        if symbol:
+            position = store.position(symbol)
+            return [position] if position else []
+        return store.positions()
+    elif action == 'sync':
+        if not symbol:
+            raise ValueError("store sync needs --symbol")
+        from src.client import get_client
+        return store.sync(get_client(config.API_KEY, config.API_SECRET, config.BASE_URL), symbol)
+    elif action == 'compact':
+        return {'removed': store.compact(retention_days)}
+    raise ValueError(f"Unknown store action: {action}")
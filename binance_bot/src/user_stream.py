@@ -0,0 +1,148 @@
+import asyncio
+import inspect
+import json
+from src.utils import logger
+
+LISTEN_KEY_ENDPOINT = "/fapi/v1/listenKey"
+
+
+class UserDataStream:
+    """
+    Long-running consumer of the USDT-M Futures user-data stream.
+
+    Handles the listenKey lifecycle (create, periodic keepalive, close),
+    reconnects with exponential backoff, and after every reconnect calls the
+    registered resync callbacks so they can catch up on anything missed
+    through REST. Events are dispatched by their `e` field
+    (ORDER_TRADE_UPDATE, ACCOUNT_UPDATE, ...); handlers may be plain
+    functions or coroutines.
+
+    `client` is an AsyncBinanceClient; `ws_url` can point at a local
+    WebSocket server for testing.
+    """
+
+    def __init__(self, client, ws_url, keepalive_interval=30 * 60,
+                 reconnect_delay=1.0, max_reconnect_delay=30.0):
+        self.client = client
+        self.ws_url = ws_url.rstrip('/')
+        self.keepalive_interval = keepalive_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.listen_key = None
+        self._handlers = {}
+        self._resync_handlers = []
+        self._stopping = asyncio.Event()
+        self._connected = asyncio.Event()
+
+    def add_handler(self, event_type, callback):
+        self._handlers.setdefault(event_type, []).append(callback)
+
+    def add_resync_handler(self, callback):
+        """
+        Registers a callback run after each (re)connect, once the stream is live.
+        """
+        self._resync_handlers.append(callback)
+
+    async def wait_connected(self):
+        await self._connected.wait()
+
+    def stop(self):
+        self._stopping.set()
+
+    async def _call(self, callback, *args):
+        result = callback(*args)
+        if inspect.isawaitable(result):
+            await result
+
+    async def _dispatch(self, event):
+        for callback in self._handlers.get(event.get('e'), ()):
+            try:
+                await self._call(callback, event)
+            except Exception as e:
+                logger.error(f"User stream handler failed for {event.get('e')}: {e}")
+
+    async def _create_listen_key(self):
+        response = await self.client.send_request('POST', LISTEN_KEY_ENDPOINT, signed=False)
+        self.listen_key = response['listenKey']
+        return self.listen_key
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await self.client.send_request('PUT', LISTEN_KEY_ENDPOINT, signed=False)
+                logger.info("User stream listenKey kept alive.")
+            except Exception as e:
+                # The reconnect path creates a fresh key if this one has lapsed.
+                logger.warning(f"listenKey keepalive failed: {e}")
+
+    async def _close_listen_key(self):
+        if not self.listen_key:
+            return
+        try:
+            await self.client.send_request('DELETE', LISTEN_KEY_ENDPOINT, signed=False)
+        except Exception as e:
+            logger.warning(f"Failed to close listenKey: {e}")
+        self.listen_key = None
+
+    async def _consume(self, websocket):
+        async for message in websocket:
+            event = json.loads(message)
+            if event.get('e') == 'listenKeyExpired':
+                logger.warning("User stream listenKey expired, reconnecting.")
+                return
+            await self._dispatch(event)
+            if self._stopping.is_set():
+                return
+
+    async def run(self):
+        """
+        Runs until stop() is called.
+        """
+        try:
+            import websockets
+        except ImportError:
+            raise RuntimeError("The user-data stream requires the 'websockets' package (pip install websockets).")
+
+        delay = self.reconnect_delay
+        keepalive = None
+        try:
+            while not self._stopping.is_set():
+                try:
+                    listen_key = await self._create_listen_key()
+                    if keepalive is None:
+                        keepalive = asyncio.create_task(self._keepalive())
+                    async with websockets.connect(f"{self.ws_url}/ws/{listen_key}") as websocket:
+                        logger.info("User stream connected.")
+                        delay = self.reconnect_delay
+                        self._connected.set()
+                        for callback in self._resync_handlers:
+                            await self._call(callback)
+                        consumer = asyncio.create_task(self._consume(websocket))
+                        stopper = asyncio.create_task(self._stopping.wait())
+                        done, pending = await asyncio.wait(
+                            {consumer, stopper}, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        for task in pending:
+                            task.cancel()
+                        if consumer in done:
+                            consumer.result()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"User stream disconnected: {e}")
+                finally:
+                    self._connected.clear()
+
+                if self._stopping.is_set():
+                    break
+                logger.info(f"Reconnecting user stream in {delay:.1f}s...")
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            if keepalive is not None:
+                keepalive.cancel()
+            await self._close_listen_key()
@@ -1,32 +1,161 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
 import os
+import threading
+import config
+
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+TEXT_FORMAT = '[%(asctime)s] [%(levelname)s] %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# LogRecord attributes that are not user-supplied `extra` fields.
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, including any `extra` fields.
+    """
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record, DATE_FORMAT),
+            'level': record.levelname,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that only merges msg % args on the calling thread, so the
+    caller can change mutable args afterwards without altering the record.
+    The stock prepare() runs the whole formatter there; here the timestamp,
+    layout and JSON encoding happen on the listener thread, off the order path.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+class _DeferredSetupHandler(logging.Handler):
+    """
+    Placeholder until the first record is logged. Importing the module then
+    costs no handlers, no listener thread and no log file; the first record
+    that arrives builds them with setup_logger and is passed on to them.
+    """
+
+    def __init__(self, name, **setup_kwargs):
+        super().__init__()
+        self.logger_name = name
+        self.setup_kwargs = setup_kwargs
+        self._setup_lock = threading.Lock()
+        self._done = False
+
+    def _setup(self):
+        with self._setup_lock:
+            if self._done:
+                return
+            logger = logging.getLogger(self.logger_name)
+            # A new list, so the callHandlers loop already running keeps iterating the old one.
+            logger.handlers = [h for h in logger.handlers if h is not self]
+            setup_logger(name=self.logger_name, level=logger.level, **self.setup_kwargs)
+            self._done = True
+
+    def handle(self, record):
+        self._setup()
+        for handler in logging.getLogger(self.logger_name).handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record):
+        pass
+
+_listeners = []
+
+def _stop_listeners():
+    while _listeners:
+        _listeners.pop().stop()
+
+atexit.register(_stop_listeners)
 
 # Setup Logging
-def setup_logger(log_file='bot.log'):
+def setup_logger(log_file='bot.log', async_mode=True, json_format=False, max_bytes=LOG_MAX_BYTES,
+                 backup_count=LOG_BACKUP_COUNT, level=logging.INFO, name='BinanceBot', stream=None):
     """
     Configures logging to file and console.
+
+    The file rotates at `max_bytes`. In async mode the logger only enqueues
+    records; a background QueueListener formats and writes them, so disk and
+    console I/O stay off the caller's thread. json_format writes structured
+    JSON lines instead of text.
     """
-    logger = logging.getLogger('BinanceBot')
-    logger.setLevel(logging.INFO)
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
     
     # Check if handlers already exist to avoid duplicates
     if not logger.handlers:
-        formatter = logging.Formatter('[%(asctime)s] [%(levelname)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+        formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
         
         # File Handler
-        file_handler = logging.FileHandler(log_file)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, delay=True
+        )
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
         
         # Console Handler
-        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler = logging.StreamHandler(stream or sys.stdout)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+
+        if async_mode:
+            log_queue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(
+                log_queue, file_handler, console_handler, respect_handler_level=True
+            )
+            listener.start()
+            _listeners.append(listener)
+            logger.addHandler(_LazyQueueHandler(log_queue))
+        else:
+            logger.addHandler(file_handler)
+            logger.addHandler(console_handler)
         
     return logger
 
-logger = setup_logger()
+def flush_logs():
+    """
+    Drains the async log queue (e.g. before printing directly to the console).
+    """
+    for listener in _listeners:
+        listener.stop()
+        listener.start()
+
+def deferred_logger(name='BinanceBot', level=logging.INFO, **setup_kwargs):
+    """
+    Returns the named logger with setup_logger postponed until it first
+    emits a record (at the logger's level at that time).
+    """
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.setLevel(level)
+        logger.addHandler(_DeferredSetupHandler(name, **setup_kwargs))
+    return logger
+
+logger = deferred_logger(
+    async_mode=getattr(config, 'LOG_ASYNC', True),
+    json_format=getattr(config, 'LOG_JSON', False),
+    level=getattr(config, 'LOG_LEVEL', 'INFO'),
+)
 
 def validate_inputs(symbol, side, qty, price=None):
     """
@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'benchmarks'))
+
+
+@pytest.fixture(autouse=True)
+def scratch_dir(tmp_path, monkeypatch):
+    """
+    Runs every test in a scratch directory, so bot.log lands there and never in the repository.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
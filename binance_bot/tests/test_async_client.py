@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from src.async_client import AsyncBinanceClient
+from src.simulator import ExchangeSimulator
+
+
+@pytest.fixture
+def simulator():
+    with ExchangeSimulator() as sim:
+        yield sim
+
+
+def run(simulator, coro_fn, pool_size=4):
+    async def _run():
+        async with AsyncBinanceClient(simulator.api_key, simulator.api_secret, simulator.base_url,
+                                      pool_size=pool_size) as client:
+            return await coro_fn(client)
+
+    return asyncio.run(_run())
+
+
+def test_place_order_round_trip(simulator):
+    order = run(simulator, lambda client: client.place_order('BTCUSDT', 'BUY', 'MARKET', '0.01'))
+    assert order['status'] == 'FILLED'
+    assert float(order['executedQty']) == pytest.approx(0.01)
+    assert simulator.positions['BTCUSDT']['qty'] == pytest.approx(0.01)
+
+
+def test_gather_keeps_order_and_isolates_failures(simulator):
+    requests = [('POST', '/fapi/v1/order', {'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT',
+                                            'quantity': '0.01', 'price': f'{60000 + i}', 'timeInForce': 'GTC'})
+                for i in range(8)]
+    requests.insert(3, ('POST', '/fapi/v1/order', {'symbol': 'NOPEUSDT', 'side': 'BUY', 'type': 'MARKET',
+                                                   'quantity': '0.01'}))
+
+    async def place_then_list(client):
+        placed = await client.gather(requests)
+        live = await client.send_request('GET', '/fapi/v1/openOrders', {'symbol': 'BTCUSDT'})
+        return placed, live
+
+    placed, live = run(simulator, place_then_list)
+    assert isinstance(placed[3], Exception)
+    orders = placed[:3] + placed[4:]
+    assert [float(o['price']) for o in orders] == [60000 + i for i in range(8)]
+    assert {o['orderId'] for o in live} == {o['orderId'] for o in orders}
+
+
+def test_shares_wrapped_client_session(simulator):
+    from src.client import BinanceClient
+
+    sync_client = BinanceClient(simulator.api_key, simulator.api_secret, simulator.base_url)
+
+    async def ping(client):
+        await client.gather([('GET', '/fapi/v1/ping', None, None)] * 5)
+        return client.client
+
+    async def _run():
+        async with AsyncBinanceClient.from_client(sync_client, pool_size=2) as client:
+            return await ping(client)
+
+    assert asyncio.run(_run()) is sync_client
+    # The wrapped client is not closed with the async front-end.
+    assert sync_client.send_request('GET', '/fapi/v1/ping') == {}
@@ -0,0 +1,30 @@
+import pytest
+from src import client as client_module
+from src.client import BinanceClient
+from src.simulator import ExchangeSimulator
+
+
+@pytest.fixture
+def simulator():
+    with ExchangeSimulator() as sim:
+        yield sim
+
+
+@pytest.fixture
+def client(simulator, monkeypatch):
+    monkeypatch.setattr(client_module, 'RETRY_BACKOFF', 0.01)
+    bot = BinanceClient(simulator.api_key, simulator.api_secret, simulator.base_url)
+    yield bot
+    bot.session.close()
+
+
+@pytest.mark.parametrize('fault', ['reject_timestamp', 'server_error', 'disconnect'])
+def test_faulted_order_is_placed_exactly_once(simulator, client, fault):
+    simulator.inject_fault('/fapi/v1/order', fault)
+    order = client.place_order('BTCUSDT', 'BUY', 'LIMIT', '0.01', price='60000')
+    assert len(simulator.orders) == 1
+    placed = next(iter(simulator.orders.values()))
+    assert order['orderId'] == placed['orderId']
+    assert order['clientOrderId'] == placed['clientOrderId']
+    assert order['status'] == 'NEW'
+
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import os
+import stat
+import pytest
+from src.daemon import CommandServer
+
+
+def request(server, payload):
+    async def _run():
+        reader, writer = await asyncio.open_unix_connection(server.socket_path)
+        writer.write(json.dumps(payload).encode() + b'\n')
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        writer.close()
+        return reply
+
+    return _run()
+
+
+def serve_and(socket_path, *payloads):
+    server = CommandServer(socket_path, workers=2)
+
+    async def _run():
+        runner = asyncio.create_task(server.run())
+        while not os.path.exists(socket_path):
+            await asyncio.sleep(0.01)
+        mode = stat.S_IMODE(os.stat(socket_path).st_mode)
+        replies = [await request(server, payload) for payload in payloads]
+        server.stop()
+        await runner
+        return mode, replies
+
+    return asyncio.run(_run())
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / 'bot.sock')
+
+
+def test_socket_is_owner_only(socket_path):
+    mode, replies = serve_and(socket_path, {'id': 1, 'command': 'ping'})
+    assert mode == 0o600
+    assert replies == [{'id': 1, 'ok': True, 'result': 'pong'}]
+    assert not os.path.exists(socket_path)
+
+
+@pytest.mark.parametrize('command, args', [
+    ('oco', {'symbol': 'BTCUSDT', 'side': 'SELL', 'qty': 0.001, 'price': 70000, 'stop_price': 60000,
+             'stop_limit_price': 59900, 'monitor': True}),
+    ('grid', {'symbol': 'BTCUSDT', 'lower': 60000, 'upper': 70000, 'levels': 10, 'qty_per_grid': 0.001,
+              'dynamic': True}),
+    ('serve', {}),
+])
+def test_long_running_commands_are_rejected(socket_path, command, args):
+    _, [reply] = serve_and(socket_path, {'id': 7, 'command': command, 'args': args})
+    assert reply['id'] == 7 and not reply['ok']
+    assert 'CLI' in reply['error'] or 'daemon' in reply['error']
+
+
+def test_daemon_does_not_load_main_twice():
+    import sys
+    import src.daemon  # noqa: F401
+    assert 'src.main' not in sys.modules
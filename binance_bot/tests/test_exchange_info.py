@@ -0,0 +1,92 @@
+import os
+from decimal import Decimal
+import pytest
+from src import exchange_info
+from src.exchange_info import SymbolFilterCache, SymbolFilters, ExchangeInfoUnavailable, snapshot_file
+from src.simulator import SymbolSpec
+
+
+class FakeClient:
+    """
+    Serves exchangeInfo for the simulator's default specs and counts the requests.
+    """
+
+    def __init__(self, base_url='http://exchange.test', fail=False):
+        self.base_url = base_url
+        self.fail = fail
+        self.requests = 0
+
+    def send_request(self, method, endpoint, params=None, signed=True, **kwargs):
+        self.requests += 1
+        if self.fail:
+            raise ConnectionError("exchange unreachable")
+        return {'symbols': [SymbolSpec('BTCUSDT', 65000, tick_size='0.10', step_size='0.001').exchange_info()]}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(exchange_info.time, 'time', lambda: now[0])
+    return now
+
+
+def test_rounding():
+    filters = SymbolFilters('BTCUSDT', tick_size='0.10', step_size='0.001', market_step_size='0.01')
+    assert filters.round_price(65000.049) == Decimal('65000.0')
+    assert filters.round_price(65000.05) == Decimal('65000.1')
+    assert filters.round_qty(0.0129) == Decimal('0.012')
+    assert filters.round_qty(0.0129, market=True) == Decimal('0.01')
+    # Small values stay in fixed-point notation on the wire.
+    assert format(SymbolFilters('X', step_size='0.00001').round_qty(5e-05), 'f') == '0.00005'
+    assert SymbolFilters('X').round_qty(0.0129) == Decimal('0.0129')
+
+
+def test_filters_refresh_after_ttl(tmp_path, clock):
+    client = FakeClient()
+    cache = SymbolFilterCache(client, ttl=60, snapshot_path=str(tmp_path / 'info.json'))
+    assert cache.get('btcusdt').tick_size == '0.10'
+    clock[0] += 59
+    cache.get('BTCUSDT')
+    assert client.requests == 1
+    clock[0] += 2
+    cache.get('BTCUSDT')
+    assert client.requests == 2
+
+
+def test_failed_refresh_keeps_stale_filters(tmp_path, clock):
+    client = FakeClient()
+    cache = SymbolFilterCache(client, ttl=60, snapshot_path=str(tmp_path / 'info.json'))
+    cache.get('BTCUSDT')
+    client.fail = True
+    clock[0] += 61
+    assert cache.get('BTCUSDT').symbol == 'BTCUSDT'
+    # Retried after a minute, not on every order.
+    cache.get('BTCUSDT')
+    assert client.requests == 2
+
+
+def test_snapshot_reload(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(exchange_info, 'SNAPSHOT_DIR', str(tmp_path))
+    SymbolFilterCache(FakeClient(), ttl=60).get('BTCUSDT')
+    assert os.path.dirname(snapshot_file('http://exchange.test')) == str(tmp_path)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # A fresh snapshot answers without a request, even with the exchange down.
+    offline = FakeClient(fail=True)
+    assert SymbolFilterCache(offline, ttl=60).get('BTCUSDT').step_size == '0.001'
+    assert offline.requests == 0
+    # Another endpoint never reads it.
+    other = FakeClient(base_url='http://other.test', fail=True)
+    with pytest.raises(ConnectionError):
+        SymbolFilterCache(other, ttl=60).get('BTCUSDT')
+    # An expired snapshot is refreshed.
+    clock[0] += 61
+    client = FakeClient()
+    SymbolFilterCache(client, ttl=60).get('BTCUSDT')
+    assert client.requests == 1
+
+
+def test_unavailable_filters_refuse_the_order(monkeypatch):
+    monkeypatch.setattr(exchange_info, '_cache', SymbolFilterCache(FakeClient(fail=True), snapshot_path=None))
+    with pytest.raises(ExchangeInfoUnavailable):
+        exchange_info.normalize_order('BTCUSDT', 0.01, 65000)
@@ -0,0 +1,111 @@
+import asyncio
+import pytest
+from src import client as client_module
+from src.advanced import grid_engine
+from src.advanced.grid_engine import GridEngine, BUY, SELL, EMPTY
+from src.advanced.grid_strategy import place_batch_orders
+from src.async_client import AsyncBinanceClient
+from src.simulator import ExchangeSimulator
+
+
+@pytest.fixture
+def simulator(monkeypatch):
+    monkeypatch.setattr(client_module, 'RETRY_BACKOFF', 0.01)
+    with ExchangeSimulator() as sim:
+        yield sim
+
+
+def run(simulator, coro_fn):
+    async def _run():
+        async with AsyncBinanceClient(simulator.api_key, simulator.api_secret, simulator.base_url) as client:
+            return await coro_fn(client)
+
+    return asyncio.run(_run())
+
+
+def grid_orders(count, bad=None):
+    orders = [{'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT', 'quantity': '0.01',
+               'price': f'{60000 + 10 * i}', 'timeInForce': 'GTC'} for i in range(count)]
+    if bad is not None:
+        orders[bad]['price'] = '60000.05'  # off the tick size: rejected with -1111
+    return orders
+
+
+@pytest.mark.parametrize('fault, retries', [(None, 0), ('reject_timestamp', 0), ('server_error', 1), ('disconnect', 1)])
+def test_partly_failed_batch_report(simulator, fault, retries):
+    if fault is not None:
+        simulator.inject_fault('/fapi/v1/batchOrders', fault, count=2)
+    report = run(simulator, lambda client: place_batch_orders(client, grid_orders(7, bad=3)))
+    assert report['batches'] == 2
+    assert report['placed'] == 6
+    assert [f['order']['price'] for f in report['failed']] == ['60000.05']
+    assert report['failed'][0]['error']['code'] == -1111
+    # Executed batches are looked up, never resent; only the order the exchange lacks goes out again.
+    assert report['retries'] == retries
+    assert len(simulator.orders) == 6
+    assert sorted(o['orderId'] for o in report['results'] if 'orderId' in o) == sorted(simulator.orders)
+
+
+async def start_grid(client):
+    # 11 levels 1000 apart around 65000: BUYs on levels 0-4, level 5 empty, SELLs on 6-10.
+    engine = GridEngine(client, symbol_filters=lambda symbol: None)
+    book = await engine.add_grid('BTCUSDT', 60000, 70000, 11, 0.01)
+    return engine, book
+
+
+def open_orders(simulator):
+    return {(o['side'], float(o['price'])): o['clientOrderId'] for o in simulator.open_orders('BTCUSDT')}
+
+
+def test_filled_buy_places_sell_one_level_up(simulator):
+    async def scenario(client):
+        engine, book = await start_grid(client)
+        assert len(open_orders(simulator)) == 10
+        simulator.set_price('BTCUSDT', 64000)
+        filled = simulator.client_ids[engine._client_id(book, 4)]
+        assert filled['status'] == 'FILLED'
+        await engine.on_order_update({'o': {'X': 'FILLED', 'c': filled['clientOrderId']}})
+        await engine.flush()
+        return engine, book
+
+    engine, book = run(simulator, scenario)
+    assert book.sides[4] == EMPTY and book.sides[5] == SELL
+    assert open_orders(simulator)[('SELL', 65000.0)] == engine._client_id(book, 5)
+    assert engine.stats()['BTCUSDT']['fills'] == 1
+
+
+def test_resync_rebuilds_book_from_open_orders(simulator):
+    async def scenario(client):
+        engine, book = await start_grid(client)
+        # Missed while the stream was down: level 4 filled, level 0 cancelled elsewhere.
+        simulator.set_price('BTCUSDT', 64000)
+        simulator.cancel_order({'symbol': 'BTCUSDT', 'origClientOrderId': engine._client_id(book, 0)})
+        await engine.resync()
+        await engine.flush()
+        return engine, book
+
+    engine, book = run(simulator, scenario)
+    assert list(book.sides) == [EMPTY, BUY, BUY, BUY, EMPTY, SELL, SELL, SELL, SELL, SELL, SELL]
+    live = open_orders(simulator)
+    assert len(live) == 9
+    assert all(live[(side, float(book.prices[level]))] == engine._client_id(book, level)
+               for level, side in ((1, 'BUY'), (5, 'SELL'), (10, 'SELL')))
+    assert engine.stats()['BTCUSDT']['fills'] == 1
+
+
+def test_rejected_levels_are_replaced(simulator, monkeypatch):
+    monkeypatch.setattr(grid_engine, 'REPLACE_BACKOFF', 0.05)
+    # Every attempt of both initial batches fails, so the client gives up on them.
+    simulator.inject_fault('/fapi/v1/batchOrders', 'reject_timestamp', count=8)
+
+    async def scenario(client):
+        engine, book = await start_grid(client)
+        rejected = engine.stats()['BTCUSDT']
+        await asyncio.sleep(0.5)
+        return engine, book, rejected
+
+    engine, book, rejected = run(simulator, scenario)
+    assert rejected['rejections'] == 10 and rejected['unplaced'] == 10
+    assert list(book.sides) == [BUY] * 5 + [EMPTY] + [SELL] * 5
+    assert len(open_orders(simulator)) == 10
+    assert engine.stats()['BTCUSDT']['unplaced'] == 0
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import pytest
+from websockets.asyncio.server import serve
+from src.advanced.oco_monitor import monitor_oco
+from src.async_client import AsyncBinanceClient
+from src.simulator import ExchangeSimulator
+from src.user_stream import UserDataStream
+
+
+@pytest.fixture
+def simulator():
+    with ExchangeSimulator() as sim:
+        yield sim
+
+
+def fill_event(order):
+    return {'e': 'ORDER_TRADE_UPDATE', 'E': order['updateTime'],
+            'o': {'s': order['symbol'], 'c': order['clientOrderId'], 'i': order['orderId'], 'X': 'FILLED',
+                  'S': order['side'], 'q': order['origQty'], 'z': order['origQty'], 'ap': order['price']}}
+
+
+async def run_monitor(simulator, events, fill_before_connect=False):
+    """
+    Places an OCO pair on the simulator and runs monitor_oco against a local
+    WebSocket server that sends `events(pair)` once a client connects.
+    """
+    async def handler(websocket):
+        for event in events(pair):
+            await websocket.send(json.dumps(event))
+        await websocket.wait_closed()
+
+    async with serve(handler, '127.0.0.1', 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        async with AsyncBinanceClient(simulator.api_key, simulator.api_secret, simulator.base_url) as client:
+            pair = await client.gather([
+                ('POST', '/fapi/v1/order', {'symbol': 'BTCUSDT', 'side': 'SELL', 'type': 'LIMIT', 'quantity': '0.01',
+                                            'price': '70000', 'timeInForce': 'GTC'}),
+                ('POST', '/fapi/v1/order', {'symbol': 'BTCUSDT', 'side': 'SELL', 'type': 'STOP', 'quantity': '0.01',
+                                            'price': '59900', 'stopPrice': '60000', 'timeInForce': 'GTC'}),
+            ], return_exceptions=False)
+            if fill_before_connect:
+                simulator.set_price('BTCUSDT', 70000)
+            stream = UserDataStream(client, f"ws://127.0.0.1:{port}")
+            monitor = await asyncio.wait_for(monitor_oco(client, stream, 'BTCUSDT', pair), timeout=10)
+    return monitor, pair
+
+
+def test_fill_event_cancels_sibling(simulator):
+    monitor, (take_profit, stop_loss) = asyncio.run(
+        run_monitor(simulator, lambda pair: [{'e': 'ACCOUNT_UPDATE', 'a': {}}, fill_event(pair[0])])
+    )
+    assert simulator.orders[stop_loss['orderId']]['status'] == 'CANCELED'
+    assert monitor.pending == 0
+    assert [s['cancelled_id'] for s in monitor.latencies] == [stop_loss['orderId']]
+
+
+def test_duplicate_fill_cancels_once(simulator):
+    monitor, (take_profit, stop_loss) = asyncio.run(
+        run_monitor(simulator, lambda pair: [fill_event(pair[1]), fill_event(pair[1])])
+    )
+    assert simulator.orders[take_profit['orderId']]['status'] == 'CANCELED'
+    assert [s['cancelled_id'] for s in monitor.latencies] == [take_profit['orderId']]
+
+
+def test_resync_catches_fill_missed_before_connect(simulator):
+    monitor, (take_profit, stop_loss) = asyncio.run(run_monitor(simulator, lambda pair: [], fill_before_connect=True))
+    assert simulator.orders[take_profit['orderId']]['status'] == 'FILLED'
+    assert simulator.orders[stop_loss['orderId']]['status'] == 'CANCELED'
+    assert monitor.pending == 0
@@ -0,0 +1,19 @@
+import pytest
+from src.rate_limiter import RateLimiter, PRIORITY_NORMAL, PRIORITY_STOP_LOSS
+
+
+def test_large_request_fits_beside_clamped_reserve():
+    limiter = RateLimiter(weight_limit=100, safety=1.0, reserve=0.1)
+    now = limiter.weight_buckets[60].updated
+    # Weight 95 plus a 10-token reserve exceeds the bucket; it must still run from a full bucket.
+    assert limiter._wait_time(95, 0, PRIORITY_NORMAL, now) == 0.0
+    limiter.weight_buckets[60].tokens = 50
+    assert limiter._wait_time(95, 0, PRIORITY_NORMAL, now) == pytest.approx(50 * 60 / 100)  # 95 + the clamped reserve of 5
+
+
+def test_reserve_held_back_from_normal_requests():
+    limiter = RateLimiter(weight_limit=100, safety=1.0, reserve=0.1)
+    limiter.weight_buckets[60].tokens = 15
+    now = limiter.weight_buckets[60].updated
+    assert limiter._wait_time(10, 0, PRIORITY_NORMAL, now) > 0
+    assert limiter._wait_time(10, 0, PRIORITY_STOP_LOSS, now) == 0.0
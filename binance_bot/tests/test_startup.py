@@ -0,0 +1,24 @@
+import pytest
+import startup_check
+from src.commands import COMMANDS
+
+
+def test_help_imports(tmp_path):
+    assert startup_check.check_startup(0, str(tmp_path), False) == []
+
+
+def test_market_help_imports(tmp_path):
+    # Parsing a market command must not pay for the HTTP, async or strategy stacks.
+    modules, _, _ = startup_check.import_times([startup_check.MAIN_PY, 'market', '--help'], str(tmp_path))
+    assert 'requests' not in modules
+    assert 'asyncio' not in modules
+    assert not [name for name in modules if name.startswith('src.advanced')]
+
+
+def test_daemon_client_imports(tmp_path):
+    assert startup_check.check_thin_client(str(tmp_path)) == []
+
+
+@pytest.mark.parametrize('name', sorted(COMMANDS))
+def test_command_imports(name, tmp_path):
+    assert startup_check.check_command(name, str(tmp_path), False) == []
@@ -0,0 +1,80 @@
+import time
+import pytest
+from src.client import BinanceClient
+from src.simulator import ExchangeSimulator
+from src.store import OrderStore, attach_store, store_path
+
+
+@pytest.fixture
+def simulator():
+    with ExchangeSimulator() as sim:
+        yield sim
+
+
+@pytest.fixture
+def client(simulator, tmp_path):
+    bot = BinanceClient(simulator.api_key, simulator.api_secret, simulator.base_url)
+    attach_store(bot, str(tmp_path / 'orders.db'))
+    yield bot
+    bot.store.close()
+    bot.session.close()
+
+
+def fill_event(order):
+    return {'e': 'ORDER_TRADE_UPDATE', 'E': order['updateTime'],
+            'o': {'s': order['symbol'], 'c': order['clientOrderId'], 'i': order['orderId'], 'X': order['status'],
+                  'S': order['side'], 'o': order['type'], 'q': order['origQty'], 'z': order['executedQty'],
+                  'ap': order['avgPrice'], 'T': order['updateTime']}}
+
+
+def test_store_is_keyed_by_endpoint_and_account():
+    paths = {store_path(url, key) for url in ('https://testnet.binancefuture.com', 'https://fapi.binance.com')
+             for key in ('key-a', 'key-b')}
+    assert len(paths) == 4
+
+
+def test_positions_apply_fill_deltas_once(simulator, client):
+    client.place_order('BTCUSDT', 'BUY', 'MARKET', '0.02')
+    resting = client.place_order('BTCUSDT', 'SELL', 'LIMIT', '0.01', price='66000')
+    assert client.store.position('BTCUSDT')['qty'] == pytest.approx(0.02)
+
+    simulator.set_price('BTCUSDT', 66000)
+    filled = client.send_request('GET', '/fapi/v1/order', {'symbol': 'BTCUSDT', 'orderId': resting['orderId']})
+    # The same fill from the stream and from another lookup is not counted again.
+    client.store.apply_order_update(fill_event(filled))
+    client.send_request('GET', '/fapi/v1/order', {'symbol': 'BTCUSDT', 'orderId': resting['orderId']})
+    position = client.store.position('BTCUSDT')
+    assert position['qty'] == pytest.approx(0.01)
+    assert position['qty'] == pytest.approx(simulator.positions['BTCUSDT']['qty'])
+    assert position['entry_price'] == pytest.approx(simulator.positions['BTCUSDT']['entry'])
+
+
+def test_sync_resolves_orders_closed_elsewhere(simulator, client):
+    orders = [client.place_order('BTCUSDT', 'BUY', 'LIMIT', '0.01', price=f'{64000 - 100 * i}') for i in range(3)]
+    # Changes the store never saw: one fill and one cancel.
+    simulator.set_price('BTCUSDT', 64000)
+    simulator.cancel_order({'symbol': 'BTCUSDT', 'orderId': orders[2]['orderId']})
+    assert len(client.store.open_orders('BTCUSDT')) == 3
+
+    assert client.store.sync(client, 'BTCUSDT') == {'symbol': 'BTCUSDT', 'open': 1, 'resolved': 2}
+    assert [o['order_id'] for o in client.store.open_orders('BTCUSDT')] == [orders[1]['orderId']]
+    assert client.store.get_order(order_id=orders[0]['orderId'])['status'] == 'FILLED'
+    assert client.store.get_order(order_id=orders[2]['orderId'])['status'] == 'CANCELED'
+    assert client.store.position('BTCUSDT')['qty'] == pytest.approx(0.01)
+
+
+def test_compact_removes_only_old_closed_orders(tmp_path):
+    store = OrderStore(str(tmp_path / 'orders.db'))
+    now = int(time.time() * 1000)
+    old = now - 8 * 86400 * 1000
+    store.record_orders([
+        {'clientOrderId': f'{status}-{age}', 'orderId': i, 'symbol': 'BTCUSDT', 'status': status, 'updateTime': when}
+        for i, (status, age, when) in enumerate(
+            [(s, age, when) for s in ('NEW', 'FILLED', 'CANCELED') for age, when in (('old', old), ('new', now))]
+        )
+    ])
+    assert store.compact(retention_days=7) == 2
+    assert sorted(o['client_order_id'] for o in store.orders(limit=10)) == [
+        'CANCELED-new', 'FILLED-new', 'NEW-new', 'NEW-old',
+    ]
+    store.close()
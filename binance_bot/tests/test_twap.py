@@ -0,0 +1,65 @@
+import asyncio
+from decimal import Decimal
+import pytest
+import requests
+from src.advanced.twap import twap_slices, run_twap
+
+
+@pytest.mark.parametrize('total, orders, step', [
+    (1, 3, '0.001'), (0.0107, 4, '0.001'), (0.1, 7, '0.001'), (2.5, 6, '0.1'), (37, 5, '1'), (0.005, 9, '0.001'),
+])
+def test_slices_sum_to_step_rounded_total(total, orders, step):
+    slices = twap_slices(total, orders, step)
+    step = Decimal(step)
+    assert len(slices) == orders
+    assert sum(slices) == (Decimal(str(total)) // step) * step
+    assert all(s >= 0 and s % step == 0 for s in slices)
+    assert max(slices) - min(slices) <= step
+
+
+class FakeClient:
+    """
+    Records when each slice is sent; slices listed in `failures` raise that exception.
+    """
+
+    def __init__(self, latency=0.0, failures=None):
+        self.latency = latency
+        self.failures = failures or {}
+        self.sent = []
+
+    async def send_request(self, method, endpoint, params=None, **kwargs):
+        self.sent.append((asyncio.get_running_loop().time(), Decimal(params['quantity'])))
+        await asyncio.sleep(self.latency)
+        failure = self.failures.get(len(self.sent))
+        if failure is not None:
+            raise failure
+        return {'orderId': len(self.sent)}
+
+
+def test_schedule_is_absolute():
+    # Each request takes most of an interval; a relative sleep would drift by that much per slice.
+    client = FakeClient(latency=0.03)
+    report = asyncio.run(run_twap(client, 'BTCUSDT', 'BUY', 0.006, 0.3, 6))
+    first = client.sent[0][0]
+    for i, (sent, _) in enumerate(client.sent):
+        assert sent - first == pytest.approx(i * 0.05, abs=0.015)
+    assert [s['scheduled_s'] for s in report['slices']] == pytest.approx([i * 0.05 for i in range(6)])
+    assert report['executed_qty'] == pytest.approx(0.006)
+
+
+def test_rejected_quantity_carries_forward():
+    client = FakeClient(failures={2: RuntimeError("Margin is insufficient.")})
+    report = asyncio.run(run_twap(client, 'BTCUSDT', 'BUY', 0.004, 0.02, 4))
+    assert [qty for _, qty in client.sent] == [Decimal('0.001'), Decimal('0.001'), Decimal('0.002'), Decimal('0.001')]
+    assert report['executed_qty'] == pytest.approx(0.004)
+    assert report['unexecuted_qty'] == 0
+
+
+def test_unknown_outcome_is_not_resent():
+    # The client already looked the order up; the strategy must not send it again.
+    client = FakeClient(failures={2: requests.exceptions.ReadTimeout("read timed out")})
+    report = asyncio.run(run_twap(client, 'BTCUSDT', 'BUY', 0.004, 0.02, 4))
+    assert [qty for _, qty in client.sent] == [Decimal('0.001')] * 4
+    assert report['unknown_qty'] == pytest.approx(0.001)
+    assert report['executed_qty'] == pytest.approx(0.003)
+    assert report['slices'][1]['unknown']